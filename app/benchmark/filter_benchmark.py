@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from app.replay.FrameRecorder import TRACE_FILE
+from app.tracking.CursorFilter import FILTER_TYPES, create_filter
+
+
+def load_trace(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """Return (timestamps in seconds, raw screen points) from a recording directory or trace file."""
+    if os.path.isdir(path):
+        path = os.path.join(path, TRACE_FILE)
+    timestamps, points = [], []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            timestamps.append(entry["timestamp_ms"] / 1000)
+            points.append(entry["raw"])
+    return np.asarray(timestamps, dtype=np.float64), np.asarray(points, dtype=np.float64)
+
+
+def lag_frames(filtered: np.ndarray, raw: np.ndarray, max_shift: int = 30) -> int:
+    """Shift in samples that best aligns the filtered path with the raw one. Negative means it leads."""
+    best_shift, best_error = 0, float("inf")
+    for shift in range(-max_shift, max_shift + 1):
+        if shift >= 0:
+            a, b = filtered[shift:], raw[:len(raw) - shift]
+        else:
+            a, b = filtered[:shift], raw[-shift:]
+        if len(a) < 2:
+            continue
+        error = float(np.mean(np.sum((a - b) ** 2, axis=1)))
+        if error < best_error:
+            best_shift, best_error = shift, error
+    return best_shift
+
+
+def evaluate(kind: str, params: dict, timestamps: np.ndarray, raw: np.ndarray, horizon_s: float) -> dict:
+    cursor_filter = create_filter(kind, **params)
+    output = np.empty_like(raw)
+    start = time.perf_counter()
+    for i, (timestamp, point) in enumerate(zip(timestamps, raw)):
+        cursor_filter.update(point, timestamp)
+        output[i] = cursor_filter.predict(horizon_s) if horizon_s else cursor_filter.value
+    elapsed = time.perf_counter() - start
+
+    frame_ms = float(np.median(np.diff(timestamps))) * 1000 if len(timestamps) > 1 else 0.0
+    acceleration = np.diff(output, n=2, axis=0)
+    return {
+        "filter": kind,
+        "prediction_ms": round(horizon_s * 1000, 1),
+        "jitter_px": round(float(np.sqrt(np.mean(np.sum(acceleration ** 2, axis=1)))), 3) if len(output) > 2 else 0.0,
+        "lag_ms": round(lag_frames(output, raw) * frame_ms, 1),
+        "rmse_px": round(float(np.sqrt(np.mean(np.sum((output - raw) ** 2, axis=1)))), 3),
+        "update_us": round(elapsed / max(len(raw), 1) * 1e6, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare cursor filters on a recorded landmark trace.")
+    parser.add_argument("trace", help="Recording directory written by --record, or its trace.jsonl.")
+    parser.add_argument("--filters", default=",".join(FILTER_TYPES), help="Comma-separated filter types to compare.")
+    parser.add_argument("--prediction-ms", type=float, default=50.0,
+                        help="Latency to compensate for in the predicted runs. 0 skips them.")
+    parser.add_argument("--alpha", type=float)
+    parser.add_argument("--min-cutoff", type=float)
+    parser.add_argument("--beta", type=float)
+    parser.add_argument("--process-noise", type=float)
+    parser.add_argument("--measurement-noise", type=float)
+    args = parser.parse_args()
+
+    timestamps, raw = load_trace(args.trace)
+    if len(raw) < 3:
+        print("Trace has too few samples to compare filters.", file=sys.stderr)
+        return 1
+
+    params = {
+        "alpha": args.alpha,
+        "min_cutoff": args.min_cutoff,
+        "beta": args.beta,
+        "process_noise": args.process_noise,
+        "measurement_noise": args.measurement_noise,
+    }
+    horizons = [0.0] + ([args.prediction_ms / 1000] if args.prediction_ms > 0 else [])
+    report = {
+        "samples": len(raw),
+        "raw_jitter_px": evaluate("ema", {"alpha": 1.0}, timestamps, raw, 0.0)["jitter_px"],
+        "results": [evaluate(kind, params, timestamps, raw, horizon)
+                    for kind in args.filters.split(",") for horizon in horizons],
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
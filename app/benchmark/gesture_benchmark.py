@@ -0,0 +1,84 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.tracking.GestureEngine import FINGER_JOINTS, GestureEngine
+
+# Finger bend per joint (radians) for each synthetic pose, thumb first.
+POSES = {
+    "open": (0.1, 0.05, 0.05, 0.05, 0.05),
+    "fist": (0.6, 1.1, 1.1, 1.1, 1.1),
+    "two_fingers": (0.2, 0.05, 0.05, 1.1, 1.1),
+}
+# Direction of each finger from the wrist, thumb first, pointing up the frame.
+BASE_ANGLES = -np.pi / 2 + np.array([-1.1, -0.3, 0.0, 0.3, 0.6])
+
+
+def synthetic_hand(pose: str, rng: np.random.Generator, noise: float = 0.002) -> np.ndarray:
+    """A (21, 3) right hand, normalized to a 4:3 frame, in one of POSES or a thumb-index pinch."""
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[0] = (0.5, 0.75, 0.0)
+    bends = POSES.get(pose, POSES["open"])
+    for joints, bend, angle in zip(FINGER_JOINTS, bends, BASE_ANGLES):
+        position = points[0, :2] + 0.08 * np.array([np.cos(angle), np.sin(angle)])
+        points[joints[0], :2] = position
+        for joint in joints[1:]:
+            angle += bend
+            position = position + 0.035 * np.array([np.cos(angle), np.sin(angle)])
+            points[joint, :2] = position
+    if pose == "index_pinch":
+        points[8, :2] = points[4, :2] + (0.01, 0.0)
+    return points + rng.normal(0.0, noise, points.shape).astype(np.float32)
+
+
+def run(args: argparse.Namespace) -> dict:
+    rng = np.random.default_rng(0)
+    engine = GestureEngine()
+    poses = [*POSES, "index_pinch"]
+
+    recognized = {}
+    for pose in poses:
+        engine.reset()
+        for _ in range(5):
+            gestures, _ = engine.classify(synthetic_hand(pose, rng)[None])
+        recognized[pose] = gestures[0]
+
+    hands = np.stack([synthetic_hand(poses[i % len(poses)], rng) for i in range(args.hands)])
+    for _ in range(100):
+        engine.classify(hands)
+    timings = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        engine.classify(hands)
+        timings.append((time.perf_counter() - start) * 1000)
+    p50, p95, p99 = np.percentile(timings, (50, 95, 99))
+
+    return {
+        "hands": args.hands,
+        "iterations": args.iterations,
+        "classify_ms": {"p50": round(float(p50), 4), "p95": round(float(p95), 4), "p99": round(float(p99), 4)},
+        "budget_ms": args.budget_ms,
+        "recognized": recognized,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time GestureEngine classification against its per-frame budget.")
+    parser.add_argument("--hands", type=int, default=2)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="Exit non-zero if p99 exceeds this.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if report["classify_ms"]["p99"] > args.budget_ms:
+        print(f"FAIL: p99 {report['classify_ms']['p99']} ms > {args.budget_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
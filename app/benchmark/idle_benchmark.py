@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+
+def rss_mb() -> float | None:
+    """Resident memory of this process, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            pages = int(file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def summarize(samples: list[dict], warm_up_s: float) -> dict:
+    """CPU use and memory growth after warm_up_s, when imports and the pipeline build are done."""
+    steady = [sample for sample in samples if sample["elapsed_s"] >= warm_up_s] or samples
+    cpu = [sample["cpu_percent"] for sample in steady]
+    rss = [(sample["elapsed_s"], sample["rss_mb"]) for sample in steady if sample["rss_mb"] is not None]
+    growth = None
+    if len(rss) >= 2 and rss[-1][0] > rss[0][0]:
+        elapsed_s, memory = np.array(rss).T
+        growth = round(float(np.polyfit(elapsed_s / 3600, memory, 1)[0]), 3)
+    return {
+        "duration_s": samples[-1]["elapsed_s"] if samples else 0.0,
+        "cpu_percent": {
+            "mean": round(float(np.mean(cpu)), 2) if cpu else None,
+            "p95": round(float(np.percentile(cpu, 95)), 2) if cpu else None,
+        },
+        "rss_mb": {
+            "start": round(rss[0][1], 1) if rss else None,
+            "end": round(rss[-1][1], 1) if rss else None,
+            "max": round(max(memory for _, memory in rss), 1) if rss else None,
+            "growth_per_hour": growth,
+        },
+        "status_lines_max": max((sample["status_lines"] for sample in samples), default=0),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Leave the app's window open without tracking for a long time and sample the process's "
+                    "CPU use and resident memory, optionally while per-frame diagnostics flood the status log.")
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--sample-s", type=float, default=10.0, help="Seconds between samples.")
+    parser.add_argument("--warm-up-s", type=float, default=60.0,
+                        help="Leave the first seconds out of the summary, while the pipeline is being built.")
+    parser.add_argument("--status-hz", type=float, default=0.0,
+                        help="Also log this many status messages a second, like per-frame diagnostics would.")
+    parser.add_argument("--max-cpu-percent", type=float, help="Exit non-zero if mean idle CPU use is higher.")
+    parser.add_argument("--max-growth-mb-per-hour", type=float,
+                        help="Exit non-zero if resident memory grows faster than this.")
+    parser.add_argument("--output", help="Also append every sample to this JSON-lines file.")
+    args = parser.parse_args()
+
+    from PySide6.QtCore import QTimer
+
+    from app.main import Application
+
+    application = Application()
+    ui = application.ui
+    samples: list[dict] = []
+    started_at = last_at = time.perf_counter()
+    last_cpu = time.process_time()
+
+    def sample():
+        nonlocal last_at, last_cpu
+        now, cpu = time.perf_counter(), time.process_time()
+        entry = {
+            "elapsed_s": round(now - started_at, 1),
+            # Every thread of the process: the window, the idle pipeline and the service.
+            "cpu_percent": round((cpu - last_cpu) / max(now - last_at, 1e-9) * 100, 2),
+            "rss_mb": rss_mb(),
+            "status_lines": ui.status_text.blockCount(),
+        }
+        last_at, last_cpu = now, cpu
+        samples.append(entry)
+        if args.output:
+            with open(args.output, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry) + "\n")
+
+    sample_timer = QTimer()
+    sample_timer.timeout.connect(sample)
+    sample_timer.start(round(args.sample_s * 1000))
+
+    messages = 0
+
+    def log_diagnostic():
+        nonlocal messages
+        messages += 1
+        ui.update_status(f"diagnostic {messages}: frame_age 1.7 ms, capture_latency 3.0 ms")
+
+    status_timer = QTimer()
+    status_timer.timeout.connect(log_diagnostic)
+    if args.status_hz > 0:
+        status_timer.start(max(round(1000 / args.status_hz), 1))
+
+    QTimer.singleShot(round(args.hours * 3600 * 1000), ui.window.close)
+    application.run()
+
+    summary = {"hours": args.hours, "status_hz": args.status_hz, "status_messages": messages,
+               **summarize(samples, args.warm_up_s)}
+    print(json.dumps(summary, indent=2))
+    failed = False
+    mean_cpu = summary["cpu_percent"]["mean"]
+    if args.max_cpu_percent is not None and mean_cpu is not None and mean_cpu > args.max_cpu_percent:
+        print(f"FAIL: idle CPU {mean_cpu}% > {args.max_cpu_percent}%", file=sys.stderr)
+        failed = True
+    growth = summary["rss_mb"]["growth_per_hour"]
+    if args.max_growth_mb_per_hour is not None and growth is not None and growth > args.max_growth_mb_per_hour:
+        print(f"FAIL: memory grows {growth} MB/h > {args.max_growth_mb_per_hour} MB/h", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import argparse
+import json
+import sys
+
+from app.tracking.InferenceConfig import (DELEGATES, SELECTION_SETTING, available_models, fingerprint, sample_frames,
+                                          select)
+
+
+def load_frames(args: argparse.Namespace) -> list:
+    if args.recording:
+        from app.replay.ReplayCameraController import ReplayCameraController
+        camera = ReplayCameraController(args.recording, realtime=False)
+    else:
+        from app.camera.CameraController import CameraController
+        camera = CameraController(args.camera)
+    try:
+        return sample_frames(camera, args.frames)
+    finally:
+        camera.release()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Time every installed hand landmarker model on each delegate and pick the fastest that "
+                    "meets a latency target on this machine.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--recording", help="Take sample frames from a directory written by --record.")
+    source.add_argument("--camera", type=int, default=0, help="Take sample frames from this camera.")
+    parser.add_argument("--frames", type=int, default=30, help="Sample frames timed per configuration.")
+    parser.add_argument("--models", nargs="+", help="Model files to try. Defaults to models/hand_landmarker*.task.")
+    parser.add_argument("--delegates", nargs="+", choices=DELEGATES, default=list(DELEGATES))
+    parser.add_argument("--max-hands", type=int, default=1)
+    parser.add_argument("--target-ms", type=float, default=25.0, help="p95 detection time to meet.")
+    parser.add_argument("--save", action="store_true",
+                        help="Store the choice in preferences.db, where the app picks it up on its next start.")
+    args = parser.parse_args()
+
+    frames = load_frames(args)
+    if not frames:
+        print("Error: no frames could be read.", file=sys.stderr)
+        return 1
+    models = args.models or available_models()
+    try:
+        selection = select(frames, models, delegates=tuple(args.delegates), target_ms=args.target_ms,
+                           num_hands=args.max_hands)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(selection, indent=2))
+
+    if args.save:
+        from app.preferences.PreferencesController import PreferencesController
+        preferences = PreferencesController()
+        # Keyed to the installed models, which is what the app checks, even if only some were tried.
+        preferences.set_setting(SELECTION_SETTING, {**selection, "fingerprint": fingerprint(available_models())})
+        preferences.close()
+    return 0 if selection["meets_target"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
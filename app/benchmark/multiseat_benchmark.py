@@ -0,0 +1,93 @@
+import argparse
+import json
+import sys
+import time
+
+from app.cursor.RecordingCursorController import RecordingCursorController
+from app.replay.ReplayCameraController import ReplayCameraController
+from app.system.MultiSeatController import MultiSeatController
+from app.tracking.InferenceConfig import InferenceConfig
+from app.tracking.LandmarkerPool import LandmarkerPool
+from app.tracking.TrackingParams import TrackingParams
+
+
+def run(args: argparse.Namespace, seat_count: int) -> dict:
+    """Replay the recording on seat_count seats at once, sharing one pool of args.workers landmarkers."""
+    inference = InferenceConfig(args.model, args.delegate)
+    pool = LandmarkerPool(inference, workers=args.workers, num_hands=args.max_hands)
+    controller = MultiSeatController(
+        pool,
+        TrackingParams(area_size_x=640, area_size_y=480, model_path=args.model, delegate=args.delegate,
+                       num_hands=args.max_hands),
+        max_frame_age_ms=args.max_frame_age_ms or None
+    )
+    cameras = []
+    for index in range(seat_count):
+        camera = ReplayCameraController(args.recording, realtime=True)
+        cameras.append(camera)
+        controller.add_seat(f"seat{index}", camera, RecordingCursorController(), screen_size=(1920, 1080))
+    pool.wait_ready(timeout=60.0)
+
+    controller.start()
+    while not all(camera.finished for camera in cameras):
+        time.sleep(0.05)
+    # Give the last in-flight frames time to come back from the landmarkers.
+    time.sleep(args.drain)
+    metrics = controller.get_metrics()
+    controller.close()
+
+    seats = {}
+    for name, snapshot in metrics["seats"].items():
+        seats[name] = {
+            "effective_fps": snapshot["effective_fps"],
+            "capture_latency_ms": snapshot["stages"]["capture_latency"],
+            "frames_expired": snapshot["frames_expired"],
+            "frames_dropped": snapshot["frames_dropped"],
+        }
+    processed = list(metrics["pool"]["processed"].values())
+    return {
+        "seats": seat_count,
+        "aggregate_fps": metrics["aggregate_fps"],
+        "pool_utilization": metrics["pool"]["utilization"],
+        # 1.0 when every seat got the same number of detections.
+        "fairness": round(min(processed) / max(processed), 3) if processed and max(processed) else None,
+        "per_seat": seats,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay a recording on a growing number of seats that share one landmarker pool, and report "
+                    "aggregate FPS and per-seat latency.")
+    parser.add_argument("recording", help="Directory written by --record.")
+    parser.add_argument("--model", default="models/hand_landmarker.task")
+    parser.add_argument("--delegate", choices=("cpu", "gpu"), default="cpu")
+    parser.add_argument("--max-seats", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2, help="Landmarkers in the shared pool.")
+    parser.add_argument("--max-hands", type=int, default=1)
+    parser.add_argument("--max-frame-age-ms", type=float, default=100.0,
+                        help="Drop frames older than this before inference; 0 keeps every frame.")
+    parser.add_argument("--drain", type=float, default=0.5, help="Seconds to wait for in-flight results.")
+    parser.add_argument("--output", help="Also write the report to this JSON file.")
+    args = parser.parse_args()
+
+    runs = []
+    for seat_count in range(1, args.max_seats + 1):
+        report = run(args, seat_count)
+        runs.append(report)
+        latencies = [seat["capture_latency_ms"]["p95"] for seat in report["per_seat"].values()]
+        worst = max((latency for latency in latencies if latency is not None), default=None)
+        print(f"{seat_count} seats: {report['aggregate_fps']:g} fps total, worst p95 capture latency "
+              f"{worst} ms, pool {report['pool_utilization']:.0%} busy, fairness {report['fairness']}",
+              file=sys.stderr)
+
+    summary = {"recording": args.recording, "workers": args.workers, "runs": runs}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.benchmark import replay_benchmark
+from app.replay.ReplayCameraController import ReplayCameraController
+from app.system.FramePreview import render
+from app.tracking.HandLandmarks import HandLandmarks
+from app.tracking.TrackingResult import TrackingResult
+
+
+def render_timings(recording: str, width: int, frames: int = 200) -> dict:
+    """Time FramePreview.render on the recording's frames with a synthetic two-hand overlay."""
+    camera = ReplayCameraController(recording, realtime=False)
+    rng = np.random.default_rng(0)
+    result = TrackingResult(0, 0, False, hands=HandLandmarks(2).fill(rng.uniform(0.3, 0.7, (2, 21, 3))),
+                            roi=(0.25, 0.25, 0.5, 0.5), gestures=("index_pinch", None))
+    timings = []
+    while len(timings) < frames:
+        buffer = camera.acquire_frame()
+        if buffer is None:
+            break
+        start = time.perf_counter()
+        render(buffer.bgr, result, width)
+        timings.append((time.perf_counter() - start) * 1000)
+        buffer.release()
+    camera.release()
+    if not timings:
+        return {"count": 0}
+    p50, p99 = np.percentile(timings, (50, 99))
+    return {"count": len(timings), "p50": round(float(p50), 3), "p99": round(float(p99), 3)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure how much tracking latency the live preview adds, by replaying a recording "
+                    "with the preview off and on in alternating runs.")
+    parser.add_argument("recording", help="Directory written by --record.")
+    parser.add_argument("--model", default="models/hand_landmarker.task")
+    parser.add_argument("--runs", type=int, default=3, help="Replays with the preview off, and as many with it on.")
+    parser.add_argument("--width", type=int, default=320, help="Preview width in pixels.")
+    parser.add_argument("--budget-ms", type=float, default=1.0,
+                        help="Exit non-zero if the preview adds more than this to the median tracking latency.")
+    args = parser.parse_args()
+
+    latency: dict[bool, list[float]] = {False: [], True: []}
+    offer_p99 = []
+    preview_fps = []
+    for _ in range(args.runs):
+        # Alternated so drift in machine load affects both configurations alike.
+        for preview in (False, True):
+            replay_args = replay_benchmark.build_parser().parse_args(
+                [args.recording, "--model", args.model, "--no-governor", *(["--preview"] if preview else [])])
+            report = replay_benchmark.run(replay_args)
+            latency[preview].append(report["latency_ms"]["p50"])
+            if preview:
+                offer_p99.append(report["metrics"]["stages"]["preview_offer"]["p99"])
+                duration_s = report["frames"] / max(report["capture_fps"], 1e-6)
+                preview_fps.append(report["preview_frames"] / max(duration_s, 1e-6))
+
+    off_ms = float(np.median(latency[False]))
+    on_ms = float(np.median(latency[True]))
+    # The capture thread pays for offering frames before handing them on; the rest shows up as
+    # contention in the capture-to-result latency.
+    added_ms = max(on_ms - off_ms, 0.0) + float(np.median(offer_p99))
+    summary = {
+        "recording": args.recording,
+        "runs": args.runs,
+        "result_latency_p50_ms": {"preview_off": round(off_ms, 3), "preview_on": round(on_ms, 3)},
+        "preview_offer_p99_ms": round(float(np.median(offer_p99)), 4),
+        "preview_fps": round(float(np.median(preview_fps)), 1),
+        "render_ms": render_timings(args.recording, args.width),
+        "added_latency_ms": round(added_ms, 3),
+        "budget_ms": args.budget_ms,
+    }
+    print(json.dumps(summary, indent=2))
+    if added_ms > args.budget_ms:
+        print(f"FAIL: preview adds {added_ms:.3f} ms > {args.budget_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import argparse
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+from app.cursor.RecordingCursorController import RecordingCursorController
+from app.replay.ReplayCameraController import ReplayCameraController
+from app.system.FrameRateGovernor import FrameRateGovernor
+from app.system.PipelineConfig import PipelineConfig
+from app.system.SystemController import SystemController
+from app.tracking.TrackingController import TrackingController
+from app.tracking.TrackingParams import TrackingParams
+
+# Two profiles that differ in every stage that can change without reloading the model, but keep the
+# filter kind, so its state should carry across every switch.
+PROFILES = (
+    PipelineConfig(filter_type="one_euro", filter_params=(("min_cutoff", 1.0), ("beta", 0.007)),
+                   sensitivity=1.0, monitor=-1, pinch_threshold=0.05, idle_fps=5.0),
+    PipelineConfig(filter_type="one_euro", filter_params=(("min_cutoff", 0.5), ("beta", 0.02)),
+                   latency_compensation=True, sensitivity=1.4, monitor=-1, pinch_threshold=0.07,
+                   gesture_map=(("index_pinch", "click"), ("middle_pinch", "none"),
+                                ("two_fingers", "scroll"), ("fist", "pause")),
+                   idle_fps=10.0),
+)
+
+
+def run(args: argparse.Namespace, interval_ms: float | None) -> dict:
+    """Replay the recording, switching between PROFILES every interval_ms, or never if it is None."""
+    camera = ReplayCameraController(args.recording, realtime=True)
+    tracking = TrackingController(
+        TrackingParams(area_size_x=640, area_size_y=480, model_path=args.model, delegate=args.delegate),
+        screen_size=(1920, 1080)
+    )
+    system = SystemController(
+        camera_controller=camera,
+        tracking_controller=tracking,
+        cursor_controller=RecordingCursorController(),
+        pipelined=True,
+        governor=FrameRateGovernor(enabled=False),
+        max_frame_age_ms=args.max_frame_age_ms or None
+    )
+    system.apply_config(PROFILES[0])
+    tracking.warm_up(timeout=30.0)
+
+    apply_ms = []
+    filter_replaced = 0
+    stop = threading.Event()
+
+    def switch():
+        index = 0
+        while not stop.wait(interval_ms / 1000):
+            index ^= 1
+            filter_before = tracking.filter
+            start = time.perf_counter()
+            system.apply_config(PROFILES[index])
+            apply_ms.append((time.perf_counter() - start) * 1000)
+            nonlocal filter_replaced
+            filter_replaced += tracking.filter is not filter_before
+
+    switcher = threading.Thread(target=switch, name="wave-vision-reconfigure", daemon=True)
+    system.start()
+    if interval_ms is not None:
+        switcher.start()
+    while not camera.finished:
+        time.sleep(0.05)
+    stop.set()
+    # Give the last in-flight frames time to come back from the landmarker.
+    time.sleep(args.drain)
+    system.stop()
+    tracking.close()
+    if switcher.is_alive():
+        switcher.join()
+
+    metrics = system.get_metrics()
+    report = {
+        "interval_ms": interval_ms,
+        "frames": camera.frames_read,
+        "effective_fps": metrics["effective_fps"],
+        "frame_interval_ms": round(1000 / metrics["capture_fps"], 2) if metrics["capture_fps"] else None,
+        "frames_dropped": metrics["frames_dropped"],
+        "frames_expired": metrics["frames_expired"],
+        "switches": len(apply_ms),
+        "filters_replaced": filter_replaced,
+    }
+    if apply_ms:
+        p50, p99 = np.percentile(apply_ms, (50, 99))
+        report["apply_ms"] = {"p50": round(float(p50), 4), "p99": round(float(p99), 4),
+                              "max": round(max(apply_ms), 4)}
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay a recording while switching between two profiles, and compare frame rate and "
+                    "dropped frames against a run without switching.")
+    parser.add_argument("recording", help="Directory written by --record.")
+    parser.add_argument("--model", default="models/hand_landmarker.task")
+    parser.add_argument("--delegate", choices=("cpu", "gpu"), default="cpu")
+    parser.add_argument("--interval-ms", type=float, default=100.0, help="Time between profile switches.")
+    parser.add_argument("--max-frame-age-ms", type=float, default=100.0,
+                        help="Drop frames older than this before inference; 0 keeps every frame.")
+    parser.add_argument("--drain", type=float, default=0.5, help="Seconds to wait for in-flight results.")
+    parser.add_argument("--budget-frames", type=float, default=0.1,
+                        help="Exit non-zero if a switch takes longer than this fraction of a frame (p99).")
+    parser.add_argument("--output", help="Also write the report to this JSON file.")
+    args = parser.parse_args()
+
+    baseline = run(args, None)
+    switching = run(args, args.interval_ms)
+    summary = {"recording": args.recording, "baseline": baseline, "switching": switching}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+
+    failed = False
+    frame_ms = switching["frame_interval_ms"]
+    p99 = switching.get("apply_ms", {}).get("p99")
+    if frame_ms and p99 is not None and p99 > args.budget_frames * frame_ms:
+        print(f"FAIL: p99 switch {p99} ms > {args.budget_frames:g} of a {frame_ms} ms frame", file=sys.stderr)
+        failed = True
+    if switching["filters_replaced"]:
+        print(f"FAIL: the cursor filter was rebuilt {switching['filters_replaced']} times", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from app.cursor.RecordingCursorController import RecordingCursorController
+from app.replay.FrameRecorder import TRACE_FILE
+from app.replay.ReplayCameraController import ReplayCameraController
+from app.system.FramePreview import FramePreview
+from app.system.FrameRateGovernor import FrameRateGovernor
+from app.system.SystemController import SystemController
+from app.tracking.TrackingController import TrackingController
+from app.tracking.TrackingParams import TrackingParams
+
+
+def path_jitter(moves: list[tuple[float, float, float]]) -> float:
+    """RMS of the second difference of the cursor path in pixels, i.e. frame-to-frame wobble."""
+    if len(moves) < 3:
+        return 0.0
+    points = np.asarray([(x, y) for _, x, y in moves], dtype=np.float64)
+    acceleration = np.diff(points, n=2, axis=0)
+    return float(np.sqrt(np.mean(np.sum(acceleration ** 2, axis=1))))
+
+
+def recorded_pinch_events(directory: str, first_timestamp_ms: int) -> list[tuple[float, str]]:
+    path = os.path.join(directory, TRACE_FILE)
+    if not os.path.exists(path):
+        return []
+
+    events = []
+    was_pressed = False
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["pressed"] != was_pressed:
+                was_pressed = entry["pressed"]
+                events.append((entry["timestamp_ms"] - first_timestamp_ms, "grab" if was_pressed else "release"))
+    return events
+
+
+def pinch_offsets(replayed: list[tuple[float, str]], recorded: list[tuple[float, str]]) -> list[float]:
+    """Millisecond offset between each recorded pinch transition and the nearest replayed one of the same kind."""
+    offsets = []
+    for recorded_ms, kind in recorded:
+        candidates = [ms for ms, replayed_kind in replayed if replayed_kind == kind]
+        if candidates:
+            offsets.append(min(candidates, key=lambda ms: abs(ms - recorded_ms)) - recorded_ms)
+    return offsets
+
+
+def run(args: argparse.Namespace) -> dict:
+    width, height = (int(value) for value in args.screen.split("x"))
+    camera = ReplayCameraController(args.recording, realtime=True, speed=args.speed)
+    cursor = RecordingCursorController()
+    tracking = TrackingController(
+        TrackingParams(area_size_x=640, area_size_y=480, model_path=args.model,
+                       delegate=args.delegate, num_hands=args.max_hands, isolated_inference=args.isolated,
+                       flow_interval=args.flow_interval),
+        screen_size=(width, height)
+    )
+    system = SystemController(
+        camera_controller=camera,
+        tracking_controller=tracking,
+        cursor_controller=cursor,
+        pipelined=not args.sync,
+        governor=FrameRateGovernor(enabled=not args.no_governor),
+        max_frame_age_ms=args.max_frame_age_ms or None
+    )
+
+    preview = None
+    if args.preview:
+        # Rendered images are discarded; this measures what the preview costs the pipeline.
+        preview = system.preview = FramePreview(lambda image, timestamp_ms: None).start()
+
+    tracking.warm_up(timeout=30.0)
+    system.start()
+    while not camera.finished:
+        if args.sync:
+            system.update()
+        else:
+            time.sleep(0.05)
+    # Give the last in-flight frames time to come back from the landmarker.
+    time.sleep(args.drain)
+    system.stop()
+    tracking.close()
+    if preview is not None:
+        preview.stop()
+
+    started_at = camera.started_at or 0.0
+    replayed_events = [((at - started_at) * 1000, kind) for at, kind in cursor.events]
+    recorded_events = recorded_pinch_events(args.recording, camera.timestamps[0]) if camera.timestamps else []
+    offsets = pinch_offsets(replayed_events, recorded_events)
+    metrics = system.get_metrics()
+
+    return {
+        "recording": args.recording,
+        "mode": "sync" if args.sync else "pipelined",
+        "isolated": args.isolated,
+        "preview_frames": preview.frames_rendered if preview is not None else None,
+        "flow": {"interval": args.flow_interval, "propagated": tracking.flow.propagated,
+                 "fallbacks": tracking.flow.fallbacks,
+                 "deferred": tracking.flow.deferred} if tracking.flow is not None else None,
+        "frames": camera.frames_read,
+        "effective_fps": metrics["effective_fps"],
+        "capture_fps": metrics["capture_fps"],
+        "latency_ms": metrics["stages"]["result_latency"],
+        "capture_latency_ms": metrics["stages"]["capture_latency"],
+        "frames_expired": metrics["frames_expired"],
+        "jitter_px": round(path_jitter(cursor.moves), 3),
+        "pinch_events": [{"ms": round(ms, 1), "event": kind} for ms, kind in replayed_events],
+        "recorded_pinch_events": len(recorded_events),
+        "pinch_offset_ms": {
+            "mean": round(float(np.mean(offsets)), 1) if offsets else None,
+            "max_abs": round(float(np.max(np.abs(offsets))), 1) if offsets else None,
+        },
+        "metrics": metrics,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Replay a Wave Vision recording headlessly and report tracking performance.")
+    parser.add_argument("recording", help="Directory written by --record.")
+    parser.add_argument("--model", default="models/hand_landmarker.task")
+    parser.add_argument("--delegate", choices=("cpu", "gpu"), default="cpu", help="Where the landmarker runs.")
+    parser.add_argument("--screen", default="1920x1080", help="Virtual screen size as WIDTHxHEIGHT.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier.")
+    parser.add_argument("--sync", action="store_true", help="Use the single-threaded update() path.")
+    parser.add_argument("--max-hands", type=int, default=1, help="Maximum number of hands tracked per frame.")
+    parser.add_argument("--isolated", action="store_true", help="Run the landmarker in a separate process.")
+    parser.add_argument("--flow-interval", type=int, default=1,
+                        help="Run the landmarker on every Nth frame and track with optical flow in between.")
+    parser.add_argument("--max-frame-age-ms", type=float, default=100.0,
+                        help="Drop frames older than this before inference; 0 keeps every frame.")
+    parser.add_argument("--no-governor", action="store_true", help="Infer every frame, even with no hand in view.")
+    parser.add_argument("--drain", type=float, default=0.5, help="Seconds to wait for in-flight results.")
+    parser.add_argument("--output", help="Also write the report to this JSON file.")
+    parser.add_argument("--max-latency-p95", type=float, help="Exit non-zero if p95 result latency exceeds this (ms).")
+    parser.add_argument("--min-fps", type=float, help="Exit non-zero if effective FPS falls below this.")
+    parser.add_argument("--preview", action="store_true", help="Render the live preview while replaying.")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    failed = False
+    p95 = report["latency_ms"]["p95"]
+    if args.max_latency_p95 is not None and p95 is not None and p95 > args.max_latency_p95:
+        print(f"FAIL: p95 latency {p95} ms > {args.max_latency_p95} ms", file=sys.stderr)
+        failed = True
+    if args.min_fps is not None and report["effective_fps"] < args.min_fps:
+        print(f"FAIL: effective FPS {report['effective_fps']} < {args.min_fps}", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+import numpy as np
+from mediapipe.tasks.python.components.containers.category import Category
+from mediapipe.tasks.python.components.containers.landmark import Landmark, NormalizedLandmark
+from mediapipe.tasks.python.vision.hand_landmarker import HandLandmarkerResult
+
+from app.benchmark.gesture_benchmark import synthetic_hand
+from app.tracking.HandLandmarks import LandmarkRing
+from app.tracking.ScreenMapping import ScreenMapping, default_region
+from app.tracking.TrackingController import _MIRROR, _MIRROR_OFFSET
+from app.tracking.TrackingResult import TrackingResult
+
+
+@dataclass
+class LegacyTrackingResult:
+    """TrackingResult as it was before it held HandLandmarks: a plain dataclass owning its array."""
+    cursor_position_x: float
+    cursor_position_y: float
+    pressed: bool
+    timestamp_ms: int = 0
+    raw_position_x: float = 0.0
+    raw_position_y: float = 0.0
+    pinch_distance: float = 0.0
+    gestures: tuple[str | None, ...] = ()
+    hand_motion_y: tuple[float, ...] = ()
+    landmarks: np.ndarray | None = None
+    roi: tuple[float, float, float, float] | None = None
+
+
+def synthetic_result(hands: int, rng: np.random.Generator) -> HandLandmarkerResult:
+    """A HandLandmarkerResult built from MediaPipe's own containers, as the landmarker delivers it."""
+    points = [synthetic_hand("open", rng) for _ in range(hands)]
+    return HandLandmarkerResult(
+        handedness=[[Category(index=hand % 2, score=0.95, category_name=("Right", "Left")[hand % 2])]
+                    for hand in range(hands)],
+        hand_landmarks=[[NormalizedLandmark(x=float(x), y=float(y), z=float(z)) for x, y, z in hand]
+                        for hand in points],
+        hand_world_landmarks=[[Landmark(x=0.0, y=0.0, z=0.0) for _ in hand] for hand in points],
+    )
+
+
+def legacy_clamp(mapping: ScreenMapping, points: np.ndarray) -> np.ndarray:
+    """ScreenMapping.clamp before its single-monitor shortcut."""
+    clamped = np.clip(points[:, None, :], mapping._minimum[None], mapping._maximum[None])
+    nearest = np.argmin(np.sum((clamped - points[:, None, :]) ** 2, axis=2), axis=1)
+    return clamped[np.arange(len(points)), nearest]
+
+
+def legacy_map(mapping: ScreenMapping, points: np.ndarray) -> np.ndarray:
+    """ScreenMapping.map before it split the homography."""
+    homogeneous = np.hstack([points, np.ones((len(points), 1))]) @ mapping.matrix.T
+    return legacy_clamp(mapping, homogeneous[:, :2] / homogeneous[:, 2:])
+
+
+def legacy_result(result: HandLandmarkerResult, mapping: ScreenMapping, timestamp_ms: int) -> LegacyTrackingResult:
+    """The per-result work of the old TrackingController: tuple list conversion, then scalar math."""
+    landmarks = np.array([[(landmark.x, landmark.y, landmark.z) for landmark in hand]
+                          for hand in result.hand_landmarks], dtype=np.float32)
+    np.array([hand[0].score for hand in result.handedness], dtype=np.float32)
+    points = landmarks[0, :, :2]
+    thumb_tip = points[4]
+    index_tip = points[8]
+    position = np.array([[1 - float(thumb_tip[0] + index_tip[0]) / 2, float(thumb_tip[1] + index_tip[1]) / 2]])
+    x_screen, y_screen = legacy_map(mapping, position)[0]
+    # Stands in for the filter, which both versions share, and the clamp of its output.
+    smoothed_x, smoothed_y = legacy_clamp(mapping, np.array([x_screen, y_screen]).reshape(1, 2))[0]
+    return LegacyTrackingResult(
+        cursor_position_x=int(smoothed_x),
+        cursor_position_y=int(smoothed_y),
+        pressed=False,
+        timestamp_ms=timestamp_ms,
+        raw_position_x=float(x_screen),
+        raw_position_y=float(y_screen),
+        pinch_distance=float(np.linalg.norm(thumb_tip - index_tip)),
+        landmarks=landmarks,
+    )
+
+
+def array_result(result: HandLandmarkerResult, mapping: ScreenMapping, timestamp_ms: int,
+                 ring: LandmarkRing) -> TrackingResult:
+    """The same work as TrackingController does it now: in-place conversion, then array math."""
+    hands = ring.acquire().fill_from_result(result)
+    position = hands.pinch_points()[:1] * _MIRROR + _MIRROR_OFFSET
+    raw = mapping.map(position)[0]
+    smoothed_x, smoothed_y = mapping.clamp(raw.reshape(1, 2))[0]
+    return TrackingResult(
+        cursor_position_x=int(smoothed_x),
+        cursor_position_y=int(smoothed_y),
+        pressed=False,
+        timestamp_ms=timestamp_ms,
+        raw_position_x=float(raw[0]),
+        raw_position_y=float(raw[1]),
+        pinch_distance=float(hands.pinch_distances()[0]),
+        hands=hands,
+    )
+
+
+def timings_us(build, results: list[HandLandmarkerResult], iterations: int) -> dict:
+    for index in range(100):
+        build(results[index % len(results)], index + 1)
+    timings = []
+    for index in range(iterations):
+        start = time.perf_counter()
+        build(results[index % len(results)], index + 1)
+        timings.append((time.perf_counter() - start) * 1e6)
+    p50, p95, p99 = np.percentile(timings, (50, 95, 99))
+    return {"p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2)}
+
+
+def allocated_bytes(build, results: list[HandLandmarkerResult], count: int = 1000) -> float:
+    """Bytes still allocated per result while the last count results are kept, as a consumer would."""
+    kept = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for index in range(count):
+        kept.append(build(results[index % len(results)], index + 1))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return round((after - before) / count, 1)
+
+
+def run(args: argparse.Namespace) -> dict:
+    rng = np.random.default_rng(0)
+    results = [synthetic_result(args.hands, rng) for _ in range(16)]
+    mapping = ScreenMapping(default_region((640, 480), (640, 480)), [(0, 0, 1920, 1080)])
+    ring = LandmarkRing(capacity=args.hands)
+
+    def before(result, timestamp_ms):
+        return legacy_result(result, mapping, timestamp_ms)
+
+    def after(result, timestamp_ms):
+        return array_result(result, mapping, timestamp_ms, ring)
+
+    legacy, current = before(results[0], 1), after(results[0], 1)
+    assert np.allclose(legacy.landmarks, current.hands.points)
+    assert abs(legacy.raw_position_x - current.raw_position_x) < 1e-3
+    assert abs(legacy.pinch_distance - current.pinch_distance) < 1e-6
+
+    return {
+        "hands": args.hands,
+        "iterations": args.iterations,
+        "per_result_us": {
+            "before": timings_us(before, results, args.iterations),
+            "after": timings_us(after, results, args.iterations),
+        },
+        "bytes_per_kept_result": {
+            "before": allocated_bytes(before, results),
+            "after": allocated_bytes(after, results),
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare the per-result cost of turning a MediaPipe result into a TrackingResult, "
+                    "the old way (per-landmark tuples, scalar math, plain dataclass) and the current one "
+                    "(preallocated arrays, vectorized math and screen mapping, slotted dataclass).")
+    parser.add_argument("--hands", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,97 @@
 import cv2
 import numpy as np
 
+from app.camera.CaptureMode import CameraSettings, CaptureMode, negotiate, open_capture, read_settings
+from app.camera.FrameClock import monotonic_ms
+from app.camera.FramePool import FrameBuffer, FramePool
+from app.metrics.PipelineMetrics import PipelineMetrics
+
+
+def _grab(camera: cv2.VideoCapture, image: np.ndarray | None) -> tuple[bool, np.ndarray | None, float]:
+    # read() is grab() plus retrieve(); split so the timestamp excludes decoding. Backend timestamps
+    # (CAP_PROP_POS_MSEC) are not used: their epoch differs between backends and many report 0.
+    if not camera.grab():
+        return False, None, 0.0
+    captured_ms = monotonic_ms()
+    ret, bgr = camera.retrieve(image=image)
+    return ret, bgr, captured_ms
+
+
+def read_into_pool(camera: cv2.VideoCapture, pool: FramePool | None,
+                   metrics: PipelineMetrics | None) -> tuple[FrameBuffer | None, FramePool | None]:
+    """
+    Read the next frame straight into a pooled buffer and convert it to RGB in place. The pool is
+    (re)built from the first frame and whenever the driver changes the frame size. The buffer's
+    captured_ms is taken as soon as the frame is grabbed, before it is decoded.
+    """
+    buffer = pool.acquire() if pool is not None else None
+
+    if metrics is None:
+        ret, bgr, captured_ms = _grab(camera, buffer.bgr if buffer is not None else None)
+    else:
+        with metrics.measure("camera_read"):
+            ret, bgr, captured_ms = _grab(camera, buffer.bgr if buffer is not None else None)
+    if not ret:
+        if buffer is not None:
+            buffer.release()
+        return None, pool
+
+    if buffer is None or bgr is not buffer.bgr:
+        # OpenCV allocated a new array because the size did not match the pool.
+        if buffer is not None:
+            buffer.release()
+        pool = FramePool(bgr.shape)
+        buffer = pool.acquire()
+        np.copyto(buffer.bgr, bgr)
+    buffer.captured_ms = captured_ms
+
+    if metrics is None:
+        cv2.cvtColor(buffer.bgr, cv2.COLOR_BGR2RGB, dst=buffer.rgb)
+    else:
+        with metrics.measure("color_convert"):
+            cv2.cvtColor(buffer.bgr, cv2.COLOR_BGR2RGB, dst=buffer.rgb)
+    return buffer, pool
+
 
 class CameraController:
-    def __init__(self, index: int = 0, size: tuple[int, int] = (1920, 1080), fps: int = 30):
+    """
+    :param mode: Capture mode to open the camera with, usually the one stored in the profile. When
+        omitted, or when it no longer opens, every backend and pixel format is tried and the fastest
+        is kept in self.mode. Opening can therefore take a few seconds and belongs off the GUI thread.
+    """
+
+    def __init__(self, index: int = 0, size: tuple[int, int] = (1920, 1080), fps: int = 30,
+                 mode: CaptureMode | None = None):
         self.index = index
+        self.metrics: PipelineMetrics | None = None
+        self.pool: FramePool | None = None
+        self.mode = mode
 
-        self.camera = cv2.VideoCapture(index)
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
-        self.camera.set(cv2.CAP_PROP_FPS, fps)
+        self.camera = open_capture(index, mode) if mode is not None else None
+        if self.camera is None or not self.camera.isOpened():
+            if self.camera is not None:
+                self.camera.release()
+            self.camera, self.mode = negotiate(index, size, fps)
+            if self.mode is None:
+                self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+                self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+                self.camera.set(cv2.CAP_PROP_FPS, fps)
+        self.settings: CameraSettings | None = read_settings(self.camera) if self.camera.isOpened() else None
 
-    def get_frame(self) -> np.ndarray | None:
-        ret, frame = self.camera.read()
-        if not ret:
-            return None
-        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def acquire_frame(self) -> FrameBuffer | None:
+        """
+        Read the next frame into a reused buffer. The caller owns one reference and must release()
+        it once nothing reads buffer.rgb any more.
+        """
+        buffer, self.pool = read_into_pool(self.camera, self.pool, self.metrics)
+        return buffer
 
     def is_open(self) -> bool:
         return self.camera.isOpened()
 
-    def __del__(self):
+    def release(self):
         if self.camera.isOpened():
             self.camera.release()
+
+    def __del__(self):
+        self.release()
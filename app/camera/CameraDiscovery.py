@@ -0,0 +1,63 @@
+import glob
+import sys
+import threading
+from typing import Callable
+
+import cv2
+
+
+class CameraDiscovery:
+    """
+    Finds usable camera indexes on a background thread. Opening an absent index can block for a
+    second or more, so scans never run on the GUI thread. On Linux, rescans are skipped while the
+    set of /dev/video* nodes is unchanged, which makes periodic hot-plug checks nearly free.
+
+    :param max_index: Highest camera index probed, exclusive.
+    """
+
+    def __init__(self, max_index: int = 10):
+        self.max_index = max_index
+        self._thread: threading.Thread | None = None
+        self._device_signature: tuple[str, ...] | None = None
+
+    @property
+    def is_scanning(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @staticmethod
+    def _current_signature() -> tuple[str, ...] | None:
+        if sys.platform.startswith("linux"):
+            return tuple(sorted(glob.glob("/dev/video*")))
+        return None
+
+    def devices_changed(self) -> bool:
+        """True when a rescan could find something new. Always True where device nodes cannot be listed."""
+        signature = self._current_signature()
+        return signature is None or signature != self._device_signature
+
+    def scan_async(self, on_done: Callable[[list[int]], None], in_use: set[int] | None = None) -> bool:
+        """
+        Probe every index on a background thread and call on_done with the available ones from that
+        thread. Indexes in in_use are reported without being reopened. Returns False if a scan is
+        already running.
+        """
+        if self.is_scanning:
+            return False
+        in_use = set(in_use or ())
+        self._device_signature = self._current_signature()
+
+        def scan():
+            available = []
+            for index in range(self.max_index):
+                if index in in_use:
+                    available.append(index)
+                    continue
+                capture = cv2.VideoCapture(index)
+                if capture.isOpened():
+                    available.append(index)
+                capture.release()
+            on_done(available)
+
+        self._thread = threading.Thread(target=scan, name="wave-vision-camera-scan", daemon=True)
+        self._thread.start()
+        return True
@@ -0,0 +1,188 @@
+import math
+import sys
+import time
+from dataclasses import asdict, dataclass, fields, replace
+
+import cv2
+
+FOURCCS = ("MJPG", "YUYV")
+
+
+@dataclass(frozen=True)
+class CaptureMode:
+    """
+    How a camera is opened. Stored per profile so negotiation only runs once per device.
+
+    :param backend: OpenCV capture backend name without the CAP_ prefix, e.g. "V4L2", "DSHOW" or "ANY".
+    :param fourcc: Pixel format requested from the driver. MJPG usually allows higher frame rates
+        over USB; YUYV skips JPEG decoding.
+    :param buffer_size: Frames the driver may queue. 1 means every read returns the newest frame.
+    :param auto_exposure: Let the camera choose exposure. Many webcams lower their frame rate to
+        lengthen exposure in dim rooms; negotiate() switches it off when that happens.
+    :param exposure: Manual exposure value, in the driver's units, used when auto_exposure is off.
+        See manual_exposure().
+    """
+    backend: str
+    fourcc: str
+    width: int
+    height: int
+    fps: float
+    buffer_size: int = 1
+    auto_exposure: bool = True
+    exposure: float | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CaptureMode | None":
+        """Rebuild a stored mode, or None if nothing usable was stored."""
+        names = {field.name for field in fields(cls)}
+        try:
+            return cls(**{key: value for key, value in data.items() if key in names})
+        except TypeError:
+            return None
+
+
+@dataclass(frozen=True)
+class CameraSettings:
+    """What the driver actually applied, read back after opening."""
+    backend: str
+    fourcc: str
+    width: int
+    height: int
+    fps: float
+    buffer_size: int
+    auto_exposure: float
+    exposure: float
+
+    def describe(self) -> str:
+        return (f"{self.backend} {self.fourcc or '?'} {self.width}x{self.height} @ {self.fps:g} fps, "
+                f"buffer {self.buffer_size}, exposure {self.exposure:g} (auto {self.auto_exposure:g})")
+
+
+def preferred_backends() -> list[str]:
+    """Capture backends to try on this platform, lowest latency first."""
+    if sys.platform.startswith("linux"):
+        return ["V4L2"]
+    if sys.platform == "win32":
+        # DirectShow honours a 1-frame buffer and opens much faster than Media Foundation.
+        return ["DSHOW", "MSMF"]
+    if sys.platform == "darwin":
+        return ["AVFOUNDATION"]
+    return ["ANY"]
+
+
+def _exposure_values(backend: str) -> tuple[float, float]:
+    # (auto, manual) values of CAP_PROP_AUTO_EXPOSURE. V4L2 uses its menu indexes; the others the
+    # 0.75 / 0.25 convention inherited from the old libv4l mapping.
+    return (3, 1) if backend == "V4L2" else (0.75, 0.25)
+
+
+def manual_exposure(backend: str, fps: float) -> float:
+    """The longest manual exposure, in the backend's units, that still fits in one frame at fps."""
+    seconds = 0.9 / fps
+    if backend in ("DSHOW", "MSMF"):
+        # log2 of the exposure time in seconds.
+        return float(math.floor(math.log2(seconds)))
+    # V4L2's exposure_absolute counts 100 µs steps; other backends pass the value on as is.
+    return float(int(seconds * 10000))
+
+
+def open_capture(index: int, mode: CaptureMode) -> cv2.VideoCapture:
+    capture = cv2.VideoCapture(index, getattr(cv2, f"CAP_{mode.backend}", cv2.CAP_ANY))
+    if not capture.isOpened():
+        return capture
+    # The pixel format has to be set before the size and rate it constrains.
+    capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*mode.fourcc))
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, mode.width)
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, mode.height)
+    capture.set(cv2.CAP_PROP_FPS, mode.fps)
+    capture.set(cv2.CAP_PROP_BUFFERSIZE, mode.buffer_size)
+    auto, manual = _exposure_values(mode.backend)
+    capture.set(cv2.CAP_PROP_AUTO_EXPOSURE, auto if mode.auto_exposure else manual)
+    if not mode.auto_exposure and mode.exposure is not None:
+        capture.set(cv2.CAP_PROP_EXPOSURE, mode.exposure)
+    return capture
+
+
+def read_settings(capture: cv2.VideoCapture) -> CameraSettings:
+    code = int(capture.get(cv2.CAP_PROP_FOURCC))
+    fourcc = "".join(chr((code >> shift) & 0xFF) for shift in (0, 8, 16, 24)).strip("\0 ")
+    try:
+        backend = capture.getBackendName()
+    except cv2.error:
+        backend = "?"
+    return CameraSettings(
+        backend=backend,
+        fourcc=fourcc,
+        width=int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        height=int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        fps=round(capture.get(cv2.CAP_PROP_FPS), 2),
+        buffer_size=int(capture.get(cv2.CAP_PROP_BUFFERSIZE)),
+        auto_exposure=capture.get(cv2.CAP_PROP_AUTO_EXPOSURE),
+        exposure=capture.get(cv2.CAP_PROP_EXPOSURE),
+    )
+
+
+def measure_fps(capture: cv2.VideoCapture, frames: int = 8, warmup: int = 2) -> float:
+    """Frame rate the device actually delivers, from timing consecutive grabs."""
+    for _ in range(warmup):
+        if not capture.grab():
+            return 0.0
+    start = time.perf_counter()
+    for _ in range(frames):
+        if not capture.grab():
+            return 0.0
+    return frames / (time.perf_counter() - start)
+
+
+def negotiate(index: int, size: tuple[int, int], fps: float) -> tuple[cv2.VideoCapture, CaptureMode | None]:
+    """
+    Try every backend and pixel format this platform offers at the requested size and rate and keep
+    the one that delivers the highest measured frame rate at the requested size, preferring earlier
+    candidates on a tie. If that mode falls short of fps, usually because auto exposure lengthened
+    the frames in a dim room, a manual exposure that fits in one frame is tried and kept when it
+    restores the rate. Returns the open capture and the chosen mode, or a default-opened capture and
+    None if no candidate worked.
+    """
+    best: tuple[tuple, CaptureMode, float] | None = None
+    seen = set()
+    for preference, (backend, fourcc) in enumerate((b, f) for b in preferred_backends() for f in FOURCCS):
+        mode = CaptureMode(backend=backend, fourcc=fourcc, width=size[0], height=size[1], fps=fps)
+        # Each candidate is closed before the next, since most drivers allow one open handle per device.
+        capture = open_capture(index, mode)
+        try:
+            if not capture.isOpened():
+                continue
+            settings = read_settings(capture)
+            effective = (settings.backend, settings.fourcc, settings.width, settings.height)
+            if effective in seen:
+                # The driver ignored the requested format and gave us a mode already measured.
+                continue
+            seen.add(effective)
+            measured = measure_fps(capture)
+        finally:
+            capture.release()
+
+        # Measured rates are bucketed so frame-timing jitter does not override the preference order.
+        score = ((settings.width, settings.height) == tuple(size), round(measured / 5), -preference)
+        if best is None or score > best[0]:
+            best = (score, mode, measured)
+
+    if best is not None and best[2] < 0.9 * fps:
+        manual = replace(best[1], auto_exposure=False, exposure=manual_exposure(best[1].backend, fps))
+        capture = open_capture(index, manual)
+        try:
+            measured = measure_fps(capture) if capture.isOpened() else 0.0
+        finally:
+            capture.release()
+        if round(measured / 5) > round(best[2] / 5):
+            best = (best[0], manual, measured)
+
+    if best is not None:
+        capture = open_capture(index, best[1])
+        if capture.isOpened():
+            return capture, best[1]
+        capture.release()
+    return cv2.VideoCapture(index), None
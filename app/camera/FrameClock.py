@@ -0,0 +1,28 @@
+import threading
+import time
+
+
+def monotonic_ms() -> float:
+    """Now, on the clock that frame timestamps are taken from."""
+    return time.monotonic_ns() / 1_000_000
+
+
+class FrameClock:
+    """
+    Issues frame timestamps in integer milliseconds on the monotonic clock. Wall-clock time can jump
+    when the system clock is adjusted, and two frames can arrive within the same millisecond, but
+    MediaPipe's streaming modes reject any timestamp that is not greater than the previous one, so
+    every stamp is at least one millisecond after the last.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = 0
+
+    def stamp(self, at_ms: float | None = None) -> int:
+        """Timestamp for a frame captured at at_ms (see monotonic_ms), or now."""
+        timestamp_ms = int(monotonic_ms() if at_ms is None else at_ms)
+        with self._lock:
+            timestamp_ms = max(timestamp_ms, self._last_ms + 1)
+            self._last_ms = timestamp_ms
+        return timestamp_ms
@@ -0,0 +1,59 @@
+import threading
+
+import numpy as np
+
+
+class FrameBuffer:
+    """
+    A reusable pair of BGR (as read from the camera) and RGB (as sent to the landmarker) arrays.
+    Reference counted: every stage still reading the frame holds a reference, and the buffer only
+    returns to its pool once the last one is released. captured_ms is when the frame was grabbed,
+    on the FrameClock.monotonic_ms clock.
+    """
+    __slots__ = ("bgr", "rgb", "captured_ms", "_pool", "_lock", "_refs")
+
+    def __init__(self, shape: tuple[int, ...], pool: "FramePool | None" = None):
+        self.bgr = np.empty(shape, dtype=np.uint8)
+        self.rgb = np.empty(shape, dtype=np.uint8)
+        self.captured_ms = 0.0
+        self._pool = pool
+        self._lock = pool.lock if pool is not None else threading.Lock()
+        self._refs = 0
+
+    def retain(self) -> "FrameBuffer":
+        with self._lock:
+            self._refs += 1
+        return self
+
+    def release(self):
+        with self._lock:
+            self._refs -= 1
+            if self._refs > 0 or self._pool is None:
+                return
+            self._pool.free.append(self)
+
+
+class FramePool:
+    """
+    Fixed ring of preallocated FrameBuffers so capture does not allocate two full frames per read.
+    When every buffer is still in flight a temporary one is allocated and counted in misses, rather
+    than stalling capture.
+
+    :param shape: (height, width, 3) of the camera frames.
+    :param count: Number of buffers, covering the capture, queue, inference and in-flight stages.
+    """
+
+    def __init__(self, shape: tuple[int, ...], count: int = 8):
+        self.shape = shape
+        self.lock = threading.Lock()
+        self.free: list[FrameBuffer] = [FrameBuffer(shape, self) for _ in range(count)]
+        self.misses = 0
+
+    def acquire(self) -> FrameBuffer:
+        with self.lock:
+            buffer = self.free.pop() if self.free else None
+            if buffer is None:
+                self.misses += 1
+        if buffer is None:
+            buffer = FrameBuffer(self.shape)
+        return buffer.retain()
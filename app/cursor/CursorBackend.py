@@ -0,0 +1,79 @@
+import sys
+import threading
+
+import pyautogui
+from pyautogui import FailSafeException
+
+
+class CursorBackend:
+    """Moves the system pointer. Subclasses talk to the platform directly to avoid pyautogui's per-call overhead."""
+    name = "base"
+
+    def move(self, x: int, y: int):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiBackend(CursorBackend):
+    name = "pyautogui"
+
+    def move(self, x: int, y: int):
+        try:
+            pyautogui.moveTo(x, y, duration=0, _pause=False)
+        except FailSafeException:
+            pass
+
+
+class XTestBackend(CursorBackend):
+    """Linux/X11 pointer motion through the XTest extension, using the python-xlib that pyautogui already depends on."""
+    name = "xtest"
+
+    def __init__(self):
+        from Xlib import X, display
+        from Xlib.ext import xtest
+
+        self._display = display.Display()
+        if not self._display.has_extension("XTEST"):
+            self._display.close()
+            raise RuntimeError("X server has no XTEST extension")
+        self._motion = X.MotionNotify
+        self._fake_input = xtest.fake_input
+        self._lock = threading.Lock()
+
+    def move(self, x: int, y: int):
+        with self._lock:
+            self._fake_input(self._display, self._motion, x=x, y=y)
+            self._display.flush()
+
+    def close(self):
+        with self._lock:
+            self._display.close()
+
+
+class Win32Backend(CursorBackend):
+    name = "win32"
+
+    def __init__(self):
+        import ctypes
+        self._set_cursor_pos = ctypes.windll.user32.SetCursorPos
+
+    def move(self, x: int, y: int):
+        self._set_cursor_pos(x, y)
+
+
+def create_backend() -> CursorBackend:
+    """Pick the lowest-overhead backend available on this platform, falling back to pyautogui."""
+    candidates = []
+    if sys.platform.startswith("linux"):
+        candidates.append(XTestBackend)
+    elif sys.platform == "win32":
+        candidates.append(Win32Backend)
+
+    for backend in candidates:
+        try:
+            return backend()
+        except Exception:
+            continue
+    return PyAutoGuiBackend()
@@ -1,24 +1,148 @@
+import threading
+import time
+
 import pyautogui
-from pyautogui import FailSafeException
+
+from app.cursor.CursorBackend import CursorBackend, create_backend
+from app.metrics.PipelineMetrics import PipelineMetrics
 
 
 class CursorController:
-    def __init__(self):
+    """
+    :param actuation_hz: Rate of the actuation thread started by start(). Each new target is
+        approached from where the pointer is over about one result interval, then followed along
+        the target velocity until the next one arrives, so the pointer glides at this rate instead
+        of stepping at camera rate. 0 moves the pointer directly on every move_to().
+    :param max_extrapolation_s: How far past the latest target the actuation thread may extrapolate
+        before holding still, so a stalled tracker never sends the pointer drifting.
+    :param backend: Pointer backend. The fastest one for this platform is chosen when omitted.
+    """
+
+    def __init__(self, actuation_hz: float = 0.0, max_extrapolation_s: float = 0.05,
+                 backend: CursorBackend | None = None):
         pyautogui.MINIMUM_DURATION = 0
         pyautogui.MINIMUM_SLEEP = 0
         pyautogui.PAUSE = 0
+        self.metrics: PipelineMetrics | None = None
+        self.backend = backend if backend is not None else create_backend()
+        self.actuation_hz = actuation_hz
+        self.max_extrapolation_s = max_extrapolation_s
+
+        self._lock = threading.Lock()
+        # (x, y, frame time in seconds) of the latest target.
+        self._target: tuple[float, float, float] | None = None
+        self._velocity = (0.0, 0.0)
+        # Smoothed time between results, in frame time.
+        self._interval = 0.0
+        # The glide to the latest target: where it starts, and when and for how long, in wall time.
+        self._glide: tuple[float, float, float, float] | None = None
+        self._position: tuple[float, float] | None = None
+        self._last_sent: tuple[int, int] | None = None
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        if self._thread is not None or self.actuation_hz <= 0:
+            return
+        self._stop_event.clear()
+        with self._lock:
+            self._target = None
+            self._velocity = (0.0, 0.0)
+            self._interval = 0.0
+            self._glide = None
+            self._position = None
+        self._thread = threading.Thread(target=self._actuation_loop, name="wave-vision-cursor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def move_to(self, x: float, y: float, timestamp_ms: float | None = None):
+        """
+        Move the pointer, or hand the position to the actuation thread as its new target while it runs.
 
-    def move_to(self, x: float, y: float):
-        try:
-            pyautogui.moveTo(x, y, duration=0, _pause=False)
-        except FailSafeException:
-            pass
+        :param timestamp_ms: Capture time of the frame the position comes from. Velocity is measured
+            between frames rather than between calls, so queueing jitter does not show up in it.
+        """
+        if self._thread is None:
+            self._move(int(x), int(y))
+            return
+
+        now = time.perf_counter()
+        frame_time = timestamp_ms / 1000 if timestamp_ms is not None else now
+        with self._lock:
+            if self._target is not None:
+                previous_x, previous_y, previous_time = self._target
+                dt = frame_time - previous_time
+                if dt > 0:
+                    self._velocity = ((x - previous_x) / dt, (y - previous_y) / dt)
+                    self._interval = dt if self._interval == 0 else 0.8 * self._interval + 0.2 * dt
+            self._target = (x, y, frame_time)
+            if self._position is not None:
+                # Never longer than the extrapolation limit, so a slow tracker does not make the pointer lag.
+                duration = min(max(self._interval, 1.0 / self.actuation_hz), self.max_extrapolation_s)
+                self._glide = (*self._position, now, duration)
+
+    def _move(self, x: int, y: int):
+        start = time.perf_counter()
+        self.backend.move(x, y)
+        self._last_sent = (x, y)
+        if self.metrics is not None:
+            self.metrics.record("move_to", (time.perf_counter() - start) * 1000)
+
+    def _pointer_position(self, now: float) -> tuple[float, float] | None:
+        """Where the pointer should be at now, or None before the first target."""
+        with self._lock:
+            target, velocity, glide = self._target, self._velocity, self._glide
+        if target is None:
+            return None
+        x, y = target[0], target[1]
+        if glide is None:
+            return x, y
+        start_x, start_y, started_at, duration = glide
+        elapsed = now - started_at
+        if elapsed < duration:
+            progress = elapsed / duration
+            return start_x + (x - start_x) * progress, start_y + (y - start_y) * progress
+        ahead = min(elapsed - duration, self.max_extrapolation_s)
+        return x + velocity[0] * ahead, y + velocity[1] * ahead
+
+    def _actuation_loop(self):
+        period = 1.0 / self.actuation_hz
+        next_tick = time.perf_counter()
+        while not self._stop_event.is_set():
+            position = self._pointer_position(time.perf_counter())
+            if position is not None:
+                with self._lock:
+                    self._position = position
+                pixel = (int(position[0]), int(position[1]))
+                if pixel != self._last_sent:
+                    self._move(*pixel)
+
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                # Fell behind (e.g. a slow backend call); resynchronise instead of bursting.
+                next_tick = time.perf_counter()
 
     def click(self):
         pyautogui.click()
 
+    def right_click(self):
+        pyautogui.rightClick()
+
+    def scroll(self, clicks: int):
+        """Scroll the wheel by clicks, positive for up."""
+        pyautogui.scroll(clicks)
+
     def grab(self):
         pyautogui.mouseDown()
 
     def release(self):
-        pyautogui.mouseUp()
\ No newline at end of file
+        pyautogui.mouseUp()
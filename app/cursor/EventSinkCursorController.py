@@ -0,0 +1,66 @@
+import json
+import threading
+import time
+from typing import Callable, TextIO
+
+from app.metrics.PipelineMetrics import PipelineMetrics
+
+# (event, data): "move" {"x", "y"}, "click", "right_click", "scroll" {"clicks"}, "grab" or "release".
+EventSink = Callable[[str, dict], None]
+
+# Seats writing to the same file do so from their own actuation threads.
+_write_lock = threading.Lock()
+
+
+def json_lines_sink(file: TextIO, seat: str) -> EventSink:
+    """An EventSink that writes each event as a JSON line tagged with the seat's name."""
+    def write(event: str, data: dict):
+        line = json.dumps({"seat": seat, "time": time.time(), "event": event, **data}) + "\n"
+        with _write_lock:
+            file.write(line)
+            file.flush()
+
+    return write
+
+
+class EventSinkCursorController:
+    """
+    Stand-in for CursorController that passes every pointer action to a callback instead of moving
+    the real pointer, for seats whose hand drives something other than this machine's desktop.
+    Like RecordingCursorController it never imports pyautogui.
+    """
+
+    def __init__(self, sink: EventSink):
+        self.sink = sink
+        self.metrics: PipelineMetrics | None = None
+        self._last_position: tuple[int, int] | None = None
+
+    def start(self):
+        self._last_position = None
+
+    def stop(self):
+        pass
+
+    def move_to(self, x: float, y: float, timestamp_ms: float | None = None):
+        start = time.perf_counter()
+        position = (int(x), int(y))
+        if position != self._last_position:
+            self._last_position = position
+            self.sink("move", {"x": position[0], "y": position[1]})
+        if self.metrics is not None:
+            self.metrics.record("move_to", (time.perf_counter() - start) * 1000)
+
+    def click(self):
+        self.sink("click", {})
+
+    def right_click(self):
+        self.sink("right_click", {})
+
+    def scroll(self, clicks: int):
+        self.sink("scroll", {"clicks": clicks})
+
+    def grab(self):
+        self.sink("grab", {})
+
+    def release(self):
+        self.sink("release", {})
@@ -0,0 +1,42 @@
+import time
+
+from app.metrics.PipelineMetrics import PipelineMetrics
+
+
+class RecordingCursorController:
+    """
+    Stand-in for CursorController that records every action instead of moving the real pointer.
+    Used for headless replay and benchmarks, so it must never import pyautogui.
+    """
+
+    def __init__(self):
+        self.metrics: PipelineMetrics | None = None
+        self.moves: list[tuple[float, float, float]] = []
+        self.events: list[tuple[float, str]] = []
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def move_to(self, x: float, y: float, timestamp_ms: float | None = None):
+        start = time.perf_counter()
+        self.moves.append((start, x, y))
+        if self.metrics is not None:
+            self.metrics.record("move_to", (time.perf_counter() - start) * 1000)
+
+    def click(self):
+        self.events.append((time.perf_counter(), "click"))
+
+    def right_click(self):
+        self.events.append((time.perf_counter(), "right_click"))
+
+    def scroll(self, clicks: int):
+        self.events.append((time.perf_counter(), f"scroll {clicks}"))
+
+    def grab(self):
+        self.events.append((time.perf_counter(), "grab"))
+
+    def release(self):
+        self.events.append((time.perf_counter(), "release"))
@@ -1,196 +1,273 @@
-from app.camera.CameraController import CameraController
-from app.cursor.CursorController import CursorController
-from app.system.SystemController import SystemController
-from app.ui.UIController import UIController
-from app.tracking.TrackingController import TrackingController
-from app.tracking.TrackingParams import TrackingParams
-from app.preferences.PreferencesController import PreferencesController, Profile
+import time
+
+# Taken before any other import so the startup report includes import costs.
+_STARTED_AT = time.perf_counter()
+
+import argparse
+import concurrent.futures
+from typing import Callable
+
+from app.metrics.StartupTimer import StartupTimer
+from app.service.TrackingService import TrackingService
 
 
 class Application:
-    def __init__(self):
-        self.preferences = PreferencesController()
-        profiles = self.preferences.get_all_profiles()
-        self.current_profile = profiles[0] if profiles else None
-
-        self.tracking_controller = TrackingController(
-            TrackingParams(
-                area_size_x=640,
-                area_size_y=480,
-                model_path="models/hand_landmarker.task"
-            )
-        )
-        self.cursor_controller = CursorController()
-        self.camera_controller = CameraController(
-            self.current_profile.camera_index,
-            size=(640, 480),
-            fps=60
-        )
-        self.system_controller = SystemController(
-            camera_controller=self.camera_controller,
-            tracking_controller=self.tracking_controller,
-            cursor_controller=self.cursor_controller
-        )
+    """
+    The Qt window, as a client of a TrackingService that owns preferences and the tracking pipeline.
 
-        self._apply_profile_settings()
-        self.ui = UIController(self)
-        self.ui.load_profiles(
-            [p.name for p in profiles],
-            self.current_profile.name
-        )
-        self.ui.update_settings_ui(
-            self.current_profile.camera_index,
-            self.current_profile.sensitivity,
-            self.current_profile.smoothing,
-            self.current_profile.pinch_threshold
+    :param control_socket: Also serve the local control API on this Unix socket, so scripts can
+        drive the running window just like the headless daemon. "" selects the default path.
+    """
+
+    def __init__(self, metrics_export_path: str | None = None, record_path: str | None = None,
+                 isolated_inference: bool = False, startup_report_path: str | None = None, max_hands: int = 1,
+                 flow_interval: int = 1, max_frame_age_ms: float | None = 100.0, inference_target_ms: float = 25.0,
+                 control_socket: str | None = None):
+        self.startup = StartupTimer(_STARTED_AT)
+        # The window exists only after the service, so posting goes through it lazily.
+        self.service = TrackingService(
+            post=lambda fn: self.ui.post(fn),
+            startup=self.startup,
+            metrics_export_path=metrics_export_path,
+            record_path=record_path,
+            isolated_inference=isolated_inference,
+            startup_report_path=startup_report_path,
+            max_hands=max_hands,
+            flow_interval=flow_interval,
+            max_frame_age_ms=max_frame_age_ms,
+            inference_target_ms=inference_target_ms
         )
+        self.service.add_listener(self._on_service_event)
+        self.control_server = None
+        self.control_socket = control_socket
+
+        with self.startup.phase("import PySide6"):
+            from app.ui.UIController import UIController
+        with self.startup.phase("build window"):
+            self.ui = UIController(self)
+            profile = self.service.current_profile
+            self.ui.set_available_cameras(self.service.available_cameras(), profile.camera_index)
+            self.ui.load_profiles(self.service.profile_names(), profile.name)
+            self.ui.set_monitors(self.ui.screen_rects(), profile.monitor)
+            self.ui.update_settings_ui(profile)
+            self.ui.set_ready(False)
 
-    def _apply_profile_settings(self):
-        self.tracking_controller.alpha = self.current_profile.smoothing
-        self.tracking_controller.sensitivity = self.current_profile.sensitivity
-        self.tracking_controller.pinch_threshold = self.current_profile.pinch_threshold
+    @property
+    def current_profile(self):
+        return self.service.current_profile
+
+    @property
+    def is_ready(self) -> bool:
+        return self.service.is_ready
+
+    def _on_service_event(self, event: str, payload):
+        ui = self.ui
+        if event == "status":
+            ui.update_status(payload)
+        elif event == "ready":
+            ui.set_ready(True)
+        elif event == "tracking":
+            ui.set_tracking_state(payload)
+        elif event == "profile":
+            ui.update_settings_ui(payload)
+        elif event == "profiles":
+            ui.load_profiles(*payload)
+        elif event == "camera":
+            ui.set_camera_settings(payload)
+        elif event == "cameras":
+            ui.set_available_cameras(payload, self.current_profile.camera_index)
+        elif event == "calibrating":
+            ui.set_calibrating(payload)
+
+    def _dispatch(self, fn: Callable[[], object]) -> concurrent.futures.Future:
+        """Run fn on the GUI thread for the control server and hand its result back."""
+        future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                future.set_exception(e)
+
+        self.ui.post(run)
+        return future
 
     def load_profile(self, profile_name: str):
-        profile = self.preferences.get_profile_by_name(profile_name)
-        if profile:
-            self.current_profile = profile
-            self._apply_profile_settings()
-            self.ui.update_settings_ui(
-                profile.camera_index,
-                profile.sensitivity,
-                profile.smoothing,
-                profile.pinch_threshold
-            )
-            self.switch_camera(profile.camera_index)
+        self.service.load_profile(profile_name)
 
     def update_camera(self, camera_index: int):
-        self.current_profile.camera_index = camera_index
-        self.preferences.update_profile(self.current_profile)
-        self.switch_camera(camera_index)
+        self.service.update_camera(camera_index)
+
+    def redetect_camera_mode(self):
+        self.service.redetect_camera_mode()
 
     def update_sensitivity(self, value: float):
-        self.current_profile.sensitivity = value
-        self.tracking_controller.sensitivity = value
-        self.preferences.update_profile(self.current_profile)
+        self.service.update_sensitivity(value)
 
     def update_smoothing(self, value: float):
-        self.current_profile.smoothing = value
-        self.tracking_controller.alpha = value
-        self.preferences.update_profile(self.current_profile)
+        self.service.update_smoothing(value)
+
+    def update_filter_type(self, filter_type: str):
+        self.service.update_filter_type(filter_type)
+
+    def update_latency_compensation(self, enabled: bool):
+        self.service.update_latency_compensation(enabled)
 
     def update_pinch_threshold(self, value: float):
-        self.current_profile.pinch_threshold = value
-        self.tracking_controller.pinch_threshold = value
-        self.preferences.update_profile(self.current_profile)
+        self.service.update_pinch_threshold(value)
 
-    def create_profile(self, name: str) -> bool:
-        if self.preferences.get_profile_by_name(name):
-            return False
-
-        new_profile = Profile(
-            id=None,
-            name=name,
-            camera_index=self.current_profile.camera_index,
-            sensitivity=self.current_profile.sensitivity,
-            smoothing=self.current_profile.smoothing,
-            pinch_threshold=self.current_profile.pinch_threshold
-        )
-        profile_id = self.preferences.create_profile(new_profile)
-        new_profile.id = profile_id
+    def update_gesture_action(self, gesture: str, action: str):
+        self.service.update_gesture_action(gesture, action)
 
-        profiles = self.preferences.get_all_profiles()
-        self.ui.load_profiles([p.name for p in profiles], name)
-        self.current_profile = new_profile
-        self.ui.update_status(f"Profile '{name}' created.")
-        return True
+    def update_monitor(self, monitor: int):
+        self.service.update_monitor(monitor)
 
-    def save_current_profile(self):
-        self.preferences.update_profile(self.current_profile)
+    def on_screens_changed(self, screens: list[tuple[int, int, int, int]]):
+        """Remap onto the new monitor layout as soon as a display is added, removed or moved."""
+        self.ui.set_monitors(screens, self.current_profile.monitor)
+        self.service.set_screens(screens)
+        self.ui.update_status(f"Display layout changed: {len(screens)} monitor(s).")
 
-    def rename_profile(self, old_name: str, new_name: str) -> bool:
-        if self.preferences.get_profile_by_name(new_name):
-            return False
+    def toggle_calibration(self):
+        self.service.toggle_calibration()
+
+    def reset_calibration(self):
+        self.service.reset_calibration()
+
+    def update_power_saving(self, enabled: bool):
+        self.service.update_power_saving(enabled)
 
-        self.current_profile.name = new_name
-        self.preferences.update_profile(self.current_profile)
+    def update_idle_fps(self, value: float):
+        self.service.update_idle_fps(value)
 
-        profiles = self.preferences.get_all_profiles()
-        self.ui.load_profiles([p.name for p in profiles], new_name)
-        self.ui.update_status(f"Profile renamed to '{new_name}'.")
-        return True
+    def create_profile(self, name: str) -> bool:
+        return self.service.create_profile(name)
+
+    def save_current_profile(self):
+        self.service.save_current_profile()
+
+    def rename_profile(self, old_name: str, new_name: str) -> bool:
+        return self.service.rename_profile(old_name, new_name)
 
     def delete_profile(self, name: str) -> bool:
-        profiles = self.preferences.get_all_profiles()
-        if len(profiles) <= 1:
-            return False
-
-        profile = self.preferences.get_profile_by_name(name)
-        if profile and profile.id:
-            self.preferences.delete_profile(profile.id)
-
-            profiles = self.preferences.get_all_profiles()
-            self.current_profile = profiles[0]
-            self._apply_profile_settings()
-            self.ui.load_profiles([p.name for p in profiles], self.current_profile.name)
-            self.ui.update_settings_ui(
-                self.current_profile.camera_index,
-                self.current_profile.sensitivity,
-                self.current_profile.smoothing,
-                self.current_profile.pinch_threshold
-            )
-            self.switch_camera(self.current_profile.camera_index)
-            self.ui.update_status(f"Profile '{name}' deleted.")
-            return True
-        return False
+        return self.service.delete_profile(name)
 
-    def switch_camera(self, camera_index: int):
-        try:
-            was_running = self.system_controller.is_running
-            if was_running:
-                self.system_controller.stop()
-
-            del self.camera_controller
-            self.camera_controller = CameraController(camera_index, size=(640, 480), fps=60)
-            self.system_controller = SystemController(
-                camera_controller=self.camera_controller,
-                tracking_controller=self.tracking_controller,
-                cursor_controller=self.cursor_controller
-            )
+    def set_preview_enabled(self, enabled: bool):
+        if enabled:
+            self.service.set_preview(lambda frame, _: self.ui.post(lambda: self.ui.show_preview_frame(frame)))
+        else:
+            self.service.set_preview(None)
 
-            if was_running:
-                self.system_controller.start()
+    def rescan_cameras(self, force: bool = False):
+        self.service.rescan_cameras(force)
 
-            self.ui.update_status(f"Switched to camera {camera_index}")
-        except Exception as e:
-            self.ui.update_status(f"Error switching to camera {camera_index}: {e}")
+    def get_metrics(self) -> dict:
+        return self.service.get_metrics()
 
     def start_tracking(self):
-        if self.camera_controller.is_open():
-            self.system_controller.start()
-            self.ui.set_tracking_state(True)
-            self.ui.update_status("Tracking system started.")
-        else:
-            self.ui.update_status("Error: Camera not available.")
+        self.service.start_tracking()
 
     def stop_tracking(self):
-        self.system_controller.stop()
-        self.ui.set_tracking_state(False)
-        self.ui.update_status("Tracking system stopped.")
+        self.service.stop_tracking()
 
     def run(self):
         self.ui.show()
-
+        # Queued behind the window's first paint, so startup is timed to a visible window.
+        self.ui.post(self._on_window_shown)
         try:
-            while not self.ui.is_closed():
-                self.ui.update()
-                self.system_controller.update()
-        except KeyboardInterrupt:
-            print("\nShutting down...")
+            # Tracking runs on the service's own threads; the event loop only serves the window.
+            self.ui.exec()
         finally:
-            self.system_controller.stop()
+            if self.control_server is not None:
+                self.control_server.stop_thread()
+            self.service.close()
             self.ui.close()
-            self.preferences.close()
+
+    def _on_window_shown(self):
+        self.startup.mark("window shown")
+        self.service.screens = self.ui.screen_rects()
+        # Actuate at the display's refresh rate so the pointer glides between camera-rate results.
+        self.service.actuation_hz = max(self.ui.refresh_rate(), 60.0)
+        self.service.initialize()
+        if self.control_socket is not None:
+            from app.service.ControlServer import ControlServer
+            self.control_server = ControlServer(self.service, self.control_socket or None, dispatch=self._dispatch)
+            try:
+                self.control_server.start_in_thread()
+                self.ui.update_status(f"Control socket: {self.control_server.path}")
+            except (OSError, RuntimeError) as e:
+                self.ui.update_status(f"Error: control socket unavailable: {e}")
+                self.control_server = None
 
 
 if __name__ == "__main__":
-    Application().run()
+    parser = argparse.ArgumentParser(description="Wave Vision hand-tracking mouse control.")
+    parser.add_argument("--metrics-export", metavar="PATH",
+                        help="Append a JSON-lines snapshot of pipeline timings to PATH every second.")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Record captured frames and tracking results to DIR for offline replay.")
+    parser.add_argument("--startup-report", metavar="PATH",
+                        help="Append a JSON-lines report of import and initialization timings to PATH.")
+    parser.add_argument("--max-hands", type=int, choices=(1, 2), default=1,
+                        help="Track up to this many hands. The first drives the cursor; either can gesture.")
+    parser.add_argument("--isolated-inference", action="store_true",
+                        help="Run hand detection in a separate process so it never contends with the UI for the GIL.")
+    parser.add_argument("--flow-interval", type=int, default=1, metavar="N",
+                        help="Run hand detection on every Nth frame only and follow the hand with optical flow "
+                             "in between. Raises the cursor update rate on slow CPUs.")
+    parser.add_argument("--max-frame-age-ms", type=float, default=100.0, metavar="MS",
+                        help="Drop frames that are older than this by the time hand detection is free, "
+                             "instead of tracking where the hand was. 0 keeps every frame.")
+    parser.add_argument("--inference-target-ms", type=float, default=25.0, metavar="MS",
+                        help="On first start, use the fastest installed hand model and delegate whose detection "
+                             "time stays under MS on this machine. See app.benchmark.inference_benchmark.")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without a window, controlled through the control socket.")
+    parser.add_argument("--control-socket", metavar="PATH", nargs="?", const="",
+                        help="Serve the local control API on this Unix socket (always on when headless). "
+                             "Without PATH a per-user default is used.")
+    parser.add_argument("--seat", action="append", metavar="CAMERA[:PROFILE[:OUTPUT]]",
+                        help="Multi-seat: track this camera with this profile, headless. Repeat for every seat. "
+                             "OUTPUT is 'cursor', '-' (pointer events as JSON lines on stdout, the default) or a file.")
+    parser.add_argument("--landmarker-workers", type=int, default=2, metavar="N",
+                        help="Multi-seat: hand detection threads shared by all seats.")
+    parser.add_argument("--profile", metavar="NAME", help="Headless: load this profile instead of the first one.")
+    parser.add_argument("--start", action="store_true", help="Headless: start tracking as soon as it is ready.")
+    args = parser.parse_args()
+
+    options = dict(
+        metrics_export_path=args.metrics_export,
+        record_path=args.record,
+        isolated_inference=args.isolated_inference,
+        startup_report_path=args.startup_report,
+        max_hands=args.max_hands,
+        flow_interval=args.flow_interval,
+        max_frame_age_ms=args.max_frame_age_ms or None,
+        inference_target_ms=args.inference_target_ms
+    )
+    if args.seat:
+        from app.service.MultiSeatDaemon import MultiSeatDaemon, SeatSpec
+        try:
+            seats = [SeatSpec.parse(seat) for seat in args.seat]
+            daemon = MultiSeatDaemon(
+                seats,
+                workers=args.landmarker_workers,
+                max_hands=args.max_hands,
+                max_frame_age_ms=args.max_frame_age_ms or None,
+                inference_target_ms=args.inference_target_ms,
+                metrics_export_path=args.metrics_export
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        daemon.run()
+    elif args.headless:
+        from app.service.Daemon import Daemon
+        Daemon(
+            socket_path=args.control_socket or None,
+            profile=args.profile,
+            start_tracking=args.start,
+            startup=StartupTimer(_STARTED_AT),
+            **options
+        ).run()
+    else:
+        Application(control_socket=args.control_socket, **options).run()
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class PipelineMetrics:
+    """
+    Per-stage timing histograms and frame counters for the tracking loop. Safe to record into
+    from the capture, inference, MediaPipe callback and actuation threads at the same time.
+
+    :param window: Number of most recent samples kept per stage for percentile estimates.
+    """
+    STAGES = ("camera_read", "color_convert", "roi_crop", "detect_submit", "result_latency", "gesture_classify",
+              "move_to", "preview_offer", "flow_track", "frame_age", "capture_latency")
+
+    def __init__(self, window: int = 512):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = {}
+        self._capture_times: deque[float] = deque(maxlen=window)
+        self._output_times: deque[float] = deque(maxlen=window)
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_skipped = 0
+        self.frames_expired = 0
+        self.results_stale = 0
+        self.results_delivered = 0
+
+        self._export_thread: threading.Thread | None = None
+        self._export_stop = threading.Event()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._samples = {stage: deque(maxlen=self.window) for stage in self.STAGES}
+            self._capture_times.clear()
+            self._output_times.clear()
+            self.frames_captured = 0
+            self.frames_dropped = 0
+            self.frames_skipped = 0
+            self.frames_expired = 0
+            self.results_stale = 0
+            self.results_delivered = 0
+
+    def record(self, stage: str, duration_ms: float):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(duration_ms)
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def record_capture(self):
+        with self._lock:
+            self.frames_captured += 1
+            self._capture_times.append(time.perf_counter())
+
+    def record_delivered(self):
+        with self._lock:
+            self.results_delivered += 1
+            self._output_times.append(time.perf_counter())
+
+    def record_dropped(self, count: int = 1):
+        with self._lock:
+            self.frames_dropped += count
+
+    def record_skipped(self, count: int = 1):
+        with self._lock:
+            self.frames_skipped += count
+
+    def record_expired(self, count: int = 1):
+        with self._lock:
+            self.frames_expired += count
+
+    def record_stale(self, count: int = 1):
+        with self._lock:
+            self.results_stale += count
+
+    @staticmethod
+    def _rate(times: list[float]) -> float:
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+            capture_times = list(self._capture_times)
+            output_times = list(self._output_times)
+            snapshot = {
+                "time": time.time(),
+                "frames_captured": self.frames_captured,
+                "frames_dropped": self.frames_dropped,
+                "frames_skipped": self.frames_skipped,
+                "frames_expired": self.frames_expired,
+                "results_stale": self.results_stale,
+                "results_delivered": self.results_delivered,
+            }
+
+        snapshot["capture_fps"] = round(self._rate(capture_times), 2)
+        snapshot["effective_fps"] = round(self._rate(output_times), 2)
+        stages = {}
+        for stage, values in samples.items():
+            if not values:
+                stages[stage] = {"count": 0, "p50": None, "p95": None, "p99": None}
+                continue
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            stages[stage] = {"count": len(values), "p50": round(float(p50), 3),
+                             "p95": round(float(p95), 3), "p99": round(float(p99), 3)}
+        snapshot["stages"] = stages
+        return snapshot
+
+    def export(self, path: str):
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(self.snapshot()) + "\n")
+
+    def start_export(self, path: str, interval_s: float = 1.0):
+        """Append a snapshot to a JSON-lines file every interval_s seconds until stop_export()."""
+        self.stop_export()
+        self._export_stop.clear()
+
+        def export_loop():
+            while not self._export_stop.wait(interval_s):
+                self.export(path)
+
+        self._export_thread = threading.Thread(target=export_loop, name="wave-vision-metrics-export", daemon=True)
+        self._export_thread.start()
+
+    def stop_export(self):
+        if self._export_thread is not None:
+            self._export_stop.set()
+            self._export_thread.join(timeout=2.0)
+            self._export_thread = None
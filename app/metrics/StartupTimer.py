@@ -0,0 +1,59 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """
+    Records how long each import and initialization phase of application start-up takes, measured
+    from the given start time (usually when the entry module was first imported).
+
+    :param started_at: time.perf_counter() value that marks process start.
+    """
+
+    def __init__(self, started_at: float | None = None):
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self._lock = threading.Lock()
+        self.phases: list[dict] = []
+        self.marks: dict[str, float] = {}
+
+    def _elapsed_ms(self, at: float) -> float:
+        return round((at - self.started_at) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block, e.g. `with timer.phase("import mediapipe"):`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.phases.append({
+                    "phase": name,
+                    "thread": threading.current_thread().name,
+                    "start_ms": self._elapsed_ms(start),
+                    "duration_ms": round((end - start) * 1000, 1),
+                })
+
+    def mark(self, name: str):
+        """Record a milestone, such as the window first being shown or tracking becoming available."""
+        with self._lock:
+            self.marks[name] = self._elapsed_ms(time.perf_counter())
+
+    def report(self) -> dict:
+        with self._lock:
+            return {"time": time.time(), "marks": dict(self.marks), "phases": list(self.phases)}
+
+    def summary(self) -> str:
+        report = self.report()
+        marks = ", ".join(f"{name} {ms:.0f} ms" for name, ms in report["marks"].items())
+        slowest = sorted(report["phases"], key=lambda phase: phase["duration_ms"], reverse=True)[:3]
+        phases = ", ".join(f"{phase['phase']} {phase['duration_ms']:.0f} ms" for phase in slowest)
+        return f"Startup: {marks}. Slowest: {phases}."
+
+    def export(self, path: str):
+        """Append the report to a JSON-lines file so start-up cost can be compared across releases."""
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(self.report()) + "\n")
@@ -1,5 +1,13 @@
+import copy
+import json
+import logging
 import sqlite3
-from dataclasses import dataclass
+import threading
+import typing
+from dataclasses import dataclass, field, fields, replace
+from typing import Callable
+
+from app.tracking.Gestures import DEFAULT_GESTURE_MAP
 
 
 @dataclass
@@ -10,29 +18,142 @@ class Profile:
     sensitivity: float
     smoothing: float
     pinch_threshold: float
+    power_saving: bool = True
+    idle_fps: float = 5.0
+    idle_timeout_s: float = 2.0
+    filter_type: str = "ema"
+    filter_min_cutoff: float = 1.0
+    filter_beta: float = 0.01
+    filter_process_noise: float = 2000.0
+    filter_measurement_noise: float = 4.0
+    latency_compensation: bool = False
+    gesture_map: dict[str, str] = field(default_factory=lambda: dict(DEFAULT_GESTURE_MAP))
+    # CaptureMode.to_dict() of the mode negotiated for camera_index; empty until one is negotiated.
+    camera_mode: dict[str, object] = field(default_factory=dict)
+    # Monitor index the cursor is confined to, or -1 for the whole desktop.
+    monitor: int = -1
+    # Calibrated active region as four [x, y] corners; empty for the default centered area.
+    calibration: list[list[float]] = field(default_factory=list)
+    # Hand landmarker model file and delegate ("cpu" or "gpu"); empty to use the configuration the
+    # start-up benchmark picked for this machine.
+    model_path: str = ""
+    delegate: str = ""
+    min_detection_confidence: float = 0.5
+    min_presence_confidence: float = 0.5
+    min_tracking_confidence: float = 0.5
+
+
+PROFILE_FIELDS = [field.name for field in fields(Profile) if field.name != "id"]
+BOOL_FIELDS = [field.name for field in fields(Profile) if field.type is bool]
+# Stored as JSON text.
+JSON_FIELDS = [field.name for field in fields(Profile) if typing.get_origin(field.type) in (dict, list)]
+
+
+def _add_missing_columns(cursor: sqlite3.Cursor, columns: dict[str, str]):
+    existing = {row["name"] for row in cursor.execute("PRAGMA table_info(profiles)")}
+    for column, declaration in columns.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE profiles ADD COLUMN {column} {declaration}")
+
+
+def _create_tables(cursor: sqlite3.Cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            camera_index INTEGER NOT NULL,
+            sensitivity REAL NOT NULL,
+            smoothing REAL NOT NULL,
+            pinch_threshold REAL NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+
+
+def _add_tracking_columns(cursor: sqlite3.Cursor):
+    # Databases from before schema versioning may already have some of these.
+    _add_missing_columns(cursor, {
+        "power_saving": "INTEGER NOT NULL DEFAULT 1",
+        "idle_fps": "REAL NOT NULL DEFAULT 5.0",
+        "idle_timeout_s": "REAL NOT NULL DEFAULT 2.0",
+        "filter_type": "TEXT NOT NULL DEFAULT 'ema'",
+        "filter_min_cutoff": "REAL NOT NULL DEFAULT 1.0",
+        "filter_beta": "REAL NOT NULL DEFAULT 0.01",
+        "filter_process_noise": "REAL NOT NULL DEFAULT 2000.0",
+        "filter_measurement_noise": "REAL NOT NULL DEFAULT 4.0",
+        "latency_compensation": "INTEGER NOT NULL DEFAULT 0",
+        "gesture_map": "TEXT NOT NULL DEFAULT '{}'",
+    })
+
+
+def _add_camera_mode_column(cursor: sqlite3.Cursor):
+    cursor.execute("ALTER TABLE profiles ADD COLUMN camera_mode TEXT NOT NULL DEFAULT '{}'")
+
+
+def _add_screen_mapping_columns(cursor: sqlite3.Cursor):
+    cursor.execute("ALTER TABLE profiles ADD COLUMN monitor INTEGER NOT NULL DEFAULT -1")
+    cursor.execute("ALTER TABLE profiles ADD COLUMN calibration TEXT NOT NULL DEFAULT '[]'")
+
+
+def _add_inference_columns(cursor: sqlite3.Cursor):
+    cursor.execute("ALTER TABLE profiles ADD COLUMN model_path TEXT NOT NULL DEFAULT ''")
+    cursor.execute("ALTER TABLE profiles ADD COLUMN delegate TEXT NOT NULL DEFAULT ''")
+    cursor.execute("ALTER TABLE profiles ADD COLUMN min_detection_confidence REAL NOT NULL DEFAULT 0.5")
+    cursor.execute("ALTER TABLE profiles ADD COLUMN min_presence_confidence REAL NOT NULL DEFAULT 0.5")
+    cursor.execute("ALTER TABLE profiles ADD COLUMN min_tracking_confidence REAL NOT NULL DEFAULT 0.5")
+
+
+# Applied in order; PRAGMA user_version records how many have run. To add a per-profile setting,
+# add the Profile field and append a migration that adds its column. Never edit a shipped migration.
+MIGRATIONS: list[Callable[[sqlite3.Cursor], None]] = [
+    _create_tables,
+    _add_tracking_columns,
+    _add_camera_mode_column,
+    _add_screen_mapping_columns,
+    _add_inference_columns,
+]
 
 
 class PreferencesController:
-    def __init__(self, db_path: str = "preferences.db"):
+    """
+    Profiles and settings backed by SQLite, served from an in-memory cache. Reads never touch the
+    database after start-up. Updates are queued and written behind by a background thread, which
+    coalesces bursts of edits (e.g. holding a spin box arrow) into one transaction every
+    flush_delay_s. Creating and deleting profiles is written immediately, after the queued edits
+    (a queued rename may free the name being created). close() flushes. Edits whose write fails
+    stay queued and are retried.
+
+    :param db_path: SQLite database file.
+    :param flush_delay_s: How long queued edits may wait before being written.
+    :param on_error: Called on the writer thread with the error when a background write fails, once
+        until a write succeeds again. Errors are logged when omitted.
+    """
+
+    def __init__(self, db_path: str = "preferences.db", flush_delay_s: float = 0.5,
+                 on_error: Callable[[Exception], None] | None = None):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self._initialize_db()
+        self.flush_delay_s = flush_delay_s
+        self.on_error = on_error
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._db_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._profiles: dict[int, Profile] = {}
+        self._settings: dict = {}
+        self._pending_profiles: dict[int, Profile] = {}
+        self._pending_settings: dict = {}
+        self._dirty = threading.Event()
+        self._closing = threading.Event()
+        self._closed = False
 
-    def _initialize_db(self):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS profiles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                camera_index INTEGER NOT NULL,
-                sensitivity REAL NOT NULL,
-                smoothing REAL NOT NULL,
-                pinch_threshold REAL NOT NULL
-            )
-        """)
-        self.conn.commit()
-
-        if not self.get_all_profiles():
+        self._initialize_db()
+        self._load()
+        if not self._profiles:
             self.create_profile(Profile(
                 id=None,
                 name="Default",
@@ -42,55 +163,161 @@ class PreferencesController:
                 pinch_threshold=0.05
             ))
 
+        self._writer = threading.Thread(target=self._write_loop, name="wave-vision-preferences", daemon=True)
+        self._writer.start()
+
+    def _initialize_db(self):
+        # WAL lets the writer commit without blocking readers; NORMAL sync skips an fsync per commit.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            with self.conn:
+                migration(self.conn.cursor())
+                self.conn.execute(f"PRAGMA user_version = {number}")
+
+    def _load(self):
+        for row in self.conn.execute("SELECT * FROM profiles ORDER BY id"):
+            profile = self._row_to_profile(row)
+            self._profiles[profile.id] = profile
+        for row in self.conn.execute("SELECT key, value FROM settings"):
+            self._settings[row["key"]] = json.loads(row["value"])
+
+    @staticmethod
+    def _row_to_profile(row: sqlite3.Row) -> Profile:
+        profile = Profile(**{key: row[key] for key in ["id", *PROFILE_FIELDS]})
+        for name in BOOL_FIELDS:
+            setattr(profile, name, bool(getattr(profile, name)))
+        for name in JSON_FIELDS:
+            setattr(profile, name, json.loads(getattr(profile, name)))
+        # Gestures added after a profile was saved keep their default action.
+        profile.gesture_map = {**DEFAULT_GESTURE_MAP, **profile.gesture_map}
+        return profile
+
+    @staticmethod
+    def _copy(profile: Profile) -> Profile:
+        """Callers edit the profiles they get back, so the cache only ever hands out copies."""
+        return replace(profile, **{name: copy.deepcopy(getattr(profile, name)) for name in JSON_FIELDS})
+
+    @staticmethod
+    def _column_values(profile: Profile) -> list:
+        return [json.dumps(getattr(profile, name)) if name in JSON_FIELDS else getattr(profile, name)
+                for name in PROFILE_FIELDS]
+
     def create_profile(self, profile: Profile) -> int:
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO profiles (name, camera_index, sensitivity, smoothing, pinch_threshold)
-            VALUES (?, ?, ?, ?, ?)
-        """, (profile.name, profile.camera_index, profile.sensitivity, profile.smoothing, profile.pinch_threshold))
-        self.conn.commit()
-        return cursor.lastrowid
+        self.flush()
+        with self._db_lock, self.conn:
+            cursor = self.conn.execute(f"""
+                INSERT INTO profiles ({", ".join(PROFILE_FIELDS)})
+                VALUES ({", ".join("?" for _ in PROFILE_FIELDS)})
+            """, self._column_values(profile))
+        profile_id = cursor.lastrowid
+        with self._lock:
+            self._profiles[profile_id] = self._copy(replace(profile, id=profile_id))
+        return profile_id
 
     def get_profile(self, profile_id: int) -> Profile | None:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM profiles WHERE id = ?", (profile_id,))
-        row = cursor.fetchone()
-        if row:
-            return Profile(id=row[0], name=row[1], camera_index=row[2],
-                         sensitivity=row[3], smoothing=row[4], pinch_threshold=row[5])
-        return None
+        with self._lock:
+            profile = self._profiles.get(profile_id)
+            return self._copy(profile) if profile else None
 
     def get_profile_by_name(self, name: str) -> Profile | None:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM profiles WHERE name = ?", (name,))
-        row = cursor.fetchone()
-        if row:
-            return Profile(id=row[0], name=row[1], camera_index=row[2],
-                         sensitivity=row[3], smoothing=row[4], pinch_threshold=row[5])
-        return None
+        with self._lock:
+            profile = next((p for p in self._profiles.values() if p.name == name), None)
+            return self._copy(profile) if profile else None
 
     def get_all_profiles(self) -> list[Profile]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM profiles")
-        rows = cursor.fetchall()
-        return [Profile(id=row[0], name=row[1], camera_index=row[2],
-                       sensitivity=row[3], smoothing=row[4], pinch_threshold=row[5])
-                for row in rows]
+        with self._lock:
+            return [self._copy(profile) for profile in self._profiles.values()]
 
     def update_profile(self, profile: Profile):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE profiles
-            SET name = ?, camera_index = ?, sensitivity = ?, smoothing = ?, pinch_threshold = ?
-            WHERE id = ?
-        """, (profile.name, profile.camera_index, profile.sensitivity,
-              profile.smoothing, profile.pinch_threshold, profile.id))
-        self.conn.commit()
+        with self._lock:
+            if profile.id not in self._profiles:
+                return
+            self._profiles[profile.id] = self._pending_profiles[profile.id] = self._copy(profile)
+        self._dirty.set()
 
     def delete_profile(self, profile_id: int):
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
-        self.conn.commit()
+        with self._lock:
+            self._profiles.pop(profile_id, None)
+            self._pending_profiles.pop(profile_id, None)
+        self.flush()
+        with self._db_lock, self.conn:
+            self.conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+
+    def get_setting(self, key: str, default=None):
+        with self._lock:
+            return self._settings.get(key, default)
+
+    def set_setting(self, key: str, value):
+        with self._lock:
+            self._settings[key] = self._pending_settings[key] = value
+        self._dirty.set()
+
+    def flush(self):
+        """Write every queued edit in one transaction. If it fails, the edits stay queued and the error is raised."""
+        with self._lock:
+            profiles, self._pending_profiles = self._pending_profiles, {}
+            settings, self._pending_settings = self._pending_settings, {}
+        if not profiles and not settings:
+            return
+
+        try:
+            with self._db_lock, self.conn:
+                self.conn.executemany(f"""
+                    UPDATE profiles
+                    SET {", ".join(f"{name} = ?" for name in PROFILE_FIELDS)}
+                    WHERE id = ?
+                """, [[*self._column_values(profile), profile.id] for profile in profiles.values()])
+                self.conn.executemany("""
+                    INSERT INTO settings (key, value) VALUES (?, ?)
+                    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                """, [(key, json.dumps(value)) for key, value in settings.items()])
+        except sqlite3.Error:
+            with self._lock:
+                # Edits queued while this write ran are newer and win; deleted profiles stay deleted.
+                for profile_id, profile in profiles.items():
+                    if profile_id in self._profiles:
+                        self._pending_profiles.setdefault(profile_id, profile)
+                for key, value in settings.items():
+                    self._pending_settings.setdefault(key, value)
+            self._dirty.set()
+            raise
+
+    def _write_loop(self):
+        failing = False
+        while not self._closed:
+            self._dirty.wait()
+            if self._closed:
+                break
+            # Let a burst of edits settle so it lands in a single commit; close() flushes the rest.
+            if self._closing.wait(self.flush_delay_s):
+                break
+            self._dirty.clear()
+            try:
+                self.flush()
+                failing = False
+            except sqlite3.Error as e:
+                if not failing:
+                    self._report(e)
+                failing = True
+
+    def _report(self, error: Exception):
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            logging.getLogger(__name__).error("Failed to save preferences: %s", error)
 
     def close(self):
-        self.conn.close()
+        if self._closed:
+            return
+        self._closed = True
+        self._closing.set()
+        self._dirty.set()
+        self._writer.join(timeout=2.0)
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            self._report(e)
+        with self._db_lock:
+            self.conn.close()
@@ -0,0 +1,87 @@
+import json
+import os
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+from app.tracking.TrackingResult import TrackingResult
+
+VIDEO_FILE = "video.avi"
+FRAMES_FILE = "frames.jsonl"
+TRACE_FILE = "trace.jsonl"
+
+
+class FrameRecorder:
+    """
+    Writes captured frames to an MJPEG video plus a JSON-lines file of their capture timestamps,
+    and tracking results to a separate trace, so a session can be replayed by ReplayCameraController.
+    Encoding happens on a background thread so recording never stalls the capture stage.
+
+    :param directory: Output directory, created if missing.
+    :param fps: Nominal frame rate stored in the video header. Replay uses the recorded timestamps.
+    """
+
+    def __init__(self, directory: str, fps: float = 30.0):
+        self.directory = directory
+        self.fps = fps
+        self.frames_written = 0
+        self.frames_dropped = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self._writer: cv2.VideoWriter | None = None
+        self._frames_file = open(os.path.join(directory, FRAMES_FILE), "w", encoding="utf-8")
+        self._trace_file = open(os.path.join(directory, TRACE_FILE), "w", encoding="utf-8")
+        self._trace_lock = threading.Lock()
+        self._queue: queue.Queue[tuple[int, np.ndarray] | None] = queue.Queue(maxsize=120)
+        self._thread = threading.Thread(target=self._write_loop, name="wave-vision-recorder", daemon=True)
+        self._thread.start()
+
+    def write_frame(self, timestamp_ms: int, frame: np.ndarray):
+        """
+        Queue a BGR frame for encoding. The frame is copied, since capture buffers are reused, and
+        dropped rather than blocking when the encoder lags.
+        """
+        if self._queue.full():
+            self.frames_dropped += 1
+            return
+        self._queue.put_nowait((timestamp_ms, frame.copy()))
+
+    def write_result(self, timestamp_ms: int, result: TrackingResult):
+        line = json.dumps({
+            "timestamp_ms": timestamp_ms,
+            "cursor": [result.cursor_position_x, result.cursor_position_y],
+            "raw": [result.raw_position_x, result.raw_position_y],
+            "pinch_distance": result.pinch_distance,
+            "pressed": result.pressed,
+            "gestures": list(result.gestures),
+        })
+        with self._trace_lock:
+            if not self._trace_file.closed:
+                self._trace_file.write(line + "\n")
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            timestamp_ms, frame = item
+            if self._writer is None:
+                height, width = frame.shape[:2]
+                self._writer = cv2.VideoWriter(os.path.join(self.directory, VIDEO_FILE),
+                                               cv2.VideoWriter_fourcc(*"MJPG"), self.fps, (width, height))
+            self._writer.write(frame)
+            self._frames_file.write(json.dumps({"frame": self.frames_written, "timestamp_ms": timestamp_ms}) + "\n")
+            self.frames_written += 1
+
+    def close(self):
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        if self._writer is not None:
+            self._writer.release()
+        self._frames_file.close()
+        with self._trace_lock:
+            self._trace_file.close()
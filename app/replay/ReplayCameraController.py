@@ -0,0 +1,70 @@
+import json
+import os
+import time
+
+import cv2
+
+from app.camera.CameraController import read_into_pool
+from app.camera.FramePool import FrameBuffer, FramePool
+from app.metrics.PipelineMetrics import PipelineMetrics
+from app.replay.FrameRecorder import FRAMES_FILE, VIDEO_FILE
+
+
+class ReplayCameraController:
+    """
+    Drop-in replacement for CameraController that plays back a FrameRecorder directory.
+
+    :param directory: Recording directory containing the video and frame timestamps.
+    :param realtime: Pace frames by their recorded timestamps instead of returning them as fast as possible.
+    :param speed: Playback speed multiplier when realtime is set.
+    """
+
+    def __init__(self, directory: str, realtime: bool = True, speed: float = 1.0):
+        self.index = directory
+        self.realtime = realtime
+        self.speed = speed
+        self.metrics: PipelineMetrics | None = None
+        self.pool: FramePool | None = None
+        self.finished = False
+        self.frames_read = 0
+        self.last_timestamp_ms: int | None = None
+
+        with open(os.path.join(directory, FRAMES_FILE), encoding="utf-8") as file:
+            self.timestamps = [json.loads(line)["timestamp_ms"] for line in file if line.strip()]
+        self.camera = cv2.VideoCapture(os.path.join(directory, VIDEO_FILE))
+        self.started_at: float | None = None
+
+    def acquire_frame(self) -> FrameBuffer | None:
+        if self.finished:
+            return None
+        if self.frames_read >= len(self.timestamps):
+            self.finished = True
+            return None
+
+        timestamp_ms = self.timestamps[self.frames_read]
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        if self.realtime:
+            due = self.started_at + (timestamp_ms - self.timestamps[0]) / 1000 / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        buffer, self.pool = read_into_pool(self.camera, self.pool, self.metrics)
+        if buffer is None:
+            self.finished = True
+            return None
+
+        self.frames_read += 1
+        self.last_timestamp_ms = timestamp_ms
+        return buffer
+
+    def is_open(self) -> bool:
+        return self.camera.isOpened()
+
+    def release(self):
+        if self.camera.isOpened():
+            self.camera.release()
+
+    def __del__(self):
+        self.release()
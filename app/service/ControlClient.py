@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from typing import AsyncIterator
+
+from app.service.ControlServer import default_socket_path
+
+
+class ControlError(Exception):
+    """A command was rejected by the server."""
+
+
+class ControlClient:
+    """
+    asyncio client for ControlServer. Responses are matched to requests by id, so events pushed after
+    subscribe() can arrive between them.
+
+    :param path: Socket of a running `python -m app.main --headless` or `--control-socket` instance.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or default_socket_path()
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._receiver: asyncio.Task | None = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._receiver = asyncio.create_task(self._receive_loop())
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+        if self._receiver is not None:
+            self._receiver.cancel()
+
+    async def __aenter__(self) -> "ControlClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def request(self, command: str, **args) -> object:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write((json.dumps({"id": request_id, "command": command, "args": args}) + "\n").encode())
+        await self._writer.drain()
+        return await future
+
+    async def subscribe(self, events: list[str], interval_s: float = 1.0) -> list[str]:
+        return await self.request("subscribe", events=events, interval_s=interval_s)
+
+    async def events(self) -> AsyncIterator[tuple[str, object]]:
+        """(event, data) pairs pushed by the server, until the connection closes."""
+        while (item := await self._events.get()) is not None:
+            yield item
+
+    async def _receive_loop(self):
+        try:
+            while line := await self._reader.readline():
+                message = json.loads(line)
+                if "event" in message:
+                    self._events.put_nowait((message["event"], message["data"]))
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if message["ok"]:
+                    future.set_result(message.get("result"))
+                else:
+                    future.set_exception(ControlError(message.get("error")))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("control connection closed"))
+            self._pending.clear()
+            self._events.put_nowait(None)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    async with ControlClient(args.socket) as client:
+        if args.command == "watch":
+            await client.subscribe(["status", "tracking", "profile", "metrics"], interval_s=args.interval)
+            async for event, data in client.events():
+                print(json.dumps({"event": event, "data": data}), flush=True)
+            return 0
+        command_args = {"name": args.name} if args.command == "load_profile" else {}
+        try:
+            result = await client.request(args.command, **command_args)
+        except ControlError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(json.dumps(result, indent=2))
+        return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Control a running Wave Vision instance.")
+    parser.add_argument("--socket", default=None, help=f"Control socket (default {default_socket_path()}).")
+    parser.add_argument("command", choices=("status", "start", "stop", "profiles", "profile", "load_profile",
+                                            "metrics", "watch", "shutdown"),
+                        help="'watch' streams status, tracking and profile events and metrics until interrupted.")
+    parser.add_argument("name", nargs="?", help="Profile name for load_profile.")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between metrics snapshots for watch.")
+    args = parser.parse_args()
+    if args.command == "load_profile" and not args.name:
+        parser.error("load_profile needs a profile name")
+    try:
+        return asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        return 0
+    except (ConnectionError, FileNotFoundError) as e:
+        print(f"Could not reach Wave Vision at {args.socket or default_socket_path()}: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import asyncio
+import concurrent.futures
+import json
+import os
+import socket
+import stat
+import tempfile
+import threading
+from dataclasses import asdict, is_dataclass
+from typing import Callable
+
+from app.service.TrackingService import TrackingService
+
+# Runs a callable on the service's owner thread and returns a future for its result.
+Dispatcher = Callable[[Callable[[], object]], concurrent.futures.Future]
+
+
+def default_socket_path() -> str:
+    """Per-user socket location: $XDG_RUNTIME_DIR when set (private to the user), else the temp directory."""
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(directory, f"wave-vision-{os.getuid()}.sock" if hasattr(os, "getuid") else "wave-vision.sock")
+
+
+def _to_json(value: object) -> object:
+    return asdict(value) if is_dataclass(value) else value
+
+
+class ControlServer:
+    """
+    Local control API for a TrackingService over a Unix domain socket, served by asyncio.
+
+    Clients send one JSON object per line, {"id": 1, "command": "start", "args": {}}, and get one
+    line back per request, {"id": 1, "ok": true, "result": ...} or {"id": 1, "ok": false, "error": "..."}.
+    After "subscribe" the server also pushes {"event": name, "data": ...} lines for the chosen
+    service events and, when "metrics" is subscribed, a pipeline metrics snapshot every interval_s.
+
+    Commands: status, start, stop, profiles, profile, load_profile {name}, metrics,
+    subscribe {events, interval_s}, shutdown (only when the host passed on_shutdown).
+
+    :param dispatch: Runs commands on the service's owner thread when that is not the thread serving
+        the socket, e.g. the GUI thread. Commands run directly on the event loop when omitted.
+    :param on_shutdown: Called on the event loop thread when a client sends "shutdown".
+    """
+
+    def __init__(self, service: TrackingService, path: str | None = None, dispatch: Dispatcher | None = None,
+                 on_shutdown: Callable[[], None] | None = None):
+        self.service = service
+        self.path = path or default_socket_path()
+        self.dispatch = dispatch
+        self.on_shutdown = on_shutdown
+        self._server: asyncio.AbstractServer | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Connection writer -> the events it subscribed to.
+        self._subscribers: dict[asyncio.StreamWriter, set[str]] = {}
+        self._thread: threading.Thread | None = None
+        self._stopped: asyncio.Event | None = None
+
+    async def start(self):
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("The control socket needs Unix domain socket support, which this platform lacks.")
+        self._loop = asyncio.get_running_loop()
+        if os.path.exists(self.path):
+            self._remove_stale_socket()
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.path)
+        os.chmod(self.path, 0o600)
+        self.service.add_listener(self._on_service_event)
+
+    def _remove_stale_socket(self):
+        """Remove a socket left behind by a process that did not shut down cleanly, but not a live one."""
+        if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+            raise RuntimeError(f"{self.path} exists and is not a socket.")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.settimeout(1.0)
+            probe.connect(self.path)
+        except ConnectionRefusedError:
+            os.unlink(self.path)
+            return
+        except OSError as e:
+            raise RuntimeError(f"{self.path} exists and is not a usable control socket: {e}") from e
+        finally:
+            probe.close()
+        raise RuntimeError(f"Wave Vision is already running and serving {self.path}.")
+
+    async def stop(self):
+        self.service.remove_listener(self._on_service_event)
+        if self._server is None:
+            # Never served, so the socket at path, if any, belongs to someone else.
+            return
+        self._server.close()
+        for writer in list(self._subscribers):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def start_in_thread(self):
+        """Serve on a private event loop thread, for hosts such as the GUI that own their main thread."""
+        started = threading.Event()
+        errors: list[BaseException] = []
+
+        async def serve():
+            self._stopped = asyncio.Event()
+            try:
+                await self.start()
+            except BaseException as e:
+                errors.append(e)
+                return
+            finally:
+                started.set()
+            await self._stopped.wait()
+            await self.stop()
+
+        self._thread = threading.Thread(target=lambda: asyncio.run(serve()), name="wave-vision-control", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+
+    def stop_thread(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stopped.set)
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    async def _call(self, fn: Callable[[], object]) -> object:
+        if self.dispatch is None:
+            return fn()
+        return await asyncio.wrap_future(self.dispatch(fn))
+
+    def _on_service_event(self, event: str, payload: object):
+        # Called on the service's owner thread, which may not be the event loop's.
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._broadcast, event, _to_json(payload))
+
+    def _broadcast(self, event: str, data: object):
+        line = (json.dumps({"event": event, "data": data}) + "\n").encode()
+        for writer, events in list(self._subscribers.items()):
+            if event in events and not writer.is_closing():
+                writer.write(line)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        metrics_task: asyncio.Task | None = None
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    command = request["command"]
+                    args = request.get("args") or {}
+                except (ValueError, KeyError, TypeError):
+                    writer.write(b'{"ok": false, "error": "malformed request"}\n')
+                    continue
+
+                response = {"id": request.get("id"), "ok": True}
+                try:
+                    if command == "subscribe":
+                        events = set(args.get("events", ("status", "tracking", "profile", "ready")))
+                        self._subscribers[writer] = events
+                        if metrics_task is not None:
+                            metrics_task.cancel()
+                            metrics_task = None
+                        if "metrics" in events:
+                            interval_s = max(float(args.get("interval_s", 1.0)), 0.05)
+                            metrics_task = asyncio.create_task(self._stream_metrics(writer, interval_s))
+                        response["result"] = sorted(events)
+                    else:
+                        response["result"] = _to_json(await self._run(command, args))
+                except Exception as e:
+                    response = {"id": request.get("id"), "ok": False, "error": str(e)}
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if metrics_task is not None:
+                metrics_task.cancel()
+            self._subscribers.pop(writer, None)
+            writer.close()
+
+    async def _run(self, command: str, args: dict) -> object:
+        service = self.service
+        if command == "status":
+            return await self._call(service.status)
+        if command == "start":
+            return await self._call(service.start_tracking)
+        if command == "stop":
+            await self._call(service.stop_tracking)
+            return True
+        if command == "profiles":
+            return await self._call(lambda: {"profiles": service.profile_names(), "current": service.current_profile.name})
+        if command == "profile":
+            return await self._call(lambda: service.current_profile)
+        if command == "load_profile":
+            name = args["name"]
+            if not await self._call(lambda: service.load_profile(name)):
+                raise ValueError(f"no profile named {name!r}")
+            return True
+        if command == "metrics":
+            return await self._call(service.get_metrics)
+        if command == "shutdown" and self.on_shutdown is not None:
+            self.on_shutdown()
+            return True
+        raise ValueError(f"unknown command {command!r}")
+
+    async def _stream_metrics(self, writer: asyncio.StreamWriter, interval_s: float):
+        try:
+            while not writer.is_closing():
+                await asyncio.sleep(interval_s)
+                metrics = await self._call(self.service.get_metrics)
+                writer.write((json.dumps({"event": "metrics", "data": metrics}) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
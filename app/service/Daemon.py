@@ -0,0 +1,79 @@
+import asyncio
+import signal
+from typing import Callable
+
+from app.metrics.StartupTimer import StartupTimer
+from app.service.ControlServer import ControlServer
+from app.service.TrackingService import TrackingService
+
+
+class Daemon:
+    """
+    Runs tracking without a window, for kiosks and start-at-login setups. The service is owned by an
+    asyncio event loop on the main thread, which also serves the control socket; status messages go
+    to stdout. Stops on SIGINT, SIGTERM or a "shutdown" command.
+
+    :param socket_path: Control socket to serve; see ControlServer.
+    :param profile: Name of the profile to load instead of the first one.
+    :param start_tracking: Start tracking as soon as the pipeline is ready.
+    :param service_options: Passed on to TrackingService.
+    """
+
+    def __init__(self, socket_path: str | None = None, profile: str | None = None, start_tracking: bool = False,
+                 startup: StartupTimer | None = None, **service_options):
+        self.socket_path = socket_path
+        self.profile = profile
+        self.start_tracking = start_tracking
+        self.startup = startup
+        self.service_options = service_options
+        self.service: TrackingService | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+
+    def _post(self, fn: Callable[[], None]):
+        try:
+            self._loop.call_soon_threadsafe(fn)
+        except RuntimeError:
+            # The loop has shut down; late results from background threads are dropped.
+            pass
+
+    def _on_event(self, event: str, payload: object):
+        if event == "status":
+            print(payload, flush=True)
+        elif event == "ready" and self.start_tracking:
+            self.service.start_tracking()
+
+    def stop(self):
+        """Ask run() to shut down. Must be called on the event loop thread."""
+        self._stop.set()
+
+    def run(self):
+        try:
+            asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            pass
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Not supported on Windows; Ctrl+C still raises KeyboardInterrupt there.
+                pass
+
+        self.service = TrackingService(post=self._post, startup=self.startup, **self.service_options)
+        self.service.add_listener(self._on_event)
+        server = ControlServer(self.service, self.socket_path, on_shutdown=self.stop)
+        try:
+            await server.start()
+            print(f"Control socket: {server.path}", flush=True)
+            if self.profile and not self.service.load_profile(self.profile):
+                print(f"No profile named '{self.profile}'; using '{self.service.current_profile.name}'.", flush=True)
+            self.service.initialize()
+            await self._stop.wait()
+            print("Shutting down...", flush=True)
+        finally:
+            await server.stop()
+            self.service.close()
@@ -0,0 +1,177 @@
+import json
+import signal
+import sys
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app.preferences.PreferencesController import PreferencesController
+
+if TYPE_CHECKING:
+    from app.system.MultiSeatController import MultiSeatController
+
+
+def _say(message: str):
+    # stdout may be carrying seat events.
+    print(message, file=sys.stderr, flush=True)
+
+
+@dataclass(frozen=True)
+class SeatSpec:
+    """
+    One --seat argument, CAMERA[:PROFILE[:OUTPUT]].
+
+    :param output: "cursor" to drive this machine's pointer, "-" to write the seat's pointer events
+        to stdout as JSON lines, or a file to append them to.
+    """
+    camera_index: int
+    profile: str | None = None
+    output: str = "-"
+
+    @property
+    def name(self) -> str:
+        return f"camera{self.camera_index}"
+
+    @classmethod
+    def parse(cls, text: str) -> "SeatSpec":
+        camera, _, rest = text.partition(":")
+        profile, _, output = rest.partition(":")
+        try:
+            return cls(int(camera), profile or None, output or "-")
+        except ValueError:
+            raise ValueError(f"Invalid seat '{text}': expected CAMERA[:PROFILE[:OUTPUT]]") from None
+
+
+class MultiSeatDaemon:
+    """
+    Tracks several cameras in one headless process (see MultiSeatController). Reports the frame rate
+    of every seat to stderr each status_interval_s, and stops on SIGINT or SIGTERM, or when the
+    landmarkers cannot be loaded.
+
+    :param seats: At most one of them may output to the cursor.
+    :param workers: Landmarkers shared by all seats.
+    :param metrics_export_path: Appends a MultiSeatController.get_metrics() snapshot every second.
+    """
+
+    def __init__(self, seats: list[SeatSpec], workers: int = 2, max_hands: int = 1,
+                 max_frame_age_ms: float | None = 100.0, inference_target_ms: float = 25.0,
+                 metrics_export_path: str | None = None, status_interval_s: float = 5.0):
+        if sum(seat.output == "cursor" for seat in seats) > 1:
+            raise ValueError("Only one seat can drive the cursor")
+        if len({seat.camera_index for seat in seats}) != len(seats):
+            raise ValueError("Each seat needs its own camera")
+        self.seats = seats
+        self.workers = workers
+        self.max_hands = max_hands
+        self.max_frame_age_ms = max_frame_age_ms
+        self.inference_target_ms = inference_target_ms
+        self.metrics_export_path = metrics_export_path
+        self.status_interval_s = status_interval_s
+        self._stop = threading.Event()
+        self._files = []
+        self._controller: "MultiSeatController | None" = None
+
+    def stop(self):
+        self._stop.set()
+
+    def _cursor(self, spec: SeatSpec):
+        if spec.output == "cursor":
+            from app.cursor.CursorController import CursorController
+            return CursorController(actuation_hz=60.0)
+
+        from app.cursor.EventSinkCursorController import EventSinkCursorController, json_lines_sink
+        if spec.output == "-":
+            file = sys.stdout
+        else:
+            file = open(spec.output, "a", encoding="utf-8")
+            self._files.append(file)
+        return EventSinkCursorController(json_lines_sink(file, spec.name))
+
+    def run(self):
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop())
+
+        from app.camera.CameraController import CameraController
+        from app.camera.CaptureMode import CaptureMode
+        from app.system.MultiSeatController import MultiSeatController
+        from app.tracking.InferenceConfig import SELECTION_SETTING, InferenceConfig, available_models, cached_selection
+        from app.tracking.LandmarkerPool import LandmarkerPool
+        from app.tracking.TrackingParams import TrackingParams
+
+        preferences = PreferencesController()
+        profiles = []
+        for spec in self.seats:
+            profile = preferences.get_profile_by_name(spec.profile) if spec.profile else None
+            if profile is None:
+                profile = preferences.get_all_profiles()[0]
+                if spec.profile:
+                    _say(f"No profile named '{spec.profile}'; {spec.name} uses '{profile.name}'.")
+            profiles.append(profile)
+
+        # The pool runs one model for everyone: the first seat's, or this machine's benchmarked choice.
+        first = profiles[0]
+        chosen = cached_selection(preferences.get_setting(SELECTION_SETTING), available_models(),
+                                  self.inference_target_ms) or InferenceConfig()
+        inference = InferenceConfig(first.model_path or chosen.model_path, first.delegate or chosen.delegate)
+        params = TrackingParams(area_size_x=640, area_size_y=480, model_path=inference.model_path,
+                                delegate=inference.delegate, num_hands=self.max_hands)
+        pool = LandmarkerPool(inference, workers=self.workers, num_hands=self.max_hands, confidence={
+            "min_hand_detection_confidence": first.min_detection_confidence,
+            "min_hand_presence_confidence": first.min_presence_confidence,
+            "min_tracking_confidence": first.min_tracking_confidence,
+        }, on_error=self._on_pool_error)
+        controller = self._controller = MultiSeatController(pool, params, max_frame_age_ms=self.max_frame_age_ms)
+        _say(f"Loading {pool.size} x {inference.describe()}...")
+
+        try:
+            for spec, profile in zip(self.seats, profiles):
+                mode = None
+                if profile.camera_index == spec.camera_index and profile.camera_mode:
+                    mode = CaptureMode.from_dict(profile.camera_mode)
+                camera = CameraController(spec.camera_index, size=(640, 480), fps=60, mode=mode)
+                if not camera.is_open():
+                    camera.release()
+                    _say(f"Error: camera {spec.camera_index} could not be opened; skipping {spec.name}.")
+                    continue
+                controller.add_seat(spec.name, camera, self._cursor(spec), profile)
+                _say(f"{spec.name}: profile '{profile.name}', {camera.settings.describe()}")
+            if not controller.seats:
+                return
+            if not pool.wait_ready(timeout=30.0):
+                if pool.error is not None:
+                    return
+                _say("Warning: hand tracking workers are still loading.")
+
+            controller.start()
+            _say(f"Tracking {len(controller.seats)} seats.")
+            waited_s = 0.0
+            while not self._stop.wait(1.0):
+                if pool.error is not None:
+                    return
+                waited_s += 1.0
+                if self.metrics_export_path:
+                    with open(self.metrics_export_path, "a", encoding="utf-8") as file:
+                        file.write(json.dumps(controller.get_metrics()) + "\n")
+                if waited_s >= self.status_interval_s:
+                    waited_s = 0.0
+                    self._print_status(controller.get_metrics())
+            _say("Shutting down...")
+        finally:
+            controller.close()
+            preferences.close()
+            for file in self._files:
+                file.close()
+
+    def _on_pool_error(self, seat, error: Exception):
+        """Called from a landmarker thread, possibly before the controller exists."""
+        if seat is None:
+            _say(f"Error: hand tracking could not start: {error}")
+            return
+        seats = self._controller.seats if self._controller is not None else {}
+        name = next((name for name, system in seats.items() if system.tracking_controller is seat), seat)
+        _say(f"{name}: hand detection failed: {error}")
+
+    @staticmethod
+    def _print_status(metrics: dict):
+        seats = ", ".join(f"{name} {snapshot['effective_fps']:g} fps" for name, snapshot in metrics["seats"].items())
+        _say(f"{metrics['aggregate_fps']:g} fps total ({seats}); landmarkers {metrics['pool']['utilization']:.0%} busy")
@@ -0,0 +1,684 @@
+import threading
+from dataclasses import replace
+from typing import TYPE_CHECKING, Callable
+
+from app.metrics.StartupTimer import StartupTimer
+from app.preferences.PreferencesController import PreferencesController, Profile
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    # The pipeline pulls in cv2, mediapipe and pyautogui, which are only imported by initialize().
+    from app.camera.CameraController import CameraController
+    from app.camera.CameraDiscovery import CameraDiscovery
+    from app.cursor.CursorController import CursorController
+    from app.metrics.PipelineMetrics import PipelineMetrics
+    from app.replay.FrameRecorder import FrameRecorder
+    from app.system.FramePreview import FramePreview
+    from app.system.FrameRateGovernor import FrameRateGovernor
+    from app.system.PipelineConfig import PipelineConfig
+    from app.system.SystemController import SystemController
+    from app.tracking.InferenceConfig import InferenceConfig
+    from app.tracking.TrackingController import TrackingController
+    from app.tracking.TrackingParams import TrackingParams
+
+# Events passed to listeners, with their payload:
+#   "status"       str, a message for the user
+#   "ready"        None, the pipeline is built and tracking can start
+#   "tracking"     bool, tracking started or stopped
+#   "profile"      Profile, the current profile was replaced (loaded, deleted or renamed)
+#   "profiles"     (list of profile names, current name), the set of profiles changed
+#   "camera"       str, what the driver applied to the camera that was just opened
+#   "cameras"      list[int], the cameras found by the last scan
+#   "calibrating"  bool, calibration started or finished
+ServiceListener = Callable[[str, object], None]
+
+
+class TrackingService:
+    """
+    Owns the preferences and the tracking pipeline, independent of any user interface. The Qt window,
+    the headless daemon and the control socket all drive tracking through this class and learn about
+    changes from the events it sends to its listeners.
+
+    Every method must be called on one "owner" thread: the GUI thread, or the daemon's event loop.
+    Work finished on background threads (building the pipeline, opening a camera) is handed back to
+    that thread with post, and listeners are only ever called there.
+
+    :param post: Runs a callable on the owner thread. Must be safe to call from any thread.
+    :param startup: Timer that the start-up phases are recorded in.
+    :param startup_report_path: Appends the start-up report to this JSON-lines file once ready.
+    :param max_hands: Hands tracked at once. The first drives the cursor; any can gesture.
+    :param flow_interval: Run the landmarker on every flow_interval-th frame and track the hand with
+        optical flow in between. See TrackingParams.
+    :param max_frame_age_ms: Frames older than this when inference gets to them are dropped. See
+        SystemController.
+    :param inference_target_ms: Detection time, at the 95th percentile, that the start-up
+        benchmark looks for when choosing a model and delegate. See InferenceConfig.select().
+    :param auto_select_inference: Benchmark the installed models on sample camera frames the first
+        time this machine starts, unless the profile names a model and delegate. The choice is kept
+        in the settings until the hardware, MediaPipe or the installed models change.
+    """
+
+    def __init__(self, post: Callable[[Callable[[], None]], None], startup: StartupTimer | None = None,
+                 metrics_export_path: str | None = None, record_path: str | None = None,
+                 isolated_inference: bool = False, startup_report_path: str | None = None, max_hands: int = 1,
+                 flow_interval: int = 1, max_frame_age_ms: float | None = 100.0, inference_target_ms: float = 25.0,
+                 auto_select_inference: bool = True):
+        self.post = post
+        self.startup = startup if startup is not None else StartupTimer()
+        self.metrics_export_path = metrics_export_path
+        self.record_path = record_path
+        self.isolated_inference = isolated_inference
+        self.startup_report_path = startup_report_path
+        self.max_hands = max_hands
+        self.flow_interval = flow_interval
+        self.max_frame_age_ms = max_frame_age_ms
+        self.inference_target_ms = inference_target_ms
+        self.auto_select_inference = auto_select_inference
+        # Rate of the cursor actuation thread; the GUI raises it to the display's refresh rate.
+        self.actuation_hz = 60.0
+        self.screens: list[tuple[int, int, int, int]] = []
+        self._preview_callback: Callable | None = None
+        self._preview: "FramePreview | None" = None
+        self._listeners: list[ServiceListener] = []
+
+        with self.startup.phase("load preferences"):
+            self.preferences = PreferencesController(
+                on_error=lambda e: self._status(f"Error saving preferences: {e}. Retrying.")
+            )
+            profiles = self.preferences.get_all_profiles()
+            self.current_profile: Profile = profiles[0]
+
+        # Built in the background by initialize().
+        self.tracking_controller: "TrackingController | None" = None
+        self.cursor_controller: "CursorController | None" = None
+        self.metrics: "PipelineMetrics | None" = None
+        self.recorder: "FrameRecorder | None" = None
+        self.governor: "FrameRateGovernor | None" = None
+        self.camera_discovery: "CameraDiscovery | None" = None
+        self.camera_controller: "CameraController | None" = None
+        self.inference: "InferenceConfig | None" = None
+        self.system_controller: "SystemController | None" = None
+        self._camera_switch_lock = threading.Lock()
+        self._camera_generation = 0
+        # This machine's benchmarked model and delegate, for profiles that leave them empty.
+        self._default_inference: "InferenceConfig | None" = None
+        # Params of the landmarker being loaded in the background, if any.
+        self._loading_model: "TrackingParams | None" = None
+        self._closed = False
+
+    def add_listener(self, listener: ServiceListener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: ServiceListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, event: str, payload: object = None):
+        """Notify listeners on the owner thread. Safe to call from any thread."""
+        def notify():
+            for listener in list(self._listeners):
+                listener(event, payload)
+
+        self.post(notify)
+
+    def _status(self, message: str):
+        self._emit("status", message)
+
+    @property
+    def is_ready(self) -> bool:
+        return self.system_controller is not None
+
+    @property
+    def is_tracking(self) -> bool:
+        return self.is_ready and self.system_controller.is_running
+
+    def profile_names(self) -> list[str]:
+        return [profile.name for profile in self.preferences.get_all_profiles()]
+
+    def available_cameras(self) -> list[int]:
+        return self.preferences.get_setting("available_cameras", [])
+
+    def status(self) -> dict:
+        return {
+            "ready": self.is_ready,
+            "tracking": self.is_tracking,
+            "profile": self.current_profile.name,
+            "camera": self.camera_controller.index if self.is_ready else self.current_profile.camera_index,
+            "cameras": self.available_cameras(),
+            "inference": self.inference.describe() if self.inference is not None else None,
+        }
+
+    def initialize(self):
+        """Build the tracking pipeline on a background thread. Emits "ready" when it is done."""
+        threading.Thread(target=self._initialize, name="wave-vision-startup", daemon=True).start()
+
+    def _initialize(self):
+        startup = self.startup
+        try:
+            self._status("Loading camera support...")
+            with startup.phase("import cv2"):
+                from app.camera.CameraController import CameraController
+
+            # Opening a camera is slow device I/O, so it overlaps with loading the model.
+            camera_result: dict = {}
+
+            def open_camera():
+                try:
+                    with startup.phase("open camera"):
+                        camera_result["camera"] = self._open_camera(self.current_profile.camera_index)
+                except Exception as e:
+                    camera_result["error"] = e
+
+            camera_thread = threading.Thread(target=open_camera, name="wave-vision-camera-open", daemon=True)
+            camera_thread.start()
+
+            self._status("Loading hand tracking...")
+            with startup.phase("import mediapipe"):
+                from app.tracking.TrackingController import TrackingController
+                from app.tracking.TrackingParams import TrackingParams
+            inference = self._choose_inference(camera_thread, camera_result)
+            with startup.phase("import pyautogui"):
+                from app.cursor.CursorController import CursorController
+            with startup.phase("create landmarker"):
+                tracking_controller = TrackingController(
+                    TrackingParams(
+                        area_size_x=640,
+                        area_size_y=480,
+                        model_path=inference.model_path,
+                        delegate=inference.delegate,
+                        min_detection_confidence=self.current_profile.min_detection_confidence,
+                        min_presence_confidence=self.current_profile.min_presence_confidence,
+                        min_tracking_confidence=self.current_profile.min_tracking_confidence,
+                        num_hands=self.max_hands,
+                        isolated_inference=self.isolated_inference,
+                        flow_interval=self.flow_interval
+                    ),
+                    on_failure=lambda error: self.post(lambda: self._on_inference_failed(error))
+                )
+            self._status("Warming up hand tracking model...")
+            with startup.phase("warm-up inference"):
+                if not tracking_controller.warm_up():
+                    self._status("Warning: model warm-up timed out.")
+
+            with startup.phase("build pipeline"):
+                from app.camera.CameraDiscovery import CameraDiscovery
+                from app.metrics.PipelineMetrics import PipelineMetrics
+                from app.replay.FrameRecorder import FrameRecorder
+                from app.system.FrameRateGovernor import FrameRateGovernor
+                from app.system.SystemController import SystemController
+
+                cursor_controller = CursorController()
+                metrics = PipelineMetrics()
+                recorder = FrameRecorder(self.record_path) if self.record_path else None
+                governor = FrameRateGovernor()
+                camera_discovery = CameraDiscovery()
+
+            self._status(f"Opening camera {self.current_profile.camera_index}...")
+            camera_thread.join()
+            if "error" in camera_result:
+                raise camera_result["error"]
+            camera_controller = camera_result["camera"]
+            system_controller = SystemController(
+                camera_controller=camera_controller,
+                tracking_controller=tracking_controller,
+                cursor_controller=cursor_controller,
+                pipelined=True,
+                metrics=metrics,
+                recorder=recorder,
+                governor=governor,
+                max_frame_age_ms=self.max_frame_age_ms
+            )
+        except Exception as e:
+            self._status(f"Error during start-up: {e}")
+            return
+
+        def install():
+            self.tracking_controller = tracking_controller
+            self.cursor_controller = cursor_controller
+            self.metrics = metrics
+            self.recorder = recorder
+            self.governor = governor
+            self.camera_discovery = camera_discovery
+            self.camera_controller = camera_controller
+            self.inference = inference
+            self.system_controller = system_controller
+            self._on_initialized()
+
+        self.post(install)
+
+    def _choose_inference(self, camera_thread: threading.Thread, camera_result: dict) -> "InferenceConfig":
+        """
+        The profile's model and delegate, with whatever it leaves empty taken from this machine's
+        benchmarked selection. Runs the benchmark, on frames from the camera being opened, if there
+        is no selection yet. Called on the start-up thread.
+        """
+        from app.tracking.InferenceConfig import (SELECTION_SETTING, InferenceConfig, available_models,
+                                                  cached_selection, fingerprint, sample_frames, select)
+
+        profile = self.current_profile
+        if profile.model_path and profile.delegate:
+            return InferenceConfig(profile.model_path, profile.delegate)
+
+        models = available_models()
+        chosen = cached_selection(self.preferences.get_setting(SELECTION_SETTING), models, self.inference_target_ms)
+        if chosen is None and self.auto_select_inference:
+            camera_thread.join()
+            camera = camera_result.get("camera")
+            frames = sample_frames(camera) if camera is not None and camera.is_open() else []
+            if frames:
+                self._status("Measuring hand tracking speed on this machine...")
+                try:
+                    with self.startup.phase("select inference"):
+                        selection = select(frames, models, target_ms=self.inference_target_ms,
+                                           num_hands=self.max_hands)
+                except RuntimeError as e:
+                    self._status(f"Warning: could not benchmark hand tracking: {e}")
+                else:
+                    self.preferences.set_setting(SELECTION_SETTING, {**selection, "fingerprint": fingerprint(models)})
+                    chosen = InferenceConfig.from_dict(selection)
+                    if not selection["meets_target"]:
+                        self._status(f"Warning: hand tracking takes {selection['p95']:.0f} ms per frame on this "
+                                     f"machine (target {self.inference_target_ms:g} ms).")
+
+        self._default_inference = chosen or InferenceConfig()
+        return self._inference_for(profile)
+
+    def _inference_for(self, profile: Profile) -> "InferenceConfig":
+        """The profile's model and delegate, with whatever it leaves empty taken from this machine's selection."""
+        from app.tracking.InferenceConfig import SELECTION_SETTING, InferenceConfig, available_models, cached_selection
+
+        if profile.model_path and profile.delegate:
+            return InferenceConfig(profile.model_path, profile.delegate)
+        if self._default_inference is None:
+            self._default_inference = cached_selection(self.preferences.get_setting(SELECTION_SETTING),
+                                                       available_models(), self.inference_target_ms) or InferenceConfig()
+        chosen = self._default_inference
+        return InferenceConfig(profile.model_path or chosen.model_path, profile.delegate or chosen.delegate)
+
+    def _on_initialized(self):
+        if self.metrics_export_path:
+            self.metrics.start_export(self.metrics_export_path)
+        if self.screens:
+            self.tracking_controller.set_screens(self.screens)
+        self._apply_profile_settings()
+        self.cursor_controller.actuation_hz = self.actuation_hz
+        self.set_preview(self._preview_callback)
+        self._on_camera_opened(self.camera_controller)
+        if not self.camera_controller.is_open():
+            self._status(f"Error: camera {self.camera_controller.index} could not be opened.")
+        # The profile may have changed while the pipeline was being built.
+        if self.camera_controller.index != self.current_profile.camera_index:
+            self.switch_camera(self.current_profile.camera_index)
+
+        self.startup.mark("ready")
+        self._emit("ready")
+        self._status(self.startup.summary())
+        if self.startup_report_path:
+            self.startup.export(self.startup_report_path)
+        self.rescan_cameras(force=True)
+
+    def _apply_profile_settings(self):
+        """
+        Hand the running pipeline a snapshot of the current profile. Only what changed is rebuilt;
+        a different model is loaded in the background while tracking continues on the current one.
+        """
+        if not self.is_ready:
+            return
+        from app.system.PipelineConfig import PipelineConfig
+
+        config = PipelineConfig.from_profile(self.current_profile, self._inference_for(self.current_profile))
+        if "landmarker" in self.system_controller.apply_config(config):
+            self._load_model(config)
+
+    def _load_model(self, config: "PipelineConfig"):
+        params = config.tracking_params(self.tracking_controller.model_params)
+        if params == self._loading_model:
+            return
+        self._loading_model = params
+        self._status(f"Loading {config.inference.describe()}...")
+        tracking_controller = self.tracking_controller
+
+        def load():
+            try:
+                detector = tracking_controller.build_detector(params)
+            except Exception as e:
+                self.post(lambda: self._on_model_loaded(params, None, e))
+                return
+            self.post(lambda: self._on_model_loaded(params, detector, None))
+
+        threading.Thread(target=load, name="wave-vision-model-load", daemon=True).start()
+
+    def _on_model_loaded(self, params: "TrackingParams", detector, error: Exception | None):
+        if self._loading_model == params:
+            self._loading_model = None
+        if detector is None:
+            self._status(f"Error loading {params.inference.describe()}: {error}")
+            return
+        model_params = self.tracking_controller.model_params
+        if self._closed or self.system_controller.config.tracking_params(model_params) != params:
+            # Closed, or the profile asked for yet another model while this one loaded.
+            detector.close()
+            return
+        self.tracking_controller.use_detector(params, detector)
+        self.inference = params.inference
+        self._status(f"Hand tracking now uses {params.inference.describe()}.")
+
+    def load_profile(self, profile_name: str) -> bool:
+        profile = self.preferences.get_profile_by_name(profile_name)
+        if not profile:
+            return False
+        self.current_profile = profile
+        self._apply_profile_settings()
+        self._emit("profile", profile)
+        self.switch_camera(profile.camera_index)
+        return True
+
+    def update_camera(self, camera_index: int):
+        self.current_profile.camera_index = camera_index
+        # The stored capture mode belonged to the previous device.
+        self.current_profile.camera_mode = {}
+        self.preferences.update_profile(self.current_profile)
+        self.switch_camera(camera_index)
+
+    def redetect_camera_mode(self):
+        """Forget the profile's capture mode and renegotiate the fastest one the camera supports."""
+        self.current_profile.camera_mode = {}
+        self.preferences.update_profile(self.current_profile)
+        self.switch_camera(self.current_profile.camera_index, force=True)
+
+    def update_sensitivity(self, value: float):
+        self.current_profile.sensitivity = value
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+
+    def update_smoothing(self, value: float):
+        self.current_profile.smoothing = value
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+
+    def update_filter_type(self, filter_type: str):
+        self.current_profile.filter_type = filter_type
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+
+    def update_latency_compensation(self, enabled: bool):
+        self.current_profile.latency_compensation = enabled
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+
+    def update_pinch_threshold(self, value: float):
+        self.current_profile.pinch_threshold = value
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+
+    def update_gesture_action(self, gesture: str, action: str):
+        # Replaced rather than mutated: profiles copied with replace() share the same dict.
+        self.current_profile.gesture_map = {**self.current_profile.gesture_map, gesture: action}
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+
+    def update_monitor(self, monitor: int):
+        self.current_profile.monitor = monitor
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+
+    def set_screens(self, screens: list[tuple[int, int, int, int]]):
+        """Remap onto a new monitor layout, e.g. after a display was added, removed or moved."""
+        self.screens = list(screens)
+        if self.is_ready:
+            self.tracking_controller.set_screens(self.screens)
+
+    def toggle_calibration(self):
+        """Start recording the comfortable hand area, or fit it and save it to the profile."""
+        if not self.is_tracking:
+            self._status("Start tracking before calibrating.")
+            return
+        if not self.tracking_controller.is_calibrating:
+            self.tracking_controller.start_calibration()
+            self._emit("calibrating", True)
+            self._status("Calibrating: trace the corners of a comfortable area with your hand, then click Finish.")
+            return
+
+        region = self.tracking_controller.finish_calibration()
+        self._emit("calibrating", False)
+        if region is None:
+            self._status("Calibration failed: move your hand across the whole area and try again.")
+            return
+        self.current_profile.calibration = region.tolist()
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+        self._status("Calibration saved.")
+
+    def reset_calibration(self):
+        self.current_profile.calibration = []
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+        self._status("Calibration reset to the default area.")
+
+    def update_power_saving(self, enabled: bool):
+        self.current_profile.power_saving = enabled
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+
+    def update_idle_fps(self, value: float):
+        self.current_profile.idle_fps = value
+        self._apply_profile_settings()
+        self.preferences.update_profile(self.current_profile)
+
+    def create_profile(self, name: str) -> bool:
+        """Save a copy of the current profile under a new name and switch to it."""
+        if self.preferences.get_profile_by_name(name):
+            return False
+
+        new_profile = replace(self.current_profile, id=None, name=name)
+        new_profile.id = self.preferences.create_profile(new_profile)
+        self.current_profile = new_profile
+        self._emit("profiles", (self.profile_names(), name))
+        self._status(f"Profile '{name}' created.")
+        return True
+
+    def save_current_profile(self):
+        self.preferences.update_profile(self.current_profile)
+
+    def rename_profile(self, old_name: str, new_name: str) -> bool:
+        if self.preferences.get_profile_by_name(new_name):
+            return False
+
+        self.current_profile.name = new_name
+        self.preferences.update_profile(self.current_profile)
+        self._emit("profiles", (self.profile_names(), new_name))
+        self._status(f"Profile renamed to '{new_name}'.")
+        return True
+
+    def delete_profile(self, name: str) -> bool:
+        profiles = self.preferences.get_all_profiles()
+        if len(profiles) <= 1:
+            return False
+
+        profile = self.preferences.get_profile_by_name(name)
+        if not profile or not profile.id:
+            return False
+        self.preferences.delete_profile(profile.id)
+
+        self.current_profile = self.preferences.get_all_profiles()[0]
+        self._apply_profile_settings()
+        self._emit("profiles", (self.profile_names(), self.current_profile.name))
+        self._emit("profile", self.current_profile)
+        self.switch_camera(self.current_profile.camera_index)
+        self._status(f"Profile '{name}' deleted.")
+        return True
+
+    def _open_camera(self, camera_index: int) -> "CameraController":
+        """Open a camera with the profile's stored capture mode, negotiating one if there is none."""
+        from app.camera.CameraController import CameraController
+        from app.camera.CaptureMode import CaptureMode
+
+        profile = self.current_profile
+        mode = None
+        if profile.camera_index == camera_index and profile.camera_mode:
+            mode = CaptureMode.from_dict(profile.camera_mode)
+        return CameraController(camera_index, size=(640, 480), fps=60, mode=mode)
+
+    def _on_camera_opened(self, camera: "CameraController"):
+        """Report what the driver applied and remember the negotiated mode in the profile."""
+        self._emit("camera", camera.settings.describe() if camera.settings else "Camera not available")
+        profile = self.current_profile
+        if camera.mode is not None and camera.index == profile.camera_index:
+            mode = camera.mode.to_dict()
+            if mode != profile.camera_mode:
+                profile.camera_mode = mode
+                self.preferences.update_profile(profile)
+
+    def switch_camera(self, camera_index: int, force: bool = False):
+        """
+        Open the new camera on a background thread and swap it into the running pipeline once it
+        delivers, so the owner thread never waits on device I/O. Only the most recent request is
+        applied. Before the pipeline is built the profile's camera is opened by initialize() instead.
+
+        :param force: Reopen even if camera_index is already open, e.g. to renegotiate its mode.
+        """
+        if not self.is_ready:
+            return
+        reopen = camera_index == self.camera_controller.index and self.camera_controller.is_open()
+        if reopen and not force:
+            return
+
+        with self._camera_switch_lock:
+            self._camera_generation += 1
+            generation = self._camera_generation
+        self._status(f"Opening camera {camera_index}...")
+
+        previous_mode = self.camera_controller.mode
+
+        def open_camera():
+            if reopen:
+                with self._camera_switch_lock:
+                    if generation != self._camera_generation:
+                        return
+                    # The device only accepts one open handle, so the running capture lets go first.
+                    self.system_controller.release_camera()
+            camera, error = None, None
+            try:
+                camera = self._open_camera(camera_index)
+            except Exception as e:
+                error = e
+            if camera is not None and not camera.is_open():
+                camera.release()
+                camera = None
+            restored = False
+            if camera is None and reopen:
+                # The running capture already let go of the device; get it back in the mode it had.
+                from app.camera.CameraController import CameraController
+                try:
+                    camera = CameraController(camera_index, size=(640, 480), fps=60, mode=previous_mode)
+                    restored = camera.is_open()
+                except Exception:
+                    camera = None
+                if camera is not None and not restored:
+                    camera.release()
+                    camera = None
+            self.post(lambda: self._on_camera_switched(camera_index, generation, camera, error, restored))
+
+        threading.Thread(target=open_camera, name="wave-vision-camera-open", daemon=True).start()
+
+    def _on_camera_switched(self, camera_index: int, generation: int, camera: "CameraController | None",
+                            error: Exception | None, restored: bool):
+        with self._camera_switch_lock:
+            superseded = generation != self._camera_generation
+        if superseded or self._closed:
+            if camera is not None:
+                camera.release()
+            return
+        if camera is not None:
+            previous = self.system_controller.swap_camera(camera)
+            self.camera_controller = camera
+            # Closing a device can block; the pipeline no longer reads from it.
+            threading.Thread(target=previous.release, name="wave-vision-camera-close", daemon=True).start()
+            self._on_camera_opened(camera)
+
+        reason = error if error is not None else "it could not be opened"
+        if camera is None:
+            self._status(f"Error switching to camera {camera_index}: {reason}.")
+            if not self.camera_controller.is_open():
+                self.stop_tracking()
+                self._status("Error: Camera not available.")
+        elif restored:
+            self._status(f"Error reopening camera {camera_index}: {reason}. Kept its previous mode.")
+        else:
+            self._status(f"Switched to camera {camera_index}")
+
+    def rescan_cameras(self, force: bool = False):
+        if not self.is_ready:
+            return
+        if not force and not self.camera_discovery.devices_changed():
+            return
+        self.camera_discovery.scan_async(
+            lambda cameras: self.post(lambda: self._on_cameras_discovered(cameras)),
+            in_use={self.camera_controller.index}
+        )
+
+    def _on_cameras_discovered(self, cameras: list[int]):
+        self.preferences.set_setting("available_cameras", cameras)
+        self._emit("cameras", cameras)
+
+    def set_preview(self, on_frame: "Callable[[np.ndarray, int], None] | None"):
+        """
+        Start rendering a downscaled, annotated camera preview, or stop it with None. on_frame is
+        called on the preview's renderer thread with each image; see FramePreview.
+        """
+        self._preview_callback = on_frame
+        if not self.is_ready:
+            return
+        previous, self._preview = self._preview, None
+        self.system_controller.preview = None
+        if previous is not None:
+            previous.stop()
+        if on_frame is not None:
+            from app.system.FramePreview import FramePreview
+            self._preview = FramePreview(on_frame).start()
+            self.system_controller.preview = self._preview
+
+    def get_metrics(self) -> dict:
+        return self.system_controller.get_metrics() if self.is_ready else {}
+
+    def start_tracking(self) -> bool:
+        if not self.is_ready:
+            return False
+        if not self.camera_controller.is_open():
+            self._status("Error: Camera not available.")
+            return False
+        if self.tracking_controller.failed:
+            self._status("Error: Hand tracking is not available. Choose another model or restart.")
+            return False
+        if not self.system_controller.is_running:
+            self.system_controller.start()
+            self._emit("tracking", True)
+            self._status("Tracking system started.")
+        return True
+
+    def _on_inference_failed(self, error: Exception):
+        if self._closed:
+            return
+        self.stop_tracking()
+        self._status(f"Error: Hand tracking stopped: {error}.")
+
+    def stop_tracking(self):
+        if not self.is_tracking:
+            return
+        self.system_controller.stop()
+        self._emit("tracking", False)
+        self._status("Tracking system stopped.")
+
+    def close(self):
+        """Stop tracking and release the camera, the landmarker and the preferences database."""
+        self._closed = True
+        if self.is_ready:
+            self.set_preview(None)
+            self.system_controller.stop()
+            self.tracking_controller.close()
+            self.metrics.stop_export()
+            self.camera_controller.release()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.preferences.close()
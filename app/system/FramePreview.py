@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from app.camera.FramePool import FrameBuffer
+from app.system.LatestQueue import LatestQueue
+from app.tracking.TrackingResult import TrackingResult
+
+# Landmark index pairs drawn as the hand skeleton.
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+# BGR colours: the primary (cursor) hand, other hands, and the region sent to the landmarker.
+PRIMARY_COLOR = (80, 220, 80)
+SECONDARY_COLOR = (220, 180, 60)
+ROI_COLOR = (0, 200, 255)
+
+
+def render(bgr: np.ndarray, result: TrackingResult | None, width: int) -> np.ndarray:
+    """
+    Downscale and mirror a frame and draw the result's landmarks, gestures and crop onto it.
+
+    :param bgr: Full camera frame, as captured.
+    :param result: Result to overlay, or None to draw the frame alone.
+    :param width: Width of the preview in pixels; the height keeps the frame's aspect ratio.
+    :return: A new contiguous (height, width, 3) BGR image, mirrored like the cursor mapping.
+    """
+    height = max(1, round(bgr.shape[0] * width / bgr.shape[1]))
+    image = cv2.resize(bgr, (width, height), interpolation=cv2.INTER_AREA)
+    cv2.flip(image, 1, dst=image)
+    if result is None or result.landmarks is None:
+        cv2.putText(image, "No hand", (8, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, SECONDARY_COLOR, 1, cv2.LINE_AA)
+        return image
+
+    scale = np.array([width, height], dtype=np.float32)
+    if result.roi is not None:
+        x, y, w, h = result.roi
+        top_left = (round((1 - x - w) * width), round(y * height))
+        bottom_right = (round((1 - x) * width), round((y + h) * height))
+        cv2.rectangle(image, top_left, bottom_right, ROI_COLOR, 1)
+
+    for hand, landmarks in enumerate(result.landmarks):
+        points = landmarks[:, :2].copy()
+        points[:, 0] = 1 - points[:, 0]
+        pixels = np.round(points * scale).astype(np.int32)
+        color = PRIMARY_COLOR if hand == 0 else SECONDARY_COLOR
+        cv2.polylines(image, [pixels[list(pair)] for pair in HAND_CONNECTIONS], False, color, 1, cv2.LINE_AA)
+        for x, y in pixels:
+            cv2.circle(image, (int(x), int(y)), 2, color, -1)
+        gesture = result.gestures[hand] if hand < len(result.gestures) else None
+        if gesture:
+            cv2.putText(image, gesture, (int(pixels[0, 0]) + 6, int(pixels[0, 1]) + 14),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1, cv2.LINE_AA)
+    return image
+
+
+class FramePreview:
+    """
+    Renders a small live preview of what the tracker sees, off the tracking path. The capture thread
+    only offers frames: at most fps of them are retained (a reference count increment, no copy) and
+    handed to a renderer thread, which downscales, overlays the most recent result and passes the
+    image to on_frame. A slow renderer or consumer only ever delays the preview, never capture or
+    inference.
+
+    :param on_frame: Called on the renderer thread with each rendered BGR image and its frame timestamp.
+    :param fps: Cap on rendered frames per second.
+    :param width: Preview width in pixels.
+    :param max_result_age_ms: Results older than this, relative to the frame, are not overlaid.
+    """
+
+    def __init__(self, on_frame: Callable[[np.ndarray, int], None], fps: float = 15.0, width: int = 320,
+                 max_result_age_ms: int = 250):
+        self.on_frame = on_frame
+        self.period_s = 1.0 / fps
+        self.width = width
+        self.max_result_age_ms = max_result_age_ms
+        self.frames_rendered = 0
+        self._next_at = 0.0
+        self._result: TrackingResult | None = None
+        self._frames: LatestQueue[tuple[int, FrameBuffer]] = LatestQueue(
+            maxsize=1, on_discard=lambda item: item[1].release()
+        )
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "FramePreview":
+        if self._thread is None:
+            self._frames.reset()
+            self._thread = threading.Thread(target=self._render_loop, name="wave-vision-preview", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._frames.close()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def offer(self, timestamp_ms: int, buffer: FrameBuffer):
+        """Called from the capture thread for every frame; keeps one per period for rendering."""
+        now = time.perf_counter()
+        if now < self._next_at or self._thread is None:
+            return
+        self._next_at = now + self.period_s
+        self._frames.put((timestamp_ms, buffer.retain()))
+
+    def on_result(self, result: TrackingResult | None):
+        """Called from the result thread; the renderer overlays whichever result is newest."""
+        self._result = result
+
+    def _render_loop(self):
+        while True:
+            item = self._frames.get(timeout=0.5)
+            if item is None:
+                if self._frames.closed:
+                    return
+                continue
+            timestamp_ms, buffer = item
+            result = self._result
+            if result is not None and abs(timestamp_ms - result.timestamp_ms) > self.max_result_age_ms:
+                result = None
+            try:
+                image = render(buffer.bgr, result, self.width)
+            finally:
+                buffer.release()
+            self.frames_rendered += 1
+            self.on_frame(image, timestamp_ms)
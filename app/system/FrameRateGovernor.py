@@ -0,0 +1,117 @@
+import glob
+import os
+import time
+from enum import Enum
+
+import cv2
+import numpy as np
+
+
+class GovernorState(Enum):
+    ACTIVE = "active"
+    IDLE = "idle"
+    THROTTLED = "throttled"
+
+
+class FrameRateGovernor:
+    """
+    Decides which captured frames are worth running hand detection on. With a hand in view every
+    frame is inferred; after idle_timeout_s without one only idle_fps probe frames are, plus any frame
+    where cheap frame differencing sees motion, so a hand that reappears is picked up on the next
+    frame. Sustained CPU load or thermal pressure caps the active rate at throttled_fps.
+
+    :param enabled: When False every frame is inferred.
+    :param idle_fps: Probe rate while no hand has been seen for idle_timeout_s.
+    :param idle_timeout_s: Seconds without a hand before dropping to the probe rate.
+    :param throttled_fps: Inference rate cap while the machine is under pressure.
+    :param motion_threshold: Mean absolute difference, in 8-bit grey levels, of a thumbnail that counts as motion.
+    :param load_threshold: 1-minute load average per CPU above which the governor throttles.
+    :param thermal_threshold_c: Hottest thermal zone temperature above which the governor throttles.
+    """
+    PRESSURE_INTERVAL_S = 2.0
+    THUMBNAIL_SIZE = (32, 24)
+
+    def __init__(self, enabled: bool = True, idle_fps: float = 5.0, idle_timeout_s: float = 2.0,
+                 throttled_fps: float = 15.0, motion_threshold: float = 6.0, load_threshold: float = 0.9,
+                 thermal_threshold_c: float = 85.0):
+        self.enabled = enabled
+        self.idle_fps = idle_fps
+        self.idle_timeout_s = idle_timeout_s
+        self.throttled_fps = throttled_fps
+        self.motion_threshold = motion_threshold
+        self.load_threshold = load_threshold
+        self.thermal_threshold_c = thermal_threshold_c
+
+        self.state = GovernorState.ACTIVE
+        self.under_pressure = False
+        self._last_hand_at = time.monotonic()
+        self._last_inference_at = 0.0
+        self._last_pressure_check = 0.0
+        self._previous_thumbnail: np.ndarray | None = None
+
+    def configure(self, enabled: bool, idle_fps: float, idle_timeout_s: float):
+        self.enabled = enabled
+        self.idle_fps = idle_fps
+        self.idle_timeout_s = idle_timeout_s
+
+    def reset(self):
+        self.state = GovernorState.ACTIVE
+        self._last_hand_at = time.monotonic()
+        self._last_inference_at = 0.0
+        self._previous_thumbnail = None
+
+    def on_result(self, hand_present: bool):
+        if hand_present:
+            self._last_hand_at = time.monotonic()
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        if not self.enabled:
+            self.state = GovernorState.ACTIVE
+            return True
+
+        now = time.monotonic()
+        if now - self._last_pressure_check >= self.PRESSURE_INTERVAL_S:
+            self._last_pressure_check = now
+            self.under_pressure = self._is_under_pressure()
+
+        if now - self._last_hand_at < self.idle_timeout_s:
+            self._previous_thumbnail = None
+            if self.under_pressure:
+                self.state = GovernorState.THROTTLED
+                return self._due(now, self.throttled_fps)
+            self.state = GovernorState.ACTIVE
+            self._last_inference_at = now
+            return True
+
+        self.state = GovernorState.IDLE
+        if self._has_motion(frame):
+            self._last_inference_at = now
+            return True
+        return self._due(now, self.idle_fps)
+
+    def _due(self, now: float, fps: float) -> bool:
+        if fps <= 0 or now - self._last_inference_at < 1.0 / fps:
+            return False
+        self._last_inference_at = now
+        return True
+
+    def _has_motion(self, frame: np.ndarray) -> bool:
+        thumbnail = cv2.resize(frame, self.THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+        previous, self._previous_thumbnail = self._previous_thumbnail, thumbnail
+        if previous is None or previous.shape != thumbnail.shape:
+            return False
+        return float(np.abs(thumbnail - previous).mean()) > self.motion_threshold
+
+    def _is_under_pressure(self) -> bool:
+        if hasattr(os, "getloadavg"):
+            if os.getloadavg()[0] / (os.cpu_count() or 1) > self.load_threshold:
+                return True
+
+        for path in glob.glob("/sys/class/thermal/thermal_zone*/temp"):
+            try:
+                with open(path) as file:
+                    if int(file.read().strip()) / 1000 > self.thermal_threshold_c:
+                        return True
+            except (OSError, ValueError):
+                continue
+        return False
@@ -0,0 +1,79 @@
+import threading
+from collections import deque
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LatestQueue(Generic[T]):
+    """
+    Bounded, thread-safe hand-off between pipeline stages. Putting into a full queue evicts the
+    oldest item instead of blocking, so a slow consumer always picks up the freshest data.
+
+    :param maxsize: Number of items held before the oldest one is evicted.
+    :param on_discard: Called with every item that is evicted or cleared without being consumed,
+        e.g. to return a pooled buffer.
+    """
+
+    def __init__(self, maxsize: int = 1, on_discard: Callable[[T], None] | None = None):
+        self._items: deque[T] = deque(maxlen=maxsize)
+        self._on_discard = on_discard
+        self._condition = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item: T) -> bool:
+        """
+        Queue an item, returning True if an older item had to be evicted to make room. Once the
+        queue is closed the item is discarded straight away, since nothing will take it.
+        """
+        with self._condition:
+            closed = self._closed
+            evicted = None
+            if not closed:
+                evicted = self._items.popleft() if len(self._items) == self._items.maxlen else None
+                if evicted is not None:
+                    self.dropped += 1
+                self._items.append(item)
+                self._condition.notify()
+        if closed:
+            self._discard([item])
+            return False
+        if evicted is not None:
+            self._discard([evicted])
+        return evicted is not None
+
+    def get(self, timeout: float | None = None) -> T | None:
+        """Wait for the oldest queued item. Returns None on timeout or once the queue is closed."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if self._closed:
+                return None
+            return self._items.popleft()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        """Wake every waiting consumer and refuse to hand out further items."""
+        with self._condition:
+            self._closed = True
+            discarded = list(self._items)
+            self._items.clear()
+            self._condition.notify_all()
+        self._discard(discarded)
+
+    def reset(self):
+        with self._condition:
+            self._closed = False
+            discarded = list(self._items)
+            self._items.clear()
+            self.dropped = 0
+        self._discard(discarded)
+
+    def _discard(self, items: list[T]):
+        if self._on_discard is not None:
+            for item in items:
+                self._on_discard(item)
@@ -0,0 +1,129 @@
+import threading
+import time
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+from app.camera.CameraController import CameraController
+from app.metrics.PipelineMetrics import PipelineMetrics
+from app.system.FrameRateGovernor import FrameRateGovernor
+from app.system.SystemController import SystemController
+from app.tracking.LandmarkerPool import LandmarkerPool
+from app.tracking.TrackingController import TrackingController
+from app.tracking.TrackingParams import TrackingParams
+
+if TYPE_CHECKING:
+    from app.cursor.CursorController import CursorController
+    from app.preferences.PreferencesController import Profile
+
+
+class MultiSeatController:
+    """
+    Several seats, each a camera and the person in front of it, tracked by one process. Every seat
+    is a pipelined SystemController of its own, with its own profile, cursor filter state, power
+    saving and output (the real pointer, or an event sink for the others), and its own metrics.
+    Only hand detection is shared: all seats submit to one LandmarkerPool, which bounds the model
+    copies and inference threads however many cameras are attached, and serves the seats in turn.
+
+    :param pool: Landmarkers shared by the seats. Closed by close().
+    :param params: Template for each seat's TrackingParams; its model settings are the pool's.
+    :param max_frame_age_ms: See SystemController. Frames that wait too long for a free landmarker
+        are dropped rather than tracked late.
+    """
+
+    def __init__(self, pool: LandmarkerPool, params: TrackingParams, max_frame_age_ms: float | None = 100.0):
+        self.pool = pool
+        self.params = params
+        self.max_frame_age_ms = max_frame_age_ms
+        self.seats: dict[str, SystemController] = {}
+        self._lock = threading.Lock()
+        self._started_at: float | None = None
+        self._busy_at_start = 0.0
+
+    def add_seat(self, name: str, camera_controller: CameraController, cursor_controller: "CursorController",
+                 profile: "Profile | None" = None, screen_size: tuple[int, int] | None = None) -> SystemController:
+        """
+        Build a seat's pipeline. Seats added while running start straight away.
+
+        :param cursor_controller: A CursorController, or a stand-in such as EventSinkCursorController.
+        :param profile: Settings for the seat; the TrackingController defaults when omitted.
+        :param screen_size: Passed to the seat's TrackingController.
+        """
+        tracking_controller = TrackingController(replace(self.params), screen_size=screen_size, pool=self.pool)
+        system_controller = SystemController(
+            camera_controller=camera_controller,
+            tracking_controller=tracking_controller,
+            cursor_controller=cursor_controller,
+            pipelined=True,
+            metrics=PipelineMetrics(),
+            governor=FrameRateGovernor(),
+            max_frame_age_ms=self.max_frame_age_ms
+        )
+        if profile is not None:
+            system_controller.apply_profile(profile)
+        with self._lock:
+            if name in self.seats:
+                tracking_controller.close()
+                raise ValueError(f"There already is a seat named '{name}'")
+            self.seats[name] = system_controller
+            running = self._started_at is not None
+        if running:
+            system_controller.start()
+        return system_controller
+
+    def remove_seat(self, name: str) -> CameraController | None:
+        """Stop a seat and return its camera, for the caller to release."""
+        with self._lock:
+            system_controller = self.seats.pop(name, None)
+        if system_controller is None:
+            return None
+        system_controller.stop()
+        system_controller.tracking_controller.close()
+        return system_controller.camera_controller
+
+    def start(self):
+        with self._lock:
+            if self._started_at is not None:
+                return
+            self._started_at = time.perf_counter()
+            self._busy_at_start = self.pool.busy_s
+            seats = list(self.seats.values())
+        for system_controller in seats:
+            system_controller.start()
+
+    def stop(self):
+        with self._lock:
+            self._started_at = None
+            seats = list(self.seats.values())
+        for system_controller in seats:
+            system_controller.stop()
+
+    def get_metrics(self) -> dict:
+        """Each seat's SystemController.get_metrics(), their aggregate frame rate, and pool usage."""
+        with self._lock:
+            seats = dict(self.seats)
+            started_at = self._started_at
+            busy_at_start = self._busy_at_start
+        snapshots = {name: system_controller.get_metrics() for name, system_controller in seats.items()}
+        utilization = None
+        if started_at is not None:
+            elapsed_s = time.perf_counter() - started_at
+            utilization = round((self.pool.busy_s - busy_at_start) / max(elapsed_s * self.pool.size, 1e-9), 3)
+        return {
+            "seats": snapshots,
+            "aggregate_fps": round(sum(snapshot["effective_fps"] for snapshot in snapshots.values()), 2),
+            "pool": {
+                "workers": self.pool.size,
+                "utilization": utilization,
+                "processed": {name: self.pool.processed.get(seats[name].tracking_controller, 0) for name in seats},
+                "skipped": {name: self.pool.skipped.get(seats[name].tracking_controller, 0) for name in seats},
+            },
+        }
+
+    def close(self):
+        """Stop every seat, release the cameras and close the pool."""
+        self.stop()
+        for name in list(self.seats):
+            camera_controller = self.remove_seat(name)
+            if camera_controller is not None:
+                camera_controller.release()
+        self.pool.close()
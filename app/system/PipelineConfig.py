@@ -0,0 +1,97 @@
+import itertools
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING
+
+from app.tracking.Gestures import DEFAULT_GESTURE_MAP
+
+if TYPE_CHECKING:
+    from app.preferences.PreferencesController import Profile
+    from app.tracking.InferenceConfig import InferenceConfig
+    from app.tracking.TrackingParams import TrackingParams
+
+_versions = itertools.count(1)
+
+# The settings each stage of the pipeline reads. A stage is only touched when one of them changes.
+STAGE_FIELDS = {
+    "filter": ("filter_type", "filter_params", "latency_compensation"),
+    "mapping": ("sensitivity", "monitor", "region"),
+    "gestures": ("pinch_threshold",),
+    "actions": ("gesture_map",),
+    "governor": ("power_saving", "idle_fps", "idle_timeout_s"),
+}
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    """
+    Immutable snapshot of the settings a running pipeline applies, built from a profile. Changing a
+    setting means building a new snapshot and handing it to SystemController.apply_config(), which
+    swaps in only the stages whose settings differ; nothing reads a setting while it is half-changed.
+
+    :param filter_params: (name, value) pairs passed to the cursor filter's configure().
+    :param region: Calibrated active region as four (x, y) corners, or None for the default area.
+    :param gesture_map: (gesture, action) pairs.
+    :param inference: Model and delegate the landmarker should run, or None to keep whatever it runs.
+    :param confidence: (detection, presence, tracking) minimum confidences, with inference.
+    :param version: Increases with every snapshot built in this process. Not compared.
+    """
+    filter_type: str = "ema"
+    filter_params: tuple[tuple[str, float], ...] = (("alpha", 0.3),)
+    latency_compensation: bool = False
+    sensitivity: float = 1.0
+    monitor: int = -1
+    region: tuple[tuple[float, float], ...] | None = None
+    pinch_threshold: float = 0.05
+    gesture_map: tuple[tuple[str, str], ...] = tuple(DEFAULT_GESTURE_MAP.items())
+    power_saving: bool = True
+    idle_fps: float = 5.0
+    idle_timeout_s: float = 2.0
+    inference: "InferenceConfig | None" = None
+    confidence: tuple[float, float, float] | None = None
+    version: int = field(default_factory=lambda: next(_versions), compare=False)
+
+    @classmethod
+    def from_profile(cls, profile: "Profile", inference: "InferenceConfig | None" = None) -> "PipelineConfig":
+        """
+        :param inference: The profile's model and delegate with any left empty already resolved (see
+            TrackingService), or None to leave the landmarker and its confidences alone.
+        """
+        return cls(
+            filter_type=profile.filter_type,
+            filter_params=(
+                ("alpha", profile.smoothing),
+                ("min_cutoff", profile.filter_min_cutoff),
+                ("beta", profile.filter_beta),
+                ("process_noise", profile.filter_process_noise),
+                ("measurement_noise", profile.filter_measurement_noise),
+            ),
+            latency_compensation=profile.latency_compensation,
+            sensitivity=profile.sensitivity,
+            monitor=profile.monitor,
+            region=tuple(tuple(corner) for corner in profile.calibration) or None,
+            pinch_threshold=profile.pinch_threshold,
+            gesture_map=tuple(profile.gesture_map.items()),
+            power_saving=profile.power_saving,
+            idle_fps=profile.idle_fps,
+            idle_timeout_s=profile.idle_timeout_s,
+            inference=inference,
+            confidence=None if inference is None else (profile.min_detection_confidence,
+                                                       profile.min_presence_confidence,
+                                                       profile.min_tracking_confidence),
+        )
+
+    def changed_stages(self, previous: "PipelineConfig | None") -> set[str]:
+        """The stages in STAGE_FIELDS whose settings differ from previous; all of them without one."""
+        if previous is None:
+            return set(STAGE_FIELDS)
+        return {stage for stage, names in STAGE_FIELDS.items()
+                if any(getattr(self, name) != getattr(previous, name) for name in names)}
+
+    def tracking_params(self, params: "TrackingParams") -> "TrackingParams":
+        """params with this snapshot's model, delegate and confidences, if it has any."""
+        if self.inference is None:
+            return params
+        detection, presence, tracking = self.confidence
+        return replace(params, model_path=self.inference.model_path, delegate=self.inference.delegate,
+                       min_detection_confidence=detection, min_presence_confidence=presence,
+                       min_tracking_confidence=tracking)
@@ -1,38 +1,331 @@
+import threading
 import time
+from typing import TYPE_CHECKING
 
 from app.camera.CameraController import CameraController
-from app.cursor.CursorController import CursorController
+from app.camera.FrameClock import FrameClock, monotonic_ms
+from app.camera.FramePool import FrameBuffer
+from app.metrics.PipelineMetrics import PipelineMetrics
+from app.replay.FrameRecorder import FrameRecorder
+from app.system.FramePreview import FramePreview
+from app.system.FrameRateGovernor import FrameRateGovernor
+from app.system.LatestQueue import LatestQueue
+from app.system.PipelineConfig import PipelineConfig
+from app.tracking.Gestures import DEFAULT_GESTURE_MAP
 from app.tracking.TrackingController import TrackingController
+from app.tracking.TrackingResult import TrackingResult
+
+if TYPE_CHECKING:
+    # pyautogui needs a display at import time; headless replays pass a RecordingCursorController.
+    from app.cursor.CursorController import CursorController
+    from app.preferences.PreferencesController import Profile
 
 
 class SystemController:
-    def __init__(self, camera_controller: CameraController, tracking_controller: TrackingController, cursor_controller: CursorController):
+    """
+    :param pipelined: Run capture, inference and actuation on their own threads, connected by
+        latest-frame-wins queues, instead of doing all three inside update().
+    :param metrics: Timing collector shared with the camera, tracking and cursor controllers. A new
+        one is created when omitted.
+    :param recorder: Optional FrameRecorder that receives every captured frame and tracking result.
+    :param governor: Decides which frames are inferred. A default one is created when omitted.
+    :param max_frame_age_ms: Frames that have waited longer than this since they were grabbed are
+        dropped instead of inferred, and counted as expired. None disables the check.
+
+    gesture_map maps each gesture reported by the tracker to a cursor action (see Gestures.ACTIONS).
+    preview, when set, is offered every captured frame and result (see FramePreview).
+    """
+    # Mouse-wheel clicks per frame height of vertical hand movement while scrolling.
+    SCROLL_CLICKS_PER_FRAME = 40.0
+
+    def __init__(self, camera_controller: CameraController, tracking_controller: TrackingController,
+                 cursor_controller: "CursorController", pipelined: bool = False,
+                 metrics: PipelineMetrics | None = None, recorder: FrameRecorder | None = None,
+                 governor: FrameRateGovernor | None = None, max_frame_age_ms: float | None = 100.0):
         self.camera_controller = camera_controller
         self.tracking_controller = tracking_controller
         self.cursor_controller = cursor_controller
+        self.pipelined = pipelined
+        self.recorder = recorder
+        self.governor = governor if governor is not None else FrameRateGovernor()
+        self.max_frame_age_ms = max_frame_age_ms
+        self._clock = FrameClock()
         self.is_running = False
         self.was_pressed = False
+        self.gesture_map: dict[str, str] = dict(DEFAULT_GESTURE_MAP)
+        # The snapshot last applied by apply_config(); None until the first.
+        self.config: PipelineConfig | None = None
+        self._active_actions: set[str] = set()
+        self._scroll_remainder = 0.0
+        self.preview: FramePreview | None = None
+        self._actuation_lock = threading.Lock()
+        # Held around every camera read so swap_camera() never replaces a camera mid-read.
+        self._camera_lock = threading.Lock()
+
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.camera_controller.metrics = self.metrics
+        self.tracking_controller.metrics = self.metrics
+        self.cursor_controller.metrics = self.metrics
+
+        self._frames: LatestQueue[tuple[int, FrameBuffer]] = LatestQueue(
+            maxsize=1, on_discard=lambda item: item[1].release()
+        )
+        # Buffers submitted to the landmarker, kept out of the pool until their result arrives.
+        self._in_flight: dict[int, FrameBuffer] = {}
+        self._in_flight_lock = threading.Lock()
+        self._results: LatestQueue[TrackingResult] = LatestQueue(maxsize=1)
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
 
     def start(self):
+        if self.is_running:
+            return
         self.is_running = True
+        self.metrics.reset()
+        self.governor.reset()
+        self.cursor_controller.start()
+        self.tracking_controller.add_result_listener(self._on_result)
+        self.tracking_controller.add_skip_listener(self._on_skipped)
+
+        if self.pipelined:
+            self._stop_event.clear()
+            self._frames.reset()
+            self._results.reset()
+            self._threads = [
+                threading.Thread(target=self._capture_loop, name="wave-vision-capture", daemon=True),
+                threading.Thread(target=self._inference_loop, name="wave-vision-inference", daemon=True),
+                threading.Thread(target=self._actuation_loop, name="wave-vision-actuation", daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
 
     def stop(self):
+        if not self.is_running:
+            return
         self.is_running = False
+        self.tracking_controller.remove_result_listener(self._on_result)
+        self.tracking_controller.remove_skip_listener(self._on_skipped)
+
+        if self.pipelined:
+            self._stop_event.set()
+            self._frames.close()
+            self._results.close()
+            for thread in self._threads:
+                thread.join(timeout=2.0)
+            self._threads = []
+        self._release_in_flight()
+
+        with self._actuation_lock:
+            self._set_pressed(False)
+            self._active_actions = set()
+            self._scroll_remainder = 0.0
+        self.cursor_controller.stop()
+
+    def apply_profile(self, profile: "Profile") -> set[str]:
+        """Apply a profile's tracking, gesture and power-saving settings to this pipeline. See apply_config()."""
+        return self.apply_config(PipelineConfig.from_profile(profile))
+
+    def apply_config(self, config: PipelineConfig) -> set[str]:
+        """
+        Swap in a settings snapshot while the pipeline runs. Only the stages whose settings differ
+        from the current snapshot are touched, each in one step between two frames or results, so
+        no frame is dropped and the cursor filter keeps its state unless its kind changes.
+
+        :return: The stages that changed. "landmarker" means the snapshot asks for another model,
+            delegate or confidences; loading one takes far longer than a frame, so that is left to
+            the caller (see TrackingController.build_detector()).
+        """
+        start = time.perf_counter()
+        stages = config.changed_stages(self.config)
+        self.tracking_controller.apply_config(config, stages)
+        if "governor" in stages:
+            self.governor.configure(
+                enabled=config.power_saving,
+                idle_fps=config.idle_fps,
+                idle_timeout_s=config.idle_timeout_s
+            )
+        if "actions" in stages:
+            with self._actuation_lock:
+                self.gesture_map = dict(config.gesture_map)
+        model_params = self.tracking_controller.model_params
+        if self.tracking_controller.pool is None and config.tracking_params(model_params) != model_params:
+            stages.add("landmarker")
+        self.config = config
+        self.metrics.record("reconfigure", (time.perf_counter() - start) * 1000)
+        return stages
+
+    def swap_camera(self, camera_controller: CameraController) -> CameraController:
+        """
+        Replace the camera between two reads without stopping the pipeline. Returns the previous
+        camera, which no thread reads from any more and can be released by the caller.
+        """
+        camera_controller.metrics = self.metrics
+        with self._camera_lock:
+            previous, self.camera_controller = self.camera_controller, camera_controller
+        return previous
+
+    def release_camera(self):
+        """Close the current camera between two reads, e.g. so the same device can be reopened in another mode."""
+        with self._camera_lock:
+            self.camera_controller.release()
+
+    def _acquire_frame(self) -> FrameBuffer | None:
+        with self._camera_lock:
+            return self.camera_controller.acquire_frame()
+
+    def get_metrics(self) -> dict:
+        snapshot = self.metrics.snapshot()
+        snapshot["governor"] = self.governor.state.value
+        pool = self.camera_controller.pool
+        snapshot["buffer_pool_misses"] = pool.misses if pool is not None else 0
+        snapshot["config_version"] = self.config.version if self.config is not None else None
+        return snapshot
 
     def update(self):
-        if not self.is_running:
+        if not self.is_running or self.pipelined:
+            return
+
+        buffer = self._acquire_frame()
+        if buffer is not None:
+            timestamp_ms = self._on_capture(buffer)
+            self._infer(buffer, timestamp_ms)
+
+    def _on_capture(self, buffer: FrameBuffer) -> int:
+        self.metrics.record_capture()
+        # Stamped from the grab time, not from now: the frame may have sat in the driver's buffer.
+        timestamp_ms = self._clock.stamp(buffer.captured_ms or None)
+        if self.recorder is not None:
+            self.recorder.write_frame(timestamp_ms, buffer.bgr)
+        preview = self.preview
+        if preview is not None:
+            start = time.perf_counter()
+            preview.offer(timestamp_ms, buffer)
+            self.metrics.record("preview_offer", (time.perf_counter() - start) * 1000)
+        return timestamp_ms
+
+    def _infer(self, buffer: FrameBuffer, timestamp_ms: int):
+        """Submit a frame, consuming the caller's reference to its buffer."""
+        if buffer.captured_ms:
+            age_ms = monotonic_ms() - buffer.captured_ms
+            self.metrics.record("frame_age", age_ms)
+            if self.max_frame_age_ms is not None and age_ms > self.max_frame_age_ms:
+                # Tracking a hand from where it was this long ago only makes the cursor lag.
+                self.metrics.record_expired()
+                buffer.release()
+                return
+        if not self.governor.should_infer(buffer.rgb):
+            self.metrics.record_skipped()
+            buffer.release()
+            return
+
+        with self._in_flight_lock:
+            self._in_flight[timestamp_ms] = buffer
+        try:
+            submitted = self.tracking_controller.track(buffer.rgb, timestamp_ms)
+        except Exception:
+            self._release_in_flight(timestamp_ms)
+            raise
+        if not submitted:
+            self._on_skipped(timestamp_ms)
+
+    def _release_in_flight(self, up_to_ms: int | None = None):
+        """Return buffers whose frames have completed, including older ones the landmarker skipped."""
+        with self._in_flight_lock:
+            done = [ts for ts in self._in_flight if up_to_ms is None or ts <= up_to_ms]
+            buffers = [self._in_flight.pop(ts) for ts in done]
+        for buffer in buffers:
+            buffer.release()
+
+    def _on_skipped(self, timestamp_ms: int):
+        with self._in_flight_lock:
+            buffer = self._in_flight.pop(timestamp_ms, None)
+        if buffer is not None:
+            buffer.release()
+
+    def _on_result(self, timestamp_ms: int, tracking_result: TrackingResult | None):
+        self._release_in_flight(timestamp_ms)
+        self.governor.on_result(tracking_result is not None)
+        preview = self.preview
+        if preview is not None:
+            preview.on_result(tracking_result)
+        if tracking_result is None or not self.is_running:
             return
+        self.metrics.record("capture_latency", monotonic_ms() - timestamp_ms)
+        if self.pipelined:
+            # Hand off so the MediaPipe callback thread is never held up by cursor I/O.
+            if self._results.put(tracking_result):
+                self.metrics.record_stale()
+        else:
+            self._actuate(tracking_result)
+
+    def _actuate(self, tracking_result: TrackingResult):
+        with self._actuation_lock:
+            if not self.is_running:
+                return
+            self.metrics.record_delivered()
+            if self.recorder is not None:
+                self.recorder.write_result(tracking_result.timestamp_ms, tracking_result)
+
+            actions = [self.gesture_map.get(gesture, "none") if gesture else "none"
+                       for gesture in tracking_result.gestures]
+            active = set(actions) - {"none"}
+            started = active - self._active_actions
+            self._active_actions = active
+
+            if "pause" in active:
+                # Hold the pointer still, like lifting a mouse off the desk.
+                self._set_pressed(False)
+                return
+            if "scroll" in active:
+                movement = sum(motion for action, motion in zip(actions, tracking_result.hand_motion_y)
+                               if action == "scroll")
+                self._scroll(movement)
+            else:
+                self._scroll_remainder = 0.0
+                self.cursor_controller.move_to(tracking_result.cursor_position_x, tracking_result.cursor_position_y,
+                                               tracking_result.timestamp_ms)
+
+            if "click" in started:
+                self.cursor_controller.click()
+            if "right_click" in started:
+                self.cursor_controller.right_click()
+            self._set_pressed("drag" in active)
+
+    def _set_pressed(self, pressed: bool):
+        if pressed and not self.was_pressed:
+            self.cursor_controller.grab()
+            self.was_pressed = True
+        elif not pressed and self.was_pressed:
+            self.cursor_controller.release()
+            self.was_pressed = False
+
+    def _scroll(self, movement: float):
+        self._scroll_remainder += movement * self.SCROLL_CLICKS_PER_FRAME
+        clicks = int(self._scroll_remainder)
+        if clicks:
+            self._scroll_remainder -= clicks
+            self.cursor_controller.scroll(clicks)
+
+    def _capture_loop(self):
+        while not self._stop_event.is_set():
+            buffer = self._acquire_frame()
+            if buffer is None:
+                self._stop_event.wait(0.01)
+                continue
+            timestamp_ms = self._on_capture(buffer)
+            if self._frames.put((timestamp_ms, buffer)):
+                self.metrics.record_dropped()
+
+    def _inference_loop(self):
+        while not self._stop_event.is_set():
+            item = self._frames.get(timeout=0.1)
+            if item is None:
+                continue
+            timestamp_ms, buffer = item
+            self._infer(buffer, timestamp_ms)
 
-        frame = self.camera_controller.get_frame()
-        if frame is not None:
-            timestamp_ms = int(time.time() * 1000)
-            tracking_result = self.tracking_controller.track(frame, timestamp_ms)
+    def _actuation_loop(self):
+        while not self._stop_event.is_set():
+            tracking_result = self._results.get(timeout=0.1)
             if tracking_result is not None:
-                self.cursor_controller.move_to(tracking_result.cursor_position_x, tracking_result.cursor_position_y)
-
-                if tracking_result.pressed and not self.was_pressed:
-                    self.cursor_controller.grab()
-                    self.was_pressed = True
-                elif not tracking_result.pressed and self.was_pressed:
-                    self.cursor_controller.release()
-                    self.was_pressed = False
+                self._actuate(tracking_result)
@@ -0,0 +1,172 @@
+import math
+
+import numpy as np
+
+
+class CursorFilter:
+    """
+    Smooths a stream of 2D cursor positions. Every filter keeps its state as NumPy arrays holding
+    both axes, so each update is a handful of vectorized operations regardless of the filter.
+    """
+    PARAMS: tuple[str, ...] = ()
+
+    def __init__(self):
+        self.value: np.ndarray | None = None
+        self.last_time: float | None = None
+
+    def configure(self, **params):
+        """Update tuning parameters in place without discarding the current state."""
+        for name in self.PARAMS:
+            if name in params and params[name] is not None:
+                setattr(self, name, float(params[name]))
+
+    def reset(self):
+        self.value = None
+        self.last_time = None
+
+    def update(self, point: np.ndarray, timestamp_s: float) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict(self, horizon_s: float) -> np.ndarray:
+        """Estimate the position horizon_s seconds after the last update. Filters without a velocity model hold still."""
+        return self.value
+
+
+class ExponentialFilter(CursorFilter):
+    """
+    Fixed exponential moving average.
+
+    :param alpha: Weight of the newest sample, 1.0 disables smoothing.
+    """
+    PARAMS = ("alpha",)
+
+    def __init__(self, alpha: float = 0.3):
+        super().__init__()
+        self.alpha = alpha
+
+    def update(self, point: np.ndarray, timestamp_s: float) -> np.ndarray:
+        if self.value is None:
+            self.value = point.astype(np.float64)
+        else:
+            self.value = self.alpha * point + (1 - self.alpha) * self.value
+        self.last_time = timestamp_s
+        return self.value
+
+
+class OneEuroFilter(CursorFilter):
+    """
+    Speed-adaptive low-pass filter (Casiez et al., 2012): heavy smoothing while the hand is nearly
+    still, little lag while it moves fast.
+
+    :param min_cutoff: Cutoff frequency in Hz at zero speed. Lower removes more jitter.
+    :param beta: How quickly the cutoff rises with speed (per pixel/second). Higher reduces lag.
+    :param d_cutoff: Cutoff frequency in Hz for the speed estimate itself.
+    """
+    PARAMS = ("min_cutoff", "beta", "d_cutoff")
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.01, d_cutoff: float = 1.0):
+        super().__init__()
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.derivative = np.zeros(2)
+
+    @staticmethod
+    def _smoothing_factor(cutoff: np.ndarray | float, dt: float) -> np.ndarray | float:
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self):
+        super().reset()
+        self.derivative = np.zeros(2)
+
+    def update(self, point: np.ndarray, timestamp_s: float) -> np.ndarray:
+        if self.value is None or self.last_time is None or timestamp_s <= self.last_time:
+            if self.value is None:
+                self.value = point.astype(np.float64)
+            self.last_time = timestamp_s if self.last_time is None else max(self.last_time, timestamp_s)
+            return self.value
+
+        dt = timestamp_s - self.last_time
+        raw_derivative = (point - self.value) / dt
+        a_d = self._smoothing_factor(self.d_cutoff, dt)
+        self.derivative = a_d * raw_derivative + (1 - a_d) * self.derivative
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self.derivative)
+        a = self._smoothing_factor(cutoff, dt)
+        self.value = a * point + (1 - a) * self.value
+        self.last_time = timestamp_s
+        return self.value
+
+    def predict(self, horizon_s: float) -> np.ndarray:
+        if self.value is None:
+            return self.value
+        return self.value + self.derivative * horizon_s
+
+
+class KalmanFilter(CursorFilter):
+    """
+    Constant-velocity Kalman filter run independently on each axis. State is stored as a (2, 2)
+    array of [position, velocity] per axis with a (2, 2, 2) covariance, so both axes update together.
+
+    :param process_noise: Acceleration noise density in pixels^2/s^3. Higher follows direction changes faster.
+    :param measurement_noise: Landmark position variance in pixels^2. Higher smooths more.
+    """
+    PARAMS = ("process_noise", "measurement_noise")
+
+    def __init__(self, process_noise: float = 2000.0, measurement_noise: float = 4.0):
+        super().__init__()
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.state = np.zeros((2, 2))
+        self.covariance = np.zeros((2, 2, 2))
+
+    def reset(self):
+        super().reset()
+        self.state = np.zeros((2, 2))
+        self.covariance = np.zeros((2, 2, 2))
+
+    def update(self, point: np.ndarray, timestamp_s: float) -> np.ndarray:
+        if self.value is None:
+            self.state = np.stack([point.astype(np.float64), np.zeros(2)], axis=1)
+            self.covariance = np.tile(np.diag([self.measurement_noise, 1e4]), (2, 1, 1))
+            self.value = self.state[:, 0].copy()
+            self.last_time = timestamp_s
+            return self.value
+
+        dt = max(timestamp_s - self.last_time, 1e-3)
+        transition = np.array([[1.0, dt], [0.0, 1.0]])
+        noise = self.process_noise * np.array([[dt ** 3 / 3, dt ** 2 / 2], [dt ** 2 / 2, dt]])
+
+        # Predict: x = F x, P = F P F^T + Q for both axes at once.
+        state = self.state @ transition.T
+        covariance = transition @ self.covariance @ transition.T + noise
+
+        # Update with a position-only measurement (H = [1, 0]).
+        innovation = point - state[:, 0]
+        innovation_variance = covariance[:, 0, 0] + self.measurement_noise
+        gain = covariance[:, :, 0] / innovation_variance[:, None]
+        self.state = state + gain * innovation[:, None]
+        self.covariance = covariance - gain[:, :, None] * covariance[:, None, 0, :]
+
+        self.value = self.state[:, 0].copy()
+        self.last_time = timestamp_s
+        return self.value
+
+    def predict(self, horizon_s: float) -> np.ndarray:
+        if self.value is None:
+            return self.value
+        return self.state[:, 0] + self.state[:, 1] * horizon_s
+
+
+FILTER_TYPES = {
+    "ema": ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def create_filter(kind: str, **params) -> CursorFilter:
+    cursor_filter = FILTER_TYPES[kind]()
+    cursor_filter.configure(**params)
+    return cursor_filter
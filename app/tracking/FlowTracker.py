@@ -0,0 +1,193 @@
+import threading
+
+import cv2
+import numpy as np
+
+from app.tracking.HandLandmarks import HandLandmarks
+
+
+class FlowTracker:
+    """
+    Fast path between full landmarker runs. Only every interval-th frame goes to the landmarker; the
+    landmarks of the frames in between are propagated from the last detection with pyramidal
+    Lucas-Kanade optical flow on a small, downscaled grey patch around the hand. Each point is
+    tracked forward and back again, and a point whose round trip misses its start by more than
+    max_drift_px is considered lost. Lost points follow the median motion of the rest of their
+    hand; if too many are lost, or the last detection was not confident, the next frame goes to the
+    landmarker instead.
+
+    A frame that arrives while the landmarker is still working on an earlier one is held back until
+    that detection returns, then propagated from it, so a landmarker slower than a frame is never
+    overtaken by the flow. If the detection has not come back by the time the next one is due, the
+    held frames are propagated from the previous detection instead. Either way, the landmarks come
+    out of ready(), in frame order.
+
+    track() is called on the inference thread and on_detection() on the landmarker's result thread.
+
+    :param interval: Run the landmarker on every interval-th frame. 1 disables the fast path.
+    :param scale: Downscale factor of the grey frames the flow is computed on.
+    :param max_drift_px: Forward-backward error, in downscaled pixels, above which a point is lost.
+    :param min_tracked: Fraction of each hand's points that must survive for a propagation to count.
+    :param min_confidence: Detections with a lower handedness score are not propagated.
+    :param window: Lucas-Kanade search window side, in downscaled pixels.
+    :param levels: Pyramid levels above the base image, for larger motions.
+    """
+
+    def __init__(self, interval: int = 3, scale: float = 0.5, max_drift_px: float = 1.0, min_tracked: float = 0.75,
+                 min_confidence: float = 0.8, window: int = 11, levels: int = 2):
+        self.interval = interval
+        self.scale = scale
+        self.max_drift_px = max_drift_px
+        self.min_tracked = min_tracked
+        self.min_confidence = min_confidence
+        self.window = window
+        self.levels = levels
+        self.propagated = 0
+        self.fallbacks = 0
+        self.deferred = 0
+        self._lock = threading.Lock()
+        # Grey frames sent to the landmarker, kept until their result arrives to anchor the flow.
+        self._pending: dict[int, np.ndarray] = {}
+        self._detected_ms = -1
+        self._since_detection = 0
+        # The last frame sent to the landmarker, and the grey frames held back for its result.
+        self._awaiting_ms: int | None = None
+        self._deferred: list[tuple[int, np.ndarray]] = []
+        self._ready: list[tuple[int, HandLandmarks]] = []
+        # The frame the points were last located in, its (hands, 21, 2) points in downscaled pixels,
+        # and the depth of each landmark, carried over from the detection unchanged.
+        self._gray: np.ndarray | None = None
+        self._points: np.ndarray | None = None
+        self._depth: np.ndarray | None = None
+        self._handedness: np.ndarray | None = None
+        self._confidence: np.ndarray | None = None
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._deferred.clear()
+            self._ready.clear()
+            self._awaiting_ms = None
+            self._detected_ms = -1
+            self._since_detection = 0
+            self._gray = self._points = self._depth = None
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        size = (max(1, round(gray.shape[1] * self.scale)), max(1, round(gray.shape[0] * self.scale)))
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+    def track(self, frame: np.ndarray, timestamp_ms: int, into: HandLandmarks | None = None) -> bool:
+        """
+        Propagate the hand landmarks into this RGB frame, now or once the detection in flight returns.
+
+        :param into: Container to fill when propagating right away, instead of a new one.
+        :return: True if the flow took the frame, and its landmarks, normalized to the frame, with the
+            handedness and confidence of the last detection, will come out of ready(). False when the
+            frame has to go to the landmarker, and on_detection() must then be called with its result.
+        """
+        gray = self._downscale(frame)
+        with self._lock:
+            if self._points is not None and self._since_detection + 1 < self.interval:
+                if self._awaiting_ms is not None:
+                    self._since_detection += 1
+                    self._deferred.append((timestamp_ms, gray))
+                    self.deferred += 1
+                    return True
+                landmarks = self._propagate(gray)
+                if landmarks is not None:
+                    self._since_detection += 1
+                    self.propagated += 1
+                    if into is None or into.capacity < len(landmarks):
+                        into = HandLandmarks(len(landmarks))
+                    self._ready.append((timestamp_ms, into.fill(landmarks, self._handedness, self._confidence)))
+                    return True
+                self.fallbacks += 1
+                self._points = None
+            # The landmarker skipped the awaited frame or is slower than the interval: stop waiting.
+            self._propagate_deferred()
+            self._since_detection = 0
+            self._awaiting_ms = timestamp_ms
+            self._pending[timestamp_ms] = gray
+            # Frames the landmarker silently skipped never get a result.
+            while len(self._pending) > 8:
+                self._pending.pop(next(iter(self._pending)))
+            return False
+
+    def on_detection(self, timestamp_ms: int, hands: HandLandmarks | None):
+        """Re-anchor on the landmarker's result for a frame that track() handed over."""
+        with self._lock:
+            gray = self._pending.pop(timestamp_ms, None)
+            for ts in [ts for ts in self._pending if ts < timestamp_ms]:
+                del self._pending[ts]
+            if gray is not None and timestamp_ms >= self._detected_ms:
+                self._anchor(timestamp_ms, gray, hands)
+            if self._awaiting_ms is not None and timestamp_ms >= self._awaiting_ms:
+                self._awaiting_ms = None
+                self._propagate_deferred()
+
+    def ready(self) -> list[tuple[int, HandLandmarks]]:
+        """Take the (timestamp_ms, hands) of the frames propagated since the last call, oldest first."""
+        with self._lock:
+            ready, self._ready = self._ready, []
+            return ready
+
+    def _anchor(self, timestamp_ms: int, gray: np.ndarray, hands: HandLandmarks | None):
+        self._detected_ms = timestamp_ms
+        if hands is None or not len(hands) or float(np.min(hands.confidence)) < self.min_confidence:
+            self._points = None
+            return
+        size = np.array([gray.shape[1], gray.shape[0]], dtype=np.float32)
+        self._gray = gray
+        self._points = hands.points[..., :2] * size
+        self._depth = hands.points[..., 2:].copy()
+        self._handedness = hands.handedness.copy()
+        self._confidence = hands.confidence.copy()
+
+    def _propagate_deferred(self):
+        """Propagate the held-back frames in order, dropping them once the hand is lost."""
+        deferred, self._deferred = self._deferred, []
+        for timestamp_ms, gray in deferred:
+            if self._points is None:
+                return
+            landmarks = self._propagate(gray)
+            if landmarks is None:
+                self.fallbacks += 1
+                self._points = None
+                return
+            self.propagated += 1
+            hands = HandLandmarks(len(landmarks)).fill(landmarks, self._handedness, self._confidence)
+            self._ready.append((timestamp_ms, hands))
+
+    def _propagate(self, gray: np.ndarray) -> np.ndarray | None:
+        points = self._points.reshape(-1, 2)
+        # One patch covering every hand, with room for the hand to move by a window in any direction.
+        low = np.maximum(np.floor(points.min(axis=0)) - self.window, 0).astype(int)
+        high = np.minimum(np.ceil(points.max(axis=0)) + self.window, (gray.shape[1], gray.shape[0])).astype(int)
+        if np.any(high - low < self.window):
+            return None
+        previous_patch = self._gray[low[1]:high[1], low[0]:high[0]]
+        patch = gray[low[1]:high[1], low[0]:high[0]]
+
+        start = (points - low).astype(np.float32).reshape(-1, 1, 2)
+        window = (self.window, self.window)
+        moved, found, _ = cv2.calcOpticalFlowPyrLK(previous_patch, patch, start, None,
+                                                   winSize=window, maxLevel=self.levels)
+        back, found_back, _ = cv2.calcOpticalFlowPyrLK(patch, previous_patch, moved, None,
+                                                       winSize=window, maxLevel=self.levels)
+        drift = np.linalg.norm((back - start).reshape(-1, 2), axis=1)
+        good = (found.ravel() == 1) & (found_back.ravel() == 1) & (drift <= self.max_drift_px)
+
+        hands = self._points.shape[0]
+        good = good.reshape(hands, -1)
+        if np.any(good.mean(axis=1) < self.min_tracked):
+            return None
+        motion = (moved - start).reshape(hands, -1, 2)
+        for hand in range(hands):
+            if not good[hand].all():
+                motion[hand, ~good[hand]] = np.median(motion[hand, good[hand]], axis=0)
+
+        self._gray = gray
+        self._points = self._points + motion
+        size = np.array([gray.shape[1], gray.shape[0]], dtype=np.float32)
+        return np.concatenate([self._points / size, self._depth], axis=-1)
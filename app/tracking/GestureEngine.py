@@ -0,0 +1,133 @@
+import numpy as np
+
+from app.tracking.Gestures import GESTURES
+
+MIDDLE_MCP = 9
+# Landmark indexes (MCP, PIP, DIP, TIP) of each finger, thumb first.
+FINGER_JOINTS = np.array([
+    [1, 2, 3, 4],
+    [5, 6, 7, 8],
+    [9, 10, 11, 12],
+    [13, 14, 15, 16],
+    [17, 18, 19, 20],
+])
+FINGERTIPS = FINGER_JOINTS[:, 3]
+
+# Bend, in radians, between a finger's proximal and distal segments. Each state has a stricter
+# threshold to enter it and a looser one to stay in it, so a finger near the boundary does not flicker.
+EXTENDED_ENTER, EXTENDED_HOLD = 0.6, 0.9
+CURLED_ENTER, CURLED_HOLD = 1.8, 1.5
+
+
+def hand_features(landmarks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the features used for classification for every hand at once.
+
+    :param landmarks: (hands, 21, 2 or 3) landmarks normalized to the camera frame.
+    :return: (hands, 5, 5) pairwise fingertip distances in the x/y plane, and the (hands, 5) bend
+        angle of each finger from thumb to pinky.
+    """
+    tips = landmarks[:, FINGERTIPS, :2]
+    tip_distances = np.linalg.norm(tips[:, :, None, :] - tips[:, None, :, :], axis=-1)
+
+    proximal = landmarks[:, FINGER_JOINTS[:, 1]] - landmarks[:, FINGER_JOINTS[:, 0]]
+    distal = landmarks[:, FINGER_JOINTS[:, 3]] - landmarks[:, FINGER_JOINTS[:, 2]]
+    cosine = np.sum(proximal * distal, axis=-1) / (
+        np.linalg.norm(proximal, axis=-1) * np.linalg.norm(distal, axis=-1) + 1e-9)
+    bend = np.arccos(np.clip(cosine, -1.0, 1.0))
+    return tip_distances, bend
+
+
+class _HandState:
+    __slots__ = ("active", "pending", "pending_frames", "last_y")
+
+    def __init__(self):
+        self.active: str | None = None
+        self.pending: str | None = None
+        self.pending_frames = 0
+        self.last_y: float | None = None
+
+
+class GestureEngine:
+    """
+    Classifies the pose of every tracked hand into one of GESTURES (or None) each frame. Features for
+    all hands are computed in one vectorized pass; only the small per-hand state machine is a Python
+    loop. Gestures use hysteresis (a looser threshold to stay active than to become active) and are
+    debounced, so a new gesture or a release has to hold for debounce_frames consecutive frames.
+
+    :param pinch_threshold: Fingertip distance, normalized to the frame, below which a pinch starts.
+    :param release_ratio: A pinch is held until the distance grows past pinch_threshold times this.
+    :param debounce_frames: Consecutive frames a changed classification must persist before it applies.
+    """
+
+    def __init__(self, pinch_threshold: float = 0.05, release_ratio: float = 1.3, debounce_frames: int = 2):
+        self.pinch_threshold = pinch_threshold
+        self.release_ratio = release_ratio
+        self.debounce_frames = debounce_frames
+        self._hands: list[_HandState] = []
+
+    def reset(self):
+        self._hands = []
+
+    def classify(self, landmarks: np.ndarray) -> tuple[list[str | None], list[float]]:
+        """
+        Update with this frame's (hands, 21, 2 or 3) landmarks, in the landmarker's hand order.
+
+        :return: The active gesture of each hand, and how far each hand moved up since the previous
+            frame while holding the same gesture, in frame heights. The latter drives scrolling.
+        """
+        hand_count = len(landmarks)
+        if hand_count != len(self._hands):
+            self._hands = [_HandState() for _ in range(hand_count)]
+        if hand_count == 0:
+            return [], []
+
+        tip_distances, bend = hand_features(landmarks)
+        index_pinch = tip_distances[:, 0, 1]
+        middle_pinch = tip_distances[:, 0, 2]
+        enter = self.pinch_threshold
+        hold = self.pinch_threshold * self.release_ratio
+
+        fingers = bend[:, 1:]
+        extended_enter, extended_hold = fingers < EXTENDED_ENTER, fingers < EXTENDED_HOLD
+        curled_enter, curled_hold = fingers > CURLED_ENTER, fingers > CURLED_HOLD
+
+        # (hands, gestures) conditions for entering and for staying in each gesture, in GESTURES order.
+        conditions_enter = np.stack([
+            index_pinch < enter,
+            (middle_pinch < enter) & (index_pinch > middle_pinch),
+            extended_enter[:, 0] & extended_enter[:, 1] & curled_enter[:, 2] & curled_enter[:, 3] & (index_pinch > hold),
+            curled_enter.all(axis=1),
+        ], axis=1)
+        conditions_hold = np.stack([
+            index_pinch < hold,
+            middle_pinch < hold,
+            extended_hold[:, 0] & extended_hold[:, 1] & curled_hold[:, 2] & curled_hold[:, 3],
+            curled_hold.all(axis=1),
+        ], axis=1)
+        # Fist first: a closed hand also brings the thumb and index tips together.
+        priority = (3, 2, 1, 0)
+
+        gestures = []
+        motion = []
+        for hand, state in enumerate(self._hands):
+            if state.active is not None and conditions_hold[hand, GESTURES.index(state.active)]:
+                candidate = state.active
+            else:
+                candidate = next((GESTURES[g] for g in priority if conditions_enter[hand, g]), None)
+
+            if candidate == state.active:
+                state.pending, state.pending_frames = None, 0
+            elif candidate == state.pending:
+                state.pending_frames += 1
+            else:
+                state.pending, state.pending_frames = candidate, 1
+            y = float(landmarks[hand, MIDDLE_MCP, 1])
+            if state.pending_frames >= self.debounce_frames:
+                state.active, state.pending, state.pending_frames = candidate, None, 0
+                state.last_y = None
+
+            motion.append(0.0 if state.last_y is None or state.active is None else state.last_y - y)
+            state.last_y = y
+            gestures.append(state.active)
+        return gestures, motion
@@ -0,0 +1,10 @@
+# Kept free of numpy so preferences and the UI can use these names without loading the tracking stack.
+GESTURES = ("index_pinch", "middle_pinch", "two_fingers", "fist")
+ACTIONS = ("none", "click", "right_click", "drag", "scroll", "pause")
+# Matches the original behaviour of a thumb-index pinch holding the mouse button down.
+DEFAULT_GESTURE_MAP = {
+    "index_pinch": "drag",
+    "middle_pinch": "right_click",
+    "two_fingers": "scroll",
+    "fist": "pause",
+}
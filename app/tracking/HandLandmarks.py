@@ -0,0 +1,108 @@
+import itertools
+
+import numpy as np
+
+LANDMARK_COUNT = 21
+THUMB_TIP = 4
+INDEX_TIP = 8
+# Values of HandLandmarks.handedness.
+LEFT, RIGHT, UNKNOWN = 0, 1, -1
+
+
+class HandLandmarks:
+    """
+    The hands found in one frame, as arrays: points (hands, 21, 3) float32 normalized to the image
+    (x, y) with relative depth z, handedness (hands,) as LEFT or RIGHT, and confidence (hands,), the
+    handedness score. Hands are in the landmarker's order; the first one drives the cursor.
+
+    The arrays are views of storage sized for capacity hands, allocated once. LandmarkRing reuses
+    that storage for later frames, so a consumer that keeps a result for long must copy() it.
+    """
+    __slots__ = ("count", "points", "handedness", "confidence", "_points", "_handedness", "_confidence")
+
+    def __init__(self, capacity: int = 1):
+        self._points = np.zeros((capacity, LANDMARK_COUNT, 3), dtype=np.float32)
+        self._handedness = np.full(capacity, UNKNOWN, dtype=np.int8)
+        self._confidence = np.zeros(capacity, dtype=np.float32)
+        self._resize(0)
+
+    def _resize(self, count: int):
+        self.count = count
+        self.points = self._points[:count]
+        self.handedness = self._handedness[:count]
+        self.confidence = self._confidence[:count]
+
+    @property
+    def capacity(self) -> int:
+        return len(self._points)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def fill_from_result(self, result) -> "HandLandmarks":
+        """Convert a MediaPipe HandLandmarkerResult in place. Hands beyond capacity are ignored."""
+        hands = result.hand_landmarks[:self.capacity]
+        self._resize(len(hands))
+        # Column by column over every hand at once: numpy converts a flat list of floats much faster
+        # than a list of tuples.
+        landmarks = [landmark for hand in hands for landmark in hand]
+        points = self._points[:len(hands)].reshape(-1, 3)
+        points[:, 0] = [landmark.x for landmark in landmarks]
+        points[:, 1] = [landmark.y for landmark in landmarks]
+        points[:, 2] = [landmark.z for landmark in landmarks]
+        for hand, categories in enumerate(result.handedness[:len(hands)]):
+            self._handedness[hand] = RIGHT if categories[0].category_name == "Right" else LEFT
+            self._confidence[hand] = categories[0].score
+        return self
+
+    def fill(self, points: np.ndarray, handedness: np.ndarray | None = None,
+             confidence: np.ndarray | None = None) -> "HandLandmarks":
+        """Copy in (hands, 21, 3) points and their per-hand handedness and confidence, if known."""
+        count = min(len(points), self.capacity)
+        self._resize(count)
+        np.copyto(self.points, points[:count])
+        self.handedness[:] = UNKNOWN if handedness is None else handedness[:count]
+        self.confidence[:] = 1.0 if confidence is None else confidence[:count]
+        return self
+
+    def __reduce__(self):
+        # Pickled (to and from the inference worker process) as just the hands in use.
+        return _rebuild, (self.points.copy(), self.handedness.copy(), self.confidence.copy())
+
+    def copy(self) -> "HandLandmarks":
+        return HandLandmarks(max(self.count, 1)).fill(self.points, self.handedness, self.confidence)
+
+    def pinch_distances(self) -> np.ndarray:
+        """(hands,) thumb-to-index fingertip distance in the image plane."""
+        return np.linalg.norm(self.points[:, THUMB_TIP, :2] - self.points[:, INDEX_TIP, :2], axis=-1)
+
+    def pinch_points(self) -> np.ndarray:
+        """(hands, 2) midpoint between the thumb and index fingertips."""
+        return (self.points[:, THUMB_TIP, :2] + self.points[:, INDEX_TIP, :2]) * 0.5
+
+    @classmethod
+    def from_result(cls, result, capacity: int = 1) -> "HandLandmarks | None":
+        """A new container for a HandLandmarkerResult, or None when it found no hand."""
+        if not result.hand_landmarks:
+            return None
+        return cls(max(capacity, len(result.hand_landmarks))).fill_from_result(result)
+
+
+def _rebuild(points: np.ndarray, handedness: np.ndarray, confidence: np.ndarray) -> HandLandmarks:
+    return HandLandmarks(max(len(points), 1)).fill(points, handedness, confidence)
+
+
+class LandmarkRing:
+    """
+    A fixed set of HandLandmarks handed out in turn, so converting a result allocates nothing. A
+    container is overwritten size results later; consumers that only look at the newest result, like
+    every stage of the pipeline, never see that happen.
+    """
+
+    def __init__(self, capacity: int = 1, size: int = 8):
+        self._slots = [HandLandmarks(capacity) for _ in range(size)]
+        # next() on a count is atomic, so the result and inference threads can both acquire.
+        self._counter = itertools.count()
+
+    def acquire(self) -> HandLandmarks:
+        return self._slots[next(self._counter) % len(self._slots)]
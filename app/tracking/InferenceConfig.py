@@ -0,0 +1,152 @@
+import glob
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import TYPE_CHECKING
+
+import mediapipe as mp
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.camera.CameraController import CameraController
+
+DEFAULT_MODEL_PATH = "models/hand_landmarker.task"
+DELEGATES = ("cpu", "gpu")
+# Settings key of the configuration chosen by select() on this machine.
+SELECTION_SETTING = "inference_selection"
+
+
+@dataclass(frozen=True)
+class InferenceConfig:
+    """
+    Which model runs hand detection, and on what.
+
+    :param model_path: Hand landmarker .task bundle.
+    :param delegate: "cpu" or "gpu". The GPU delegate is not available on every platform or build
+        of MediaPipe; creating a landmarker with it then fails.
+    """
+    model_path: str = DEFAULT_MODEL_PATH
+    delegate: str = "cpu"
+
+    def base_options(self) -> mp.tasks.BaseOptions:
+        delegate = mp.tasks.BaseOptions.Delegate.GPU if self.delegate == "gpu" else mp.tasks.BaseOptions.Delegate.CPU
+        return mp.tasks.BaseOptions(model_asset_path=self.model_path, delegate=delegate)
+
+    def describe(self) -> str:
+        return f"{os.path.basename(self.model_path)} on {self.delegate.upper()}"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "InferenceConfig | None":
+        """Rebuild a stored configuration, or None if nothing usable was stored."""
+        names = {field.name for field in fields(cls)}
+        try:
+            return cls(**{key: value for key, value in data.items() if key in names})
+        except TypeError:
+            return None
+
+
+def available_models(directory: str = "models") -> list[str]:
+    """Hand landmarker model variants installed next to the default one, e.g. a lite and a full bundle."""
+    return sorted(glob.glob(os.path.join(directory, "hand_landmarker*.task")))
+
+
+def fingerprint(models: list[str]) -> str:
+    """
+    Identifies the machine and the installed models. A stored selection is only trusted while this
+    is unchanged, so new hardware, a MediaPipe upgrade or a new model variant triggers a new one.
+    """
+    parts = [platform.system(), platform.machine(), platform.processor(), str(os.cpu_count()), mp.__version__]
+    for path in models:
+        try:
+            parts.append(f"{os.path.basename(path)}:{os.path.getsize(path)}")
+        except OSError:
+            parts.append(os.path.basename(path))
+    return "|".join(parts)
+
+
+def sample_frames(camera: "CameraController", count: int = 20) -> list[np.ndarray]:
+    """Copies of the next count RGB frames from a camera or replay that nothing else is reading."""
+    frames = []
+    for _ in range(count * 2):
+        buffer = camera.acquire_frame()
+        if buffer is None:
+            continue
+        frames.append(buffer.rgb.copy())
+        buffer.release()
+        if len(frames) == count:
+            break
+    return frames
+
+
+def measure(config: InferenceConfig, frames: list[np.ndarray], num_hands: int = 1, warm_up: int = 2) -> dict | None:
+    """
+    Time synchronous detection with one configuration on the given RGB frames.
+
+    :return: {"p50": ms, "p95": ms}, or None if the configuration cannot run here.
+    """
+    options = mp.tasks.vision.HandLandmarkerOptions(
+        base_options=config.base_options(),
+        num_hands=num_hands,
+        running_mode=mp.tasks.vision.RunningMode.IMAGE
+    )
+    try:
+        landmarker = mp.tasks.vision.HandLandmarker.create_from_options(options)
+    except (RuntimeError, ValueError, FileNotFoundError, NotImplementedError):
+        return None
+
+    images = [mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(frame)) for frame in frames]
+    timings = []
+    try:
+        for image in images[:warm_up]:
+            landmarker.detect(image)
+        for image in images:
+            start = time.perf_counter()
+            landmarker.detect(image)
+            timings.append((time.perf_counter() - start) * 1000)
+    except RuntimeError:
+        return None
+    finally:
+        landmarker.close()
+    if not timings:
+        return None
+    p50, p95 = np.percentile(timings, (50, 95))
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3)}
+
+
+def select(frames: list[np.ndarray], models: list[str] | None = None, delegates: tuple[str, ...] = DELEGATES,
+           target_ms: float = 25.0, num_hands: int = 1) -> dict:
+    """
+    Measure every model and delegate combination and choose the fastest whose p95 detection time
+    meets target_ms. If none does, the fastest overall is chosen and meets_target is False.
+
+    :param frames: Sample RGB frames from the camera that will be tracked.
+    :param models: Model files to try. Defaults to available_models(), or the default model.
+    :return: The chosen InferenceConfig.to_dict(), with its timings, target_ms, meets_target and
+        every candidate's timings.
+    """
+    models = models or available_models() or [DEFAULT_MODEL_PATH]
+    candidates = []
+    for model_path in models:
+        for delegate in delegates:
+            config = InferenceConfig(model_path, delegate)
+            timings = measure(config, frames, num_hands=num_hands)
+            if timings is not None:
+                candidates.append({**config.to_dict(), **timings})
+    if not candidates:
+        raise RuntimeError(f"no hand landmarker configuration could run (models: {', '.join(models)})")
+
+    candidates.sort(key=lambda candidate: candidate["p95"])
+    meeting = [candidate for candidate in candidates if candidate["p95"] <= target_ms]
+    chosen = meeting[0] if meeting else candidates[0]
+    return {**chosen, "target_ms": target_ms, "meets_target": bool(meeting), "candidates": candidates}
+
+
+def cached_selection(selection: dict | None, models: list[str], target_ms: float) -> InferenceConfig | None:
+    """The configuration in a stored selection, if it was made for this target on this machine with these models."""
+    if not selection or selection.get("fingerprint") != fingerprint(models) or selection.get("target_ms") != target_ms:
+        return None
+    return InferenceConfig.from_dict(selection)
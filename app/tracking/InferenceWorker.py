@@ -0,0 +1,232 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.tracking.HandLandmarks import HandLandmarks
+    from app.tracking.InferenceConfig import InferenceConfig
+
+# (timestamp_ms, the hands found, normalized to the submitted image, or None).
+WorkerResultHandler = Callable[[int, "HandLandmarks | None"], None]
+
+
+def _worker_main(config: "InferenceConfig", num_hands: int, confidence: dict[str, float], shm_name: str,
+                 slot_bytes: int, requests: Connection, results: Connection):
+    """Entry point of the inference process. Owns the HandLandmarker and reads frames from shared memory."""
+    import mediapipe as mp
+
+    from app.tracking.HandLandmarks import HandLandmarks
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    options = mp.tasks.vision.HandLandmarkerOptions(
+        base_options=config.base_options(),
+        num_hands=num_hands,
+        **confidence,
+        running_mode=mp.tasks.vision.RunningMode.VIDEO
+    )
+    landmarker = mp.tasks.vision.HandLandmarker.create_from_options(options)
+    # Warm up on a blank frame so the first real frame does not pay for graph initialization.
+    blank = np.zeros((256, 256, 3), dtype=np.uint8)
+    landmarker.detect_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=blank), 0)
+    results.send(("ready", 0, -1, None))
+
+    try:
+        while True:
+            request = requests.recv()
+            if request is None:
+                break
+            # Only the newest frame matters; hand older ones straight back as skipped.
+            while requests.poll():
+                newer = requests.recv()
+                if newer is None:
+                    return
+                results.send(("skipped", request[0], request[1], None))
+                request = newer
+
+            timestamp_ms, slot, height, width = request
+            offset = slot * slot_bytes
+            frame = np.ndarray((height, width, 3), dtype=np.uint8, buffer=shm.buf, offset=offset)
+            image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+            del frame
+            result = landmarker.detect_for_video(image, timestamp_ms)
+            results.send(("result", timestamp_ms, slot, HandLandmarks.from_result(result, num_hands)))
+    finally:
+        landmarker.close()
+        shm.close()
+
+
+class InferenceWorker:
+    """
+    Runs the HandLandmarker in a separate process so inference never competes with the UI and
+    actuation threads for the GIL. Frames are copied into a ring of shared-memory slots and only
+    (timestamp, slot, size) goes over the request pipe; compact landmark arrays come back on a
+    second pipe. A supervisor thread restarts the process if it dies.
+
+    :param config: Model and delegate the landmarker runs with.
+    :param on_result: Called from the receiver thread for every processed frame.
+    :param max_frame_shape: Largest (height, width) that will be submitted.
+    :param slots: Number of shared-memory frame slots.
+    :param on_skipped: Called with the timestamp of every frame the worker skipped for a newer one,
+        or lost when it crashed.
+    :param max_restarts: Crashes after which the worker is given up on and refuses every frame.
+    :param confidence: HandLandmarkerOptions confidence thresholds, by option name.
+    :param on_failed: Called from the receiver thread with the reason once the worker is given up on.
+    """
+
+    def __init__(self, config: "InferenceConfig", on_result: WorkerResultHandler, num_hands: int = 1,
+                 max_frame_shape: tuple[int, int] = (480, 640), slots: int = 3,
+                 on_skipped: Callable[[int], None] | None = None, max_restarts: int = 5,
+                 confidence: dict[str, float] | None = None, on_failed: Callable[[Exception], None] | None = None):
+        self.config = config
+        self.confidence = confidence or {}
+        self.num_hands = num_hands
+        self.on_result = on_result
+        self.on_skipped = on_skipped
+        self.on_failed = on_failed
+        self.slot_bytes = max_frame_shape[0] * max_frame_shape[1] * 3
+        self.slot_count = slots
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.failed = False
+
+        self._context = multiprocessing.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * slots)
+        self._lock = threading.Lock()
+        self._free_slots = list(range(slots))
+        # Timestamp of the frame in each slot the worker has not answered yet.
+        self._slot_frames: dict[int, int] = {}
+        self._closing = False
+        self._ready = threading.Event()
+        self._process = None
+        self._requests: Connection | None = None
+        self._results: Connection | None = None
+        self._launch()
+
+        self._receiver = threading.Thread(target=self._receive_loop, name="wave-vision-inference-worker", daemon=True)
+        self._receiver.start()
+
+    def _launch(self):
+        request_receive, request_send = self._context.Pipe(duplex=False)
+        result_receive, result_send = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.config, self.num_hands, self.confidence, self._shm.name, self.slot_bytes, request_receive, result_send),
+            name="wave-vision-landmarker",
+            daemon=True
+        )
+        process.start()
+        # Drop the parent's copies of the child's ends so a crash shows up as EOF.
+        request_receive.close()
+        result_send.close()
+        self._ready.clear()
+        with self._lock:
+            self._process = process
+            self._requests = request_send
+            self._results = result_receive
+            self._free_slots = list(range(self.slot_count))
+            self._slot_frames.clear()
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until the worker has loaded its model. Frames submitted before then are dropped."""
+        return self._ready.wait(timeout)
+
+    def submit(self, frame: np.ndarray, timestamp_ms: int) -> bool:
+        """Copy a frame into a free slot and queue it. Returns False if it had to be dropped."""
+        height, width = frame.shape[:2]
+        size = height * width * 3
+        if size > self.slot_bytes:
+            raise ValueError(f"Frame {width}x{height} does not fit in a shared-memory slot")
+
+        with self._lock:
+            if not self._ready.is_set() or not self._free_slots or self._requests is None:
+                return False
+            slot = self._free_slots.pop()
+            self._slot_frames[slot] = timestamp_ms
+            requests = self._requests
+
+        offset = slot * self.slot_bytes
+        target = np.ndarray((height, width, 3), dtype=np.uint8, buffer=self._shm.buf, offset=offset)
+        np.copyto(target, frame)
+        del target
+        try:
+            requests.send((timestamp_ms, slot, height, width))
+        except (BrokenPipeError, OSError):
+            # The supervisor will restart the worker and reset the slots.
+            with self._lock:
+                self._slot_frames.pop(slot, None)
+            return False
+        return True
+
+    def _receive_loop(self):
+        while not self._closing:
+            results = self._results
+            try:
+                kind, timestamp_ms, slot, hands = results.recv()
+            except (EOFError, OSError):
+                if self._closing:
+                    break
+                self._restart()
+                continue
+
+            if kind == "ready":
+                self._ready.set()
+                continue
+            with self._lock:
+                self._free_slots.append(slot)
+                self._slot_frames.pop(slot, None)
+            if kind == "skipped":
+                if self.on_skipped is not None:
+                    self.on_skipped(timestamp_ms)
+            else:
+                self.on_result(timestamp_ms, hands)
+
+    def _restart(self):
+        with self._lock:
+            self._requests = None
+            lost = sorted(self._slot_frames.values())
+            self._slot_frames.clear()
+        if self.on_skipped is not None:
+            for timestamp_ms in lost:
+                self.on_skipped(timestamp_ms)
+        if self.restarts >= self.max_restarts:
+            self._closing = True
+            self.failed = True
+            if self.on_failed is not None:
+                self._process.join(timeout=1.0)
+                self.on_failed(RuntimeError(f"the inference worker crashed {self.restarts + 1} times "
+                                            f"(last exit code {self._process.exitcode})"))
+            return
+        self.restarts += 1
+        # Back off a little so a worker that crashes on startup does not spin.
+        time.sleep(min(0.5 * self.restarts, 5.0))
+        if not self._closing:
+            self._launch()
+
+    def close(self):
+        self._closing = True
+        with self._lock:
+            requests, process = self._requests, self._process
+            self._requests = None
+        if requests is not None:
+            try:
+                requests.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        if process is not None:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.kill()
+        if self._results is not None:
+            self._results.close()
+        self._receiver.join(timeout=2.0)
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,204 @@
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Hashable
+
+import mediapipe as mp
+import numpy as np
+
+from app.tracking.HandLandmarks import HandLandmarks
+from app.tracking.InferenceConfig import InferenceConfig
+from app.tracking.InferenceWorker import WorkerResultHandler
+
+
+class LandmarkerPool:
+    """
+    A fixed number of hand landmarkers shared by several seats (camera + tracker pairs), so a
+    machine with many cameras loads the model once per worker instead of once per camera.
+
+    Each seat has room for one waiting frame: a newer frame replaces the waiting one, which is then
+    reported as skipped. Idle workers serve the waiting seats in the order their frames arrived, and
+    never two frames of one seat at a time, so a fast camera cannot starve the others and every
+    seat's results arrive in order. When the pool is saturated each seat's frame rate drops evenly.
+
+    Landmarkers in the IMAGE running mode hold no state between frames and can serve any seat. They
+    run palm detection on every frame, which MediaPipe's LIVE_STREAM mode would skip while a hand is
+    tracked; seats offset that by cropping around the hand (see RegionOfInterest).
+
+    :param config: Model and delegate every worker runs.
+    :param workers: Number of landmarkers, each on its own thread.
+    :param confidence: HandLandmarkerOptions confidence thresholds, by option name.
+    :param on_error: Called from a worker thread with the seat and the error when detection fails on
+        one of its frames, which is then treated as showing no hand; or with None as the seat when a
+        worker cannot load the model, which stops the pool (see error). Written to stderr when
+        omitted, since stdout may carry seat output.
+    """
+
+    def __init__(self, config: InferenceConfig, workers: int = 2, num_hands: int = 1,
+                 confidence: dict[str, float] | None = None,
+                 on_error: Callable[[Hashable | None, Exception], None] | None = None):
+        self.config = config
+        self.num_hands = num_hands
+        self.confidence = confidence or {}
+        self.on_error = on_error
+        self._condition = threading.Condition()
+        self._seats: dict[Hashable, tuple[WorkerResultHandler, Callable[[int], None] | None]] = {}
+        self._waiting: dict[Hashable, tuple[int, np.ndarray]] = {}
+        self._order: deque[Hashable] = deque()
+        self._busy: set[Hashable] = set()
+        self._closing = False
+        self._ready = 0
+        # Why the pool stopped on its own, if a worker could not load its landmarker.
+        self.error: Exception | None = None
+        self.processed: dict[Hashable, int] = {}
+        self.skipped: dict[Hashable, int] = {}
+        self.busy_s = 0.0
+        self._threads = [threading.Thread(target=self._work, name=f"wave-vision-landmarker-{index}", daemon=True)
+                         for index in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def size(self) -> int:
+        return len(self._threads)
+
+    def add_seat(self, seat: Hashable, on_result: WorkerResultHandler, on_skipped: Callable[[int], None] | None = None):
+        """Register a seat. on_result is called from a worker thread for every frame it processes."""
+        with self._condition:
+            self._seats[seat] = (on_result, on_skipped)
+            self.processed[seat] = 0
+            self.skipped[seat] = 0
+
+    def remove_seat(self, seat: Hashable):
+        with self._condition:
+            self._seats.pop(seat, None)
+            self._waiting.pop(seat, None)
+            if seat in self._order:
+                self._order.remove(seat)
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until every worker has loaded and warmed up its landmarker, or the pool stopped."""
+        with self._condition:
+            ready = self._condition.wait_for(lambda: self._ready == len(self._threads) or self._closing, timeout)
+            return ready and self.error is None
+
+    def submit(self, seat: Hashable, frame: np.ndarray, timestamp_ms: int):
+        """
+        Queue a seat's frame, replacing the one it still has waiting. The frame must stay unchanged until its
+        result. A closed pool, or one that stopped on an error, skips it at once.
+        """
+        with self._condition:
+            if seat not in self._seats:
+                return
+            on_skipped = self._seats[seat][1]
+            if self._closing:
+                skipped = timestamp_ms
+            else:
+                replaced = self._waiting.get(seat)
+                self._waiting[seat] = (timestamp_ms, frame)
+                if replaced is None:
+                    self._order.append(seat)
+                    self._condition.notify()
+                    return
+                self.skipped[seat] += 1
+                skipped = replaced[0]
+        if on_skipped is not None:
+            on_skipped(skipped)
+
+    def _report(self, seat: Hashable | None, error: Exception):
+        if self.on_error is not None:
+            self.on_error(seat, error)
+        elif seat is None:
+            print(f"Hand detection could not start: {error}", file=sys.stderr, flush=True)
+        else:
+            print(f"Hand detection failed for {seat}: {error}", file=sys.stderr, flush=True)
+
+    def _next(self) -> tuple[Hashable, int, np.ndarray] | None:
+        """The waiting frame of the longest-waiting seat that is not already being served. Holds the condition."""
+        while not self._closing:
+            for seat in self._order:
+                if seat not in self._busy:
+                    self._order.remove(seat)
+                    self._busy.add(seat)
+                    timestamp_ms, frame = self._waiting.pop(seat)
+                    return seat, timestamp_ms, frame
+            self._condition.wait()
+        return None
+
+    def _work(self):
+        try:
+            options = mp.tasks.vision.HandLandmarkerOptions(
+                base_options=self.config.base_options(),
+                num_hands=self.num_hands,
+                running_mode=mp.tasks.vision.RunningMode.IMAGE,
+                **self.confidence
+            )
+            landmarker = mp.tasks.vision.HandLandmarker.create_from_options(options)
+            landmarker.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=np.zeros((256, 256, 3), dtype=np.uint8)))
+        except Exception as e:
+            self._fail(e)
+            return
+        with self._condition:
+            self._ready += 1
+            self._condition.notify_all()
+
+        try:
+            while True:
+                with self._condition:
+                    item = self._next()
+                if item is None:
+                    return
+                self._serve(landmarker, *item)
+        finally:
+            landmarker.close()
+
+    def _serve(self, landmarker, seat: Hashable, timestamp_ms: int, frame: np.ndarray):
+        try:
+            start = time.perf_counter()
+            try:
+                result = landmarker.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=frame))
+                hands = HandLandmarks.from_result(result, self.num_hands)
+            except Exception as e:
+                self._report(seat, e)
+                hands = None
+            del frame
+            with self._condition:
+                self.busy_s += time.perf_counter() - start
+                handlers = self._seats.get(seat)
+                if handlers is not None:
+                    self.processed[seat] += 1
+            if handlers is not None:
+                handlers[0](timestamp_ms, hands)
+        finally:
+            # Only now may the seat's next frame go out, so its results stay in order.
+            with self._condition:
+                self._busy.discard(seat)
+                if seat in self._waiting:
+                    self._condition.notify()
+
+    def _fail(self, error: Exception):
+        """A worker could not load its landmarker: stop the pool, skipping every waiting frame."""
+        with self._condition:
+            first = self.error is None
+            if first:
+                self.error = error
+            self._closing = True
+            waiting = [(self._seats.get(seat), timestamp_ms) for seat, (timestamp_ms, _) in self._waiting.items()]
+            self._waiting.clear()
+            self._order.clear()
+            self._condition.notify_all()
+        if first:
+            self._report(None, error)
+        for handlers, timestamp_ms in waiting:
+            if handlers is not None and handlers[1] is not None:
+                handlers[1](timestamp_ms)
+
+    def close(self):
+        with self._condition:
+            self._closing = True
+            self._waiting.clear()
+            self._order.clear()
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Crop:
+    """A rectangle of the camera frame, in pixels, that was sent to the landmarker."""
+    x: int
+    y: int
+    width: int
+    height: int
+    frame_width: int
+    frame_height: int
+
+    def to_frame(self, points: np.ndarray) -> np.ndarray:
+        """Map (N, 2) points normalized to this crop into coordinates normalized to the full frame."""
+        scale = np.array([self.width / self.frame_width, self.height / self.frame_height], dtype=np.float32)
+        offset = np.array([self.x / self.frame_width, self.y / self.frame_height], dtype=np.float32)
+        return points * scale + offset
+
+
+class RegionOfInterest:
+    """
+    Chooses the part of each frame that is sent to the hand landmarker. While a hand is tracked the
+    crop follows its bounding box plus a margin; otherwise the whole frame is searched, downscaled
+    like any crop, so a hand is found again wherever it reappears.
+
+    :param input_size: Longest side in pixels that crops are downscaled to before inference.
+    :param margin: Fraction of the hand's size added around its bounding box on every side.
+    :param min_size: Smallest crop side in pixels, so a distant hand still has context around it.
+    """
+
+    def __init__(self, input_size: int = 256, margin: float = 0.5, min_size: int = 160):
+        self.input_size = input_size
+        self.margin = margin
+        self.min_size = min_size
+        self._hand_box: tuple[float, float, float, float] | None = None
+
+    def update(self, points: np.ndarray | None):
+        """Follow the hand given its (N, 2) landmarks normalized to the full frame, or None when it was lost."""
+        if points is None:
+            self._hand_box = None
+            return
+        x_min, y_min = points.min(axis=0)
+        x_max, y_max = points.max(axis=0)
+        self._hand_box = (float(x_min), float(y_min), float(x_max), float(y_max))
+
+    def crop(self, frame: np.ndarray) -> tuple[np.ndarray, Crop]:
+        frame_height, frame_width = frame.shape[:2]
+        hand_box = self._hand_box
+
+        if hand_box is None:
+            width, height = frame_width, frame_height
+            center_x, center_y = frame_width / 2, frame_height / 2
+        else:
+            x_min, y_min, x_max, y_max = hand_box
+            # Square crops keep the hand's aspect ratio stable as it rotates.
+            side = max((x_max - x_min) * frame_width, (y_max - y_min) * frame_height) * (1 + 2 * self.margin)
+            side = min(max(side, self.min_size), frame_width, frame_height)
+            width = height = int(side)
+            center_x = (x_min + x_max) / 2 * frame_width
+            center_y = (y_min + y_max) / 2 * frame_height
+
+        x = int(min(max(center_x - width / 2, 0), frame_width - width))
+        y = int(min(max(center_y - height / 2, 0), frame_height - height))
+        crop = Crop(x, y, width, height, frame_width, frame_height)
+
+        image = frame[y:y + height, x:x + width]
+        scale = self.input_size / max(width, height)
+        if scale < 1:
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        else:
+            image = np.ascontiguousarray(image)
+        return image, crop
@@ -0,0 +1,97 @@
+import cv2
+import numpy as np
+
+# (left, top, width, height) of a monitor in desktop pixels.
+ScreenRect = tuple[int, int, int, int]
+
+
+def default_region(area_size: tuple[float, float], frame_size: tuple[int, int]) -> np.ndarray:
+    """The centered area_size box of the camera frame, as (4, 2) mirrored corners. See ScreenMapping."""
+    width = min(area_size[0] / frame_size[0], 1.0)
+    height = min(area_size[1] / frame_size[1], 1.0)
+    left, top = (1 - width) / 2, (1 - height) / 2
+    return np.array([
+        [left, top],
+        [left + width, top],
+        [left + width, top + height],
+        [left, top + height],
+    ], dtype=np.float32)
+
+
+def calibrated_region(samples: np.ndarray, extreme_fraction: float = 0.03) -> np.ndarray | None:
+    """
+    Fit the four corners of the region a hand covered while tracing a comfortable area.
+
+    :param samples: (N, 2) mirrored positions recorded during calibration.
+    :param extreme_fraction: Each corner is the mean of this fraction of samples furthest towards
+        it, so a single outlier does not stretch the region.
+    :return: (4, 2) corners in ScreenMapping order, or None if the samples span no usable area.
+    """
+    if len(samples) < 20:
+        return None
+    count = max(int(len(samples) * extreme_fraction), 1)
+    u, v = samples[:, 0], samples[:, 1]
+    # Projections that grow towards the top-left, top-right, bottom-right and bottom-left corners.
+    directions = np.stack([-u - v, u - v, u + v, v - u])
+    nearest = np.argsort(directions, axis=1)[:, -count:]
+    corners = samples[nearest].mean(axis=1).astype(np.float32)
+
+    area = 0.5 * abs(np.dot(corners[:, 0], np.roll(corners[:, 1], 1)) - np.dot(corners[:, 1], np.roll(corners[:, 0], 1)))
+    return corners if area > 0.005 else None
+
+
+class ScreenMapping:
+    """
+    Precomputed map from hand position to desktop pixels. Positions are "mirrored" camera coordinates,
+    (1 - x, y) normalized to the frame, so they match what the user sees. The region's four corners
+    (top-left, top-right, bottom-right, bottom-left) are mapped onto the target rectangle by a
+    homography, and every mapped point is clamped onto the nearest monitor, so the whole desktop is
+    reachable without the pointer ever leaving it.
+
+    :param region: (4, 2) mirrored corners of the active region.
+    :param screens: Every monitor, in desktop pixels.
+    :param monitor: Index into screens to map onto, or -1 for the bounding box of all of them.
+    :param sensitivity: Shrinks the region about its center by this factor, so higher values
+        need less hand movement to cross the same distance.
+    """
+
+    def __init__(self, region: np.ndarray, screens: list[ScreenRect], monitor: int = -1, sensitivity: float = 1.0):
+        self.screens = np.array(screens, dtype=np.float64).reshape(-1, 4)
+        if 0 <= monitor < len(self.screens):
+            left, top, width, height = self.screens[monitor]
+            self.screens = self.screens[monitor:monitor + 1]
+        else:
+            left, top = self.screens[:, 0].min(), self.screens[:, 1].min()
+            width = (self.screens[:, 0] + self.screens[:, 2]).max() - left
+            height = (self.screens[:, 1] + self.screens[:, 3]).max() - top
+
+        center = region.mean(axis=0)
+        source = (center + (region - center) / max(sensitivity, 1e-3)).astype(np.float32)
+        target = np.array([
+            [left, top],
+            [left + width, top],
+            [left + width, top + height],
+            [left, top + height],
+        ], dtype=np.float32)
+        self.matrix = cv2.getPerspectiveTransform(source, target)
+        # The matrix split so points need no homogeneous coordinate: [x, y, 1] @ M.T == [x, y] @ linear + offset.
+        self._linear = np.ascontiguousarray(self.matrix[:, :2].T)
+        self._offset = self.matrix[:, 2].copy()
+        # Inclusive pixel bounds of each monitor, for clamping.
+        self._minimum = self.screens[:, :2]
+        self._maximum = self.screens[:, :2] + self.screens[:, 2:] - 1
+
+    def map(self, points: np.ndarray) -> np.ndarray:
+        """Map (N, 2) mirrored positions to (N, 2) desktop pixels, clamped onto the nearest monitor."""
+        homogeneous = points @ self._linear + self._offset
+        mapped = homogeneous[:, :2] / homogeneous[:, 2:]
+        return self.clamp(mapped)
+
+    def clamp(self, points: np.ndarray) -> np.ndarray:
+        if len(self.screens) == 1:
+            # Called twice per result; most setups have one monitor, which needs no search.
+            return np.minimum(np.maximum(points, self._minimum[0]), self._maximum[0])
+        # (N, screens, 2): each point clamped into every monitor; keep the closest.
+        clamped = np.clip(points[:, None, :], self._minimum[None], self._maximum[None])
+        nearest = np.argmin(np.sum((clamped - points[:, None, :]) ** 2, axis=2), axis=1)
+        return clamped[np.arange(len(points)), nearest]
@@ -1,67 +1,525 @@
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable
+
 import numpy as np
 import mediapipe as mp
-import pyautogui
 from mediapipe.tasks.python.vision.hand_landmarker import HandLandmarkerResult
 
+from app.camera.FrameClock import monotonic_ms
+from app.metrics.PipelineMetrics import PipelineMetrics
+from app.tracking.CursorFilter import FILTER_TYPES, CursorFilter, create_filter
+from app.tracking.FlowTracker import FlowTracker
+from app.tracking.GestureEngine import GestureEngine
+from app.tracking.HandLandmarks import HandLandmarks, LandmarkRing
+from app.tracking.InferenceWorker import InferenceWorker
+from app.tracking.RegionOfInterest import Crop, RegionOfInterest
+from app.tracking.ScreenMapping import ScreenMapping, ScreenRect, calibrated_region, default_region
 from app.tracking.TrackingParams import TrackingParams
 from app.tracking.TrackingResult import TrackingResult
 
+if TYPE_CHECKING:
+    from app.system.PipelineConfig import PipelineConfig
+    from app.tracking.LandmarkerPool import LandmarkerPool
+
+ResultListener = Callable[[int, TrackingResult | None], None]
+
+# Reserved for the warm-up frame; real frames always carry later timestamps.
+WARM_UP_TIMESTAMP_MS = 0
+# Pointer position = pinch point * _MIRROR + _MIRROR_OFFSET: mirrored, so moving the hand right
+# moves the pointer right.
+_MIRROR = np.array([-1.0, 1.0], dtype=np.float32)
+_MIRROR_OFFSET = np.array([1.0, 0.0], dtype=np.float32)
+
 
 class TrackingController:
-    def __init__(self, params: TrackingParams):
+    """
+    :param pool: Run detection on this shared LandmarkerPool instead of a landmarker of its own.
+        Used when one process tracks several cameras; the pool's model and confidence settings then
+        apply instead of params'.
+    :param on_failure: Called from the inference worker's thread with the reason when the isolated
+        worker keeps crashing and is given up on. track() then refuses every frame.
+    """
+
+    def __init__(self, params: TrackingParams, screen_size: tuple[int, int] | None = None,
+                 pool: "LandmarkerPool | None" = None, on_failure: Callable[[Exception], None] | None = None):
         self.params = params
+        self.on_failure = on_failure
         self.last_result = None
-        self.screen_width, self.screen_height = pyautogui.size()
-        self.smoothed_x = None
-        self.smoothed_y = None
-        self.alpha = 0.3
-        self.sensitivity = 1.0
-        self.pinch_threshold = 0.05
+        if screen_size is None:
+            # Imported here so headless runs that pass an explicit screen size never need a display.
+            import pyautogui
+            screen_size = pyautogui.size()
+        self.filter: CursorFilter = create_filter("ema", alpha=0.3)
+        self.latency_compensation = False
+        self.max_prediction_s = 0.1
+        # What the screen mapping is built from; only changed, with it, by _swap_mapping().
+        self._mapping_inputs = {
+            "region": None,
+            "monitor": -1,
+            "sensitivity": 1.0,
+            "screens": [(0, 0, int(screen_size[0]), int(screen_size[1]))],
+            "frame_size": None,
+        }
+        self._mapping_version = 0
+        self._calibration_samples: deque[tuple[float, float]] | None = None
+        self.mapping = self._build_mapping(**self._mapping_inputs)
+        self.gestures = GestureEngine(pinch_threshold=0.05)
+        self.metrics: PipelineMetrics | None = None
+        self._submitted_at: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._listeners: list[ResultListener] = []
+        self._skip_listeners: list[Callable[[int], None]] = []
+        self._last_delivered_ms = -1
+        self.roi = RegionOfInterest(
+            input_size=params.roi_input_size,
+            margin=params.roi_margin
+        ) if params.roi_enabled else None
+        self._crops: dict[int, Crop] = {}
+        # Results of the in-process landmarker and the optical flow are converted into these.
+        self._hands = LandmarkRing(capacity=params.num_hands)
+        self.flow = FlowTracker(interval=params.flow_interval) if params.flow_interval > 1 else None
+        # Held across tracking a frame or taking a detection and delivering what came of it, so the
+        # flow and the landmarker deliver in frame order.
+        self._flow_lock = threading.Lock()
+        self._warmed_up = threading.Event()
+
+        self.landmarker = None
+        self.worker: InferenceWorker | None = None
+        # (params, detector) that track() switches to before its next frame. See use_detector().
+        self._next_detector: tuple[TrackingParams, object] | None = None
+        self.pool = pool
+        if pool is not None:
+            pool.add_seat(self, self._process_landmarks, self._on_skipped)
+            return
+        if params.isolated_inference:
+            self.worker = self._create_detector(params)
+        else:
+            self.landmarker = self._create_detector(params)
+
+    def _create_detector(self, params: TrackingParams):
+        """A HandLandmarker for params, or an InferenceWorker running one if inference is isolated."""
+        confidence = {
+            "min_hand_detection_confidence": params.min_detection_confidence,
+            "min_hand_presence_confidence": params.min_presence_confidence,
+            "min_tracking_confidence": params.min_tracking_confidence,
+        }
+        if params.isolated_inference:
+            return InferenceWorker(params.inference, self._process_landmarks, num_hands=params.num_hands,
+                                   on_skipped=self._on_skipped, confidence=confidence,
+                                   on_failed=self._on_worker_failed)
 
         options = mp.tasks.vision.HandLandmarkerOptions(
-            base_options=mp.tasks.BaseOptions(model_asset_path=params.model_path),
-            num_hands=1,
+            base_options=params.inference.base_options(),
+            num_hands=params.num_hands,
+            **confidence,
             running_mode=mp.tasks.vision.RunningMode.LIVE_STREAM,
             result_callback=self.process_result
         )
+        return mp.tasks.vision.HandLandmarker.create_from_options(options)
+
+    def configure_filter(self, kind: str, latency_compensation: bool = False, **params):
+        """
+        Select the cursor filter and its tuning. Switching kind starts the new filter fresh; retuning
+        the current kind keeps its state so the cursor does not jump.
+
+        :param latency_compensation: Extrapolate the filtered position forward by the measured
+            capture-to-result latency of each frame.
+        """
+        with self._lock:
+            self._configure_filter(kind, latency_compensation, params)
+
+    def _configure_filter(self, kind: str, latency_compensation: bool, params: dict[str, float]):
+        if kind != self.filter_kind:
+            self.filter = create_filter(kind, **params)
+        else:
+            self.filter.configure(**params)
+        self.latency_compensation = latency_compensation
+
+    def apply_config(self, config: "PipelineConfig", stages: set[str]):
+        """
+        Apply the filter, mapping and gesture settings of a snapshot, for the stages given. They are
+        swapped in together between two results, so no result is built from a mix of old and new
+        settings, and a retuned filter keeps its state.
+        """
+        changes = {}
+        if "mapping" in stages:
+            changes = {
+                "region": None if config.region is None else np.array(config.region, dtype=np.float32),
+                "monitor": config.monitor,
+                "sensitivity": config.sensitivity,
+            }
+        while True:
+            mapping = self._prepare_mapping(changes) if changes else None
+            with self._lock:
+                if mapping is not None and not self._swap_mapping(*mapping):
+                    continue
+                if "filter" in stages:
+                    self._configure_filter(config.filter_type, config.latency_compensation, dict(config.filter_params))
+                if "gestures" in stages:
+                    self.gestures.pinch_threshold = config.pinch_threshold
+                return
+
+    def _build_mapping(self, region: np.ndarray | None, monitor: int, sensitivity: float,
+                       screens: list[ScreenRect], frame_size: tuple[int, int] | None) -> ScreenMapping:
+        area_size = (self.params.area_size_x, self.params.area_size_y)
+        region = region if region is not None else default_region(area_size, frame_size or area_size)
+        return ScreenMapping(region, screens, monitor, sensitivity)
+
+    def _prepare_mapping(self, changes: dict) -> tuple[int, dict, ScreenMapping]:
+        """
+        Build the mapping for the current inputs with changes applied, outside the lock, which the
+        result thread needs for every frame. Returns what _swap_mapping() takes.
+        """
+        with self._lock:
+            version = self._mapping_version
+            inputs = {**self._mapping_inputs, **changes}
+        return version, inputs, self._build_mapping(**inputs)
+
+    def _swap_mapping(self, version: int, inputs: dict, mapping: ScreenMapping) -> bool:
+        """
+        Swap in a mapping from _prepare_mapping(), holding the lock. Returns False, changing nothing,
+        if another thread swapped one in since it was prepared; prepare it again from the new inputs.
+        """
+        if version != self._mapping_version:
+            return False
+        self._mapping_inputs = inputs
+        self._mapping_version += 1
+        self.mapping = mapping
+        return True
+
+    def _update_mapping(self, **changes):
+        while True:
+            mapping = self._prepare_mapping(changes)
+            with self._lock:
+                if self._swap_mapping(*mapping):
+                    return
+
+    def set_screens(self, screens: list[ScreenRect]):
+        """Replace the monitor layout, e.g. after a monitor was added, removed or rearranged."""
+        if screens:
+            self._update_mapping(screens=list(screens))
+
+    @property
+    def is_calibrating(self) -> bool:
+        return self._calibration_samples is not None
+
+    def start_calibration(self):
+        """Record hand positions, with gestures suppressed, until finish_calibration()."""
+        self._calibration_samples = deque(maxlen=6000)
+
+    def finish_calibration(self) -> np.ndarray | None:
+        """Stop recording and return the fitted region, or None if the hand did not cover enough area."""
+        samples, self._calibration_samples = self._calibration_samples, None
+        if not samples:
+            return None
+        return calibrated_region(np.array(samples, dtype=np.float32))
+
+    @property
+    def filter_kind(self) -> str:
+        return next(name for name, cls in FILTER_TYPES.items() if type(self.filter) is cls)
+
+    def add_result_listener(self, listener: ResultListener):
+        """
+        Register a callback invoked from the MediaPipe callback (or inference worker) thread with (timestamp_ms, result) for
+        every processed frame, in frame order. result is None when no hand was found.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_result_listener(self, listener: ResultListener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def add_skip_listener(self, listener: Callable[[int], None]):
+        """
+        Register a callback invoked with the timestamp of every frame that went to detection but will
+        get no result, such as one the shared pool replaced with a newer frame.
+        """
+        with self._lock:
+            self._skip_listeners.append(listener)
+
+    def remove_skip_listener(self, listener: Callable[[int], None]):
+        with self._lock:
+            if listener in self._skip_listeners:
+                self._skip_listeners.remove(listener)
+
+    def _on_skipped(self, timestamp_ms: int):
+        self._submitted_at.pop(timestamp_ms, None)
+        self._crops.pop(timestamp_ms, None)
+        with self._lock:
+            listeners = list(self._skip_listeners)
+        for listener in listeners:
+            listener(timestamp_ms)
 
-        self.landmarker = mp.tasks.vision.HandLandmarker.create_from_options(options)
+    def _on_worker_failed(self, error: Exception):
+        if self.on_failure is not None:
+            self.on_failure(error)
+
+    @property
+    def failed(self) -> bool:
+        """Whether the isolated inference worker was given up on, and no other detector is waiting to replace it."""
+        return self.worker is not None and self.worker.failed and self._next_detector is None
 
     def process_result(self, result: HandLandmarkerResult, frame: mp.Image, timestamp_ms: int):
-        if result.hand_landmarks:
-            landmarks = result.hand_landmarks[0]
+        if timestamp_ms == WARM_UP_TIMESTAMP_MS:
+            self._warmed_up.set()
+            return
+        hands = self._hands.acquire().fill_from_result(result) if result.hand_landmarks else None
+        self._process_landmarks(timestamp_ms, hands)
+
+    def _process_landmarks(self, timestamp_ms: int, hands: HandLandmarks | None):
+        """Turn the hands found in a submitted image into a result. The crop is undone in place."""
+        if self.metrics is not None:
+            self._record_result_latency(timestamp_ms)
+        crop = self._pop_crop(timestamp_ms)
+        if crop is not None and hands is not None:
+            hands.points[..., :2] = crop.to_frame(hands.points[..., :2])
+        if self.flow is None:
+            self._deliver(timestamp_ms, hands, crop)
+            return
+        with self._flow_lock:
+            self.flow.on_detection(timestamp_ms, hands)
+            self._deliver(timestamp_ms, hands, crop)
+            self._deliver_flow()
 
-            thumb_tip = landmarks[4]
-            index_tip = landmarks[8]
+    def _deliver_flow(self):
+        for timestamp_ms, hands in self.flow.ready():
+            self._deliver(timestamp_ms, hands)
 
-            x_norm = (thumb_tip.x + index_tip.x) / 2
-            y_norm = (thumb_tip.y + index_tip.y) / 2
+    def _deliver(self, timestamp_ms: int, hands: HandLandmarks | None, crop: Crop | None = None):
+        """Build the result from landmarks normalized to the full frame and pass it to the listeners."""
+        with self._lock:
+            if timestamp_ms <= self._last_delivered_ms:
+                if self.metrics is not None:
+                    self.metrics.record_stale()
+                return
+            self._last_delivered_ms = timestamp_ms
+            self.last_result = self._build_result(hands, timestamp_ms, crop)
+            tracking_result = self.last_result
+            listeners = list(self._listeners)
 
-            x_screen = (1 - x_norm) * self.screen_width * self.sensitivity
-            y_screen = y_norm * self.screen_height * self.sensitivity
+        for listener in listeners:
+            listener(timestamp_ms, tracking_result)
 
-            x_screen = max(0, min(self.screen_width, x_screen))
-            y_screen = max(0, min(self.screen_height, y_screen))
+    def _pop_crop(self, timestamp_ms: int) -> Crop | None:
+        crop = self._crops.pop(timestamp_ms, None)
+        for ts in [ts for ts in list(self._crops) if ts < timestamp_ms]:
+            self._crops.pop(ts, None)
+        return crop
 
-            if self.smoothed_x is None:
-                self.smoothed_x = x_screen
-                self.smoothed_y = y_screen
+    def _build_result(self, hands: HandLandmarks | None, timestamp_ms: int, crop: Crop | None) -> TrackingResult | None:
+        if hands is None or not len(hands):
+            self.gestures.classify(np.empty((0, 21, 3), dtype=np.float32))
+            if self.roi is not None:
+                self.roi.update(None)
+            return None
+
+        landmarks = hands.points
+        if self.roi is not None:
+            # Only narrow the search once every expected hand is in view, or a second hand could never appear.
+            if len(landmarks) >= self.params.num_hands:
+                self.roi.update(landmarks[..., :2].reshape(-1, 2))
             else:
-                self.smoothed_x = self.alpha * x_screen + (1 - self.alpha) * self.smoothed_x
-                self.smoothed_y = self.alpha * y_screen + (1 - self.alpha) * self.smoothed_y
+                self.roi.update(None)
 
-            distance = ((thumb_tip.x - index_tip.x) ** 2 + (thumb_tip.y - index_tip.y) ** 2) ** 0.5
-            pressed = distance < self.pinch_threshold
+        start = time.perf_counter()
+        gestures, motion = self.gestures.classify(landmarks)
+        if self.metrics is not None:
+            self.metrics.record("gesture_classify", (time.perf_counter() - start) * 1000)
 
-            self.last_result = TrackingResult(
-                cursor_position_x=int(self.smoothed_x),
-                cursor_position_y=int(self.smoothed_y),
-                pressed=pressed
-            )
-        else:
-            self.last_result = None
+        # (1, 2): the primary hand drives the pointer.
+        position = hands.pinch_points()[:1] * _MIRROR + _MIRROR_OFFSET
+        samples = self._calibration_samples
+        if samples is not None:
+            samples.append(tuple(position[0].tolist()))
+            gestures = [None] * len(gestures)
+
+        mapping = self.mapping
+        raw = mapping.map(position)[0]
+
+        smoothed = self.filter.update(raw, timestamp_ms / 1000)
+        if self.latency_compensation:
+            latency_s = min(max((monotonic_ms() - timestamp_ms) / 1000, 0.0), self.max_prediction_s)
+            smoothed = self.filter.predict(latency_s)
+        smoothed_x, smoothed_y = mapping.clamp(np.asarray(smoothed, dtype=np.float64).reshape(1, 2))[0]
+
+        return TrackingResult(
+            cursor_position_x=int(smoothed_x),
+            cursor_position_y=int(smoothed_y),
+            pressed=gestures[0] == "index_pinch",
+            timestamp_ms=timestamp_ms,
+            raw_position_x=float(raw[0]),
+            raw_position_y=float(raw[1]),
+            pinch_distance=float(hands.pinch_distances()[0]),
+            gestures=tuple(gestures),
+            hand_motion_y=tuple(motion),
+            hands=hands,
+            roi=None if crop is None else (crop.x / crop.frame_width, crop.y / crop.frame_height,
+                                           crop.width / crop.frame_width, crop.height / crop.frame_height)
+        )
+
+    def _record_result_latency(self, timestamp_ms: int):
+        submitted_at = self._submitted_at.pop(timestamp_ms, None)
+        if submitted_at is not None:
+            self.metrics.record("result_latency", (time.perf_counter() - submitted_at) * 1000)
+
+        # LIVE_STREAM silently skips frames submitted while the graph is busy, so anything
+        # older than the frame that just completed will never get a callback.
+        skipped = [ts for ts in list(self._submitted_at) if ts < timestamp_ms]
+        for ts in skipped:
+            self._submitted_at.pop(ts, None)
+        if skipped:
+            self.metrics.record_dropped(len(skipped))
+
+    def track(self, frame: np.ndarray, timestamp_ms: int) -> bool:
+        """
+        Submit a frame for detection. Its result is delivered to the result listeners, unless the
+        skip listeners hear it was skipped.
+
+        :return: False if the frame was refused, and neither will happen.
+        """
+        if self._next_detector is not None:
+            self._switch_detector()
+        frame_size = (frame.shape[1], frame.shape[0])
+        if frame_size != self._mapping_inputs["frame_size"]:
+            self._update_mapping(frame_size=frame_size)
+
+        if self.flow is not None:
+            with self._flow_lock:
+                start = time.perf_counter()
+                tracked = self.flow.track(frame, timestamp_ms, into=self._hands.acquire())
+                if self.metrics is not None:
+                    self.metrics.record("flow_track", (time.perf_counter() - start) * 1000)
+                self._deliver_flow()
+            if tracked:
+                # The landmarker never sees the frame.
+                return True
+
+        if self.roi is not None:
+            start = time.perf_counter()
+            frame, self._crops[timestamp_ms] = self.roi.crop(frame)
+            if self.metrics is not None:
+                self.metrics.record("roi_crop", (time.perf_counter() - start) * 1000)
+
+        if self.worker is not None:
+            return self._submit_to_worker(frame, timestamp_ms)
+        if self.pool is not None:
+            if self.metrics is not None:
+                self._submitted_at[timestamp_ms] = time.perf_counter()
+            self.pool.submit(self, frame, timestamp_ms)
+            return True
 
-    def track(self, frame: np.ndarray, timestamp_ms: int) -> TrackingResult | None:
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+        if self.metrics is None:
+            self.landmarker.detect_async(mp_image, timestamp_ms)
+            return True
+
+        start = time.perf_counter()
+        self._submitted_at[timestamp_ms] = start
         self.landmarker.detect_async(mp_image, timestamp_ms)
-        return self.last_result
+        self.metrics.record("detect_submit", (time.perf_counter() - start) * 1000)
+        return True
+
+    def _submit_to_worker(self, frame: np.ndarray, timestamp_ms: int) -> bool:
+        start = time.perf_counter()
+        if self.metrics is not None:
+            self._submitted_at[timestamp_ms] = start
+        if not self.worker.submit(frame, timestamp_ms):
+            # Every slot is still in flight, or the worker is restarting or was given up on: drop this frame.
+            self._submitted_at.pop(timestamp_ms, None)
+            self._crops.pop(timestamp_ms, None)
+            if self.metrics is not None:
+                self.metrics.record_dropped()
+            return False
+        if self.metrics is not None:
+            self.metrics.record("detect_submit", (time.perf_counter() - start) * 1000)
+        return True
+
+    def warm_up(self, timeout: float = 10.0) -> bool:
+        """
+        Run one inference on a blank frame and wait for it, so graph setup and model initialization
+        are not paid by the first real frame. The worker process warms itself up before reporting ready.
+        """
+        if self.worker is not None:
+            return self.worker.wait_ready(timeout)
+        if self.pool is not None:
+            return self.pool.wait_ready(timeout)
+        size = self.params.roi_input_size
+        blank = np.zeros((size, size, 3), dtype=np.uint8)
+        self._warmed_up.clear()
+        self.landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=blank), WARM_UP_TIMESTAMP_MS)
+        return self._warmed_up.wait(timeout)
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Wait for an isolated inference worker or the shared pool to load the model. Always ready in-process."""
+        if self.pool is not None:
+            return self.pool.wait_ready(timeout)
+        return self.worker is None or self.worker.wait_ready(timeout)
+
+    @property
+    def model_params(self) -> TrackingParams:
+        """The params of the landmarker track() uses from its next frame on."""
+        pending = self._next_detector
+        return pending[0] if pending is not None else self.params
+
+    def build_detector(self, params: TrackingParams, timeout: float = 30.0):
+        """
+        Create and warm up a landmarker for another model, delegate or confidences, for
+        use_detector(). Blocks while the model loads, which takes far longer than a frame, so call it
+        off the pipeline threads; tracking carries on with the current landmarker meanwhile.
+
+        :raises RuntimeError: If the landmarker is not ready within timeout.
+        """
+        if self.pool is not None:
+            raise RuntimeError("The landmarker of a shared pool belongs to its owner")
+        detector = self._create_detector(params)
+        if isinstance(detector, InferenceWorker):
+            ready = detector.wait_ready(timeout)
+        else:
+            size = params.roi_input_size
+            blank = np.zeros((size, size, 3), dtype=np.uint8)
+            self._warmed_up.clear()
+            detector.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=blank), WARM_UP_TIMESTAMP_MS)
+            ready = self._warmed_up.wait(timeout)
+        if not ready:
+            detector.close()
+            raise RuntimeError(f"{params.inference.describe()} did not load within {timeout:g} s")
+        return detector
+
+    def use_detector(self, params: TrackingParams, detector):
+        """Switch to a detector from build_detector() between two frames. Safe to call from any thread."""
+        with self._lock:
+            replaced, self._next_detector = self._next_detector, (params, detector)
+        if replaced is not None:
+            replaced[1].close()
+
+    def _switch_detector(self):
+        # Called by track(), so no frame is being submitted to the detector being replaced.
+        with self._lock:
+            pending, self._next_detector = self._next_detector, None
+        if pending is None:
+            return
+        self.params, detector = pending
+        previous = self.worker if self.worker is not None else self.landmarker
+        if isinstance(detector, InferenceWorker):
+            self.worker, self.landmarker = detector, None
+        else:
+            self.landmarker, self.worker = detector, None
+        # Closing waits for the frames still in flight, whose results are delivered as usual.
+        threading.Thread(target=previous.close, name="wave-vision-landmarker-close", daemon=True).start()
+
+    def close(self):
+        """Release the landmarker. A shared pool is only left, and closed by its owner."""
+        with self._lock:
+            pending, self._next_detector = self._next_detector, None
+        if pending is not None:
+            pending[1].close()
+        if self.pool is not None:
+            self.pool.remove_seat(self)
+        if self.worker is not None:
+            self.worker.close()
+        if self.landmarker is not None:
+            self.landmarker.close()
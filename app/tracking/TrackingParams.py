@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from app.tracking.InferenceConfig import InferenceConfig
+
 
 @dataclass
 class TrackingParams:
@@ -7,7 +9,35 @@ class TrackingParams:
     :param area_size_x: Width in pixels of actual tracking box. Mapped to the full width of the monitor.
     :param area_size_y: Height in pixels of actual tracking box. Mapped to the full height of the monitor.
     :param model_path: Path to the hand landmarker model file.
+    :param delegate: Where the landmarker runs, "cpu" or "gpu". See InferenceConfig.
+    :param min_detection_confidence: Palm detections scoring lower are ignored.
+    :param min_presence_confidence: A tracked hand scoring lower is considered gone, and the palm
+        detector runs again on the next frame.
+    :param min_tracking_confidence: Landmarks tracked from the previous frame scoring lower are
+        discarded in favour of a fresh palm detection.
+    :param roi_enabled: Crop each frame around the last known hand before inference.
+    :param roi_margin: Fraction of the hand's size added around its bounding box when cropping.
+    :param roi_input_size: Longest side in pixels that crops are downscaled to before inference.
+    :param num_hands: Maximum number of hands detected per frame. The first one drives the cursor.
+    :param isolated_inference: Run the landmarker in a separate process, passing frames through shared memory.
+    :param flow_interval: Run the landmarker on every flow_interval-th frame only and propagate the
+        landmarks in between with optical flow, falling back to the landmarker when tracking drifts.
+        1 runs the landmarker on every frame. See FlowTracker.
     """
     area_size_x: float
     area_size_y: float
     model_path: str
+    delegate: str = "cpu"
+    min_detection_confidence: float = 0.5
+    min_presence_confidence: float = 0.5
+    min_tracking_confidence: float = 0.5
+    roi_enabled: bool = True
+    roi_margin: float = 0.5
+    roi_input_size: int = 256
+    num_hands: int = 1
+    isolated_inference: bool = False
+    flow_interval: int = 1
+
+    @property
+    def inference(self) -> InferenceConfig:
+        return InferenceConfig(self.model_path, self.delegate)
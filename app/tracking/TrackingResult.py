@@ -1,8 +1,37 @@
 from dataclasses import dataclass
 
+import numpy as np
 
-@dataclass
+from app.tracking.HandLandmarks import HandLandmarks
+
+
+@dataclass(slots=True)
 class TrackingResult:
+    """
+    :param timestamp_ms: Timestamp of the camera frame this result was computed from.
+    :param raw_position_x: Screen x before smoothing, kept for trace recording and filter benchmarks.
+    :param raw_position_y: Screen y before smoothing.
+    :param pinch_distance: Normalized thumb-index distance of the primary hand.
+    :param gestures: Active gesture of each tracked hand, primary hand first. See GestureEngine.
+    :param hand_motion_y: Upward movement of each hand since the previous frame, in frame heights.
+    :param hands: Landmarks normalized to the full camera frame, with handedness and confidence.
+        Referenced, not copied; see HandLandmarks.
+    :param roi: (x, y, width, height) of the crop sent to the landmarker, normalized to the frame,
+        or None when the whole frame was used.
+    """
     cursor_position_x: float
     cursor_position_y: float
-    pressed: bool
\ No newline at end of file
+    pressed: bool
+    timestamp_ms: int = 0
+    raw_position_x: float = 0.0
+    raw_position_y: float = 0.0
+    pinch_distance: float = 0.0
+    gestures: tuple[str | None, ...] = ()
+    hand_motion_y: tuple[float, ...] = ()
+    hands: HandLandmarks | None = None
+    roi: tuple[float, float, float, float] | None = None
+
+    @property
+    def landmarks(self) -> np.ndarray | None:
+        """(hands, 21, 3) points of hands, for overlays."""
+        return self.hands.points if self.hands is not None else None
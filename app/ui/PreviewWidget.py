@@ -0,0 +1,48 @@
+import numpy as np
+from PySide6.QtCore import QRect, Qt, Signal
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtWidgets import QWidget
+
+
+class PreviewWidget(QWidget):
+    """
+    Separate window showing the images rendered by FramePreview. Each image is wrapped in a QImage
+    that points at the NumPy buffer instead of copying it, and painted straight from that buffer,
+    scaled to the window with its aspect ratio kept.
+    """
+    closed = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Wave Vision - Preview")
+        self.resize(320, 240)
+        self.setMinimumSize(160, 120)
+        # The array is kept alongside the QImage, which does not own the memory it points at.
+        self._frame: np.ndarray | None = None
+        self._image: QImage | None = None
+
+    def show_frame(self, frame: np.ndarray):
+        """Display a contiguous (height, width, 3) BGR image. Must be called on the GUI thread."""
+        height, width = frame.shape[:2]
+        self._frame = frame
+        self._image = QImage(frame.data, width, height, frame.strides[0], QImage.Format.Format_BGR888)
+        self.update()
+
+    def clear(self):
+        self._frame = None
+        self._image = None
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.GlobalColor.black)
+        if self._image is not None:
+            size = self._image.size().scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(self.rect().center())
+            painter.drawImage(target, self._image)
+        painter.end()
+
+    def closeEvent(self, event):
+        self.closed.emit()
+        super().closeEvent(event)
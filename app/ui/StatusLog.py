@@ -0,0 +1,42 @@
+from collections import deque
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QPlainTextEdit
+
+
+class StatusLog(QPlainTextEdit):
+    """
+    Read-only status panel that keeps the last capacity messages. Messages are queued and added in
+    one batch at most refresh_hz times a second, so a burst of them costs one layout and one scroll
+    instead of one per message, and a long session never holds more than capacity lines.
+    """
+
+    def __init__(self, capacity: int = 500, refresh_hz: float = 10.0):
+        super().__init__()
+        self.setReadOnly(True)
+        # The document drops its oldest lines itself, and the queue drops what it never showed.
+        self.setMaximumBlockCount(capacity)
+        self._pending: deque[str] = deque(maxlen=capacity)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max(round(1000 / refresh_hz), 1))
+        self._timer.timeout.connect(self.flush)
+
+    def append(self, message: str):
+        """Queue a message for the next refresh. Must be called on the GUI thread."""
+        self._pending.append(message)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """Show the queued messages now."""
+        self._timer.stop()
+        if not self._pending:
+            return
+        scroll_bar = self.verticalScrollBar()
+        # Keep following new messages unless the user has scrolled up to read older ones.
+        following = scroll_bar.value() == scroll_bar.maximum()
+        self.appendPlainText("\n".join(self._pending))
+        self._pending.clear()
+        if following:
+            scroll_bar.setValue(scroll_bar.maximum())
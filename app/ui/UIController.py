@@ -1,13 +1,51 @@
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                 QHBoxLayout, QLabel, QComboBox, QPushButton,
-                                QTextEdit, QGroupBox, QDoubleSpinBox, QInputDialog,
-                                QMessageBox)
+                                QGroupBox, QDoubleSpinBox, QInputDialog,
+                                QMessageBox, QCheckBox, QGridLayout)
+from PySide6.QtCore import QObject, QSocketNotifier, QTimer, Signal
 from PySide6.QtGui import QFont
-import cv2
+import signal
+import socket
 import sys
+from typing import Callable
+
+from app.preferences.PreferencesController import Profile
+from app.ui.PreviewWidget import PreviewWidget
+from app.ui.StatusLog import StatusLog
+from app.tracking.Gestures import ACTIONS, GESTURES
+
+GESTURE_LABELS = {
+    "index_pinch": "Thumb + index pinch:",
+    "middle_pinch": "Thumb + middle pinch:",
+    "two_fingers": "Two fingers up:",
+    "fist": "Fist:",
+}
+ACTION_LABELS = {
+    "none": "Nothing",
+    "click": "Click",
+    "right_click": "Right click",
+    "drag": "Hold button (drag)",
+    "scroll": "Scroll",
+    "pause": "Pause cursor",
+}
+
+
+class _Dispatcher(QObject):
+    """Runs callables posted from worker threads on the GUI thread via a queued signal."""
+    invoke = Signal(object)
+
+
+class _MainWindow(QMainWindow):
+    closed = Signal()
+
+    def closeEvent(self, event):
+        self.closed.emit()
+        super().closeEvent(event)
 
 
 class UIController:
+    CAMERA_RESCAN_INTERVAL_MS = 5000
+
     def __init__(self, app):
         self.app_controller = app
         self.qt_app = QApplication.instance()
@@ -15,22 +53,38 @@ class UIController:
             self.qt_app = QApplication(sys.argv)
 
         self.is_tracking = False
-        self.available_cameras = self._detect_cameras()
-
-        self.window = QMainWindow()
+        self.available_cameras: list[int] = []
+        self.monitors: list[tuple[int, int, int, int]] = []
+        self._dispatcher = _Dispatcher()
+        self._dispatcher.invoke.connect(lambda fn: fn())
+
+        self.window = _MainWindow()
+        # Closing the main window quits even while the preview window is still open.
+        self.window.closed.connect(self.qt_app.quit)
         self.window.setWindowTitle("Wave Vision")
-        self.window.setFixedSize(600, 550)
+        self.window.setFixedSize(600, 860)
 
         self._setup_ui()
 
-    def _detect_cameras(self) -> list[int]:
-        available = []
-        for i in range(10):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                available.append(i)
-                cap.release()
-        return available if available else [0]
+        self.metrics_timer = QTimer(self.window)
+        self.metrics_timer.setInterval(1000)
+        self.metrics_timer.timeout.connect(self._on_metrics_timer)
+        self.metrics_timer.start()
+
+        # Cheap on Linux: a real rescan only happens when /dev/video* changes.
+        self.camera_rescan_timer = QTimer(self.window)
+        self.camera_rescan_timer.setInterval(self.CAMERA_RESCAN_INTERVAL_MS)
+        self.camera_rescan_timer.timeout.connect(self._on_camera_rescan_timer)
+        self.camera_rescan_timer.start()
+
+        self.qt_app.screenAdded.connect(self._on_screen_added)
+        self.qt_app.screenRemoved.connect(lambda _: self._on_screens_changed())
+        for screen in self.qt_app.screens():
+            screen.geometryChanged.connect(lambda _: self._on_screens_changed())
+
+    def post(self, fn: Callable[[], None]):
+        """Run fn on the GUI thread. Safe to call from any thread."""
+        self._dispatcher.invoke.emit(fn)
 
     def _setup_ui(self):
         central_widget = QWidget()
@@ -77,13 +131,21 @@ class UIController:
         camera_row = QHBoxLayout()
         camera_label = QLabel("Camera Index:")
         self.camera_combo = QComboBox()
-        for cam in self.available_cameras:
-            self.camera_combo.addItem(str(cam), cam)
         self.camera_combo.currentIndexChanged.connect(self._on_camera_selected)
         camera_row.addWidget(camera_label)
         camera_row.addWidget(self.camera_combo)
         camera_row.addStretch()
 
+        camera_mode_row = QHBoxLayout()
+        self.camera_settings_label = QLabel("Mode: opening...")
+        self.camera_settings_label.setFont(QFont("Courier", 9))
+        self.redetect_mode_button = QPushButton("Re-detect")
+        self.redetect_mode_button.setToolTip("Try every capture backend and pixel format and keep the fastest.")
+        self.redetect_mode_button.clicked.connect(self._on_redetect_mode)
+        camera_mode_row.addWidget(self.camera_settings_label)
+        camera_mode_row.addStretch()
+        camera_mode_row.addWidget(self.redetect_mode_button)
+
         sensitivity_row = QHBoxLayout()
         sensitivity_label = QLabel("Sensitivity:")
         self.sensitivity_spin = QDoubleSpinBox()
@@ -106,6 +168,20 @@ class UIController:
         smoothing_row.addWidget(self.smoothing_spin)
         smoothing_row.addStretch()
 
+        filter_row = QHBoxLayout()
+        filter_label = QLabel("Filter:")
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItem("Exponential", "ema")
+        self.filter_combo.addItem("One Euro", "one_euro")
+        self.filter_combo.addItem("Kalman", "kalman")
+        self.filter_combo.currentIndexChanged.connect(self._on_filter_selected)
+        self.latency_compensation_check = QCheckBox("Latency compensation")
+        self.latency_compensation_check.toggled.connect(self._on_latency_compensation_toggled)
+        filter_row.addWidget(filter_label)
+        filter_row.addWidget(self.filter_combo)
+        filter_row.addWidget(self.latency_compensation_check)
+        filter_row.addStretch()
+
         pinch_row = QHBoxLayout()
         pinch_label = QLabel("Pinch Threshold:")
         self.pinch_spin = QDoubleSpinBox()
@@ -117,13 +193,61 @@ class UIController:
         pinch_row.addWidget(self.pinch_spin)
         pinch_row.addStretch()
 
+        power_row = QHBoxLayout()
+        self.power_saving_check = QCheckBox("Power saving when no hand is visible")
+        self.power_saving_check.setChecked(True)
+        self.power_saving_check.toggled.connect(self._on_power_saving_toggled)
+        idle_fps_label = QLabel("Idle FPS:")
+        self.idle_fps_spin = QDoubleSpinBox()
+        self.idle_fps_spin.setRange(1.0, 30.0)
+        self.idle_fps_spin.setSingleStep(1.0)
+        self.idle_fps_spin.setValue(5.0)
+        self.idle_fps_spin.valueChanged.connect(self._on_idle_fps_changed)
+        power_row.addWidget(self.power_saving_check)
+        power_row.addWidget(idle_fps_label)
+        power_row.addWidget(self.idle_fps_spin)
+        power_row.addStretch()
+
+        screen_row = QHBoxLayout()
+        screen_label = QLabel("Screen:")
+        self.monitor_combo = QComboBox()
+        self.monitor_combo.currentIndexChanged.connect(self._on_monitor_selected)
+        self.calibrate_button = QPushButton("Calibrate")
+        self.calibrate_button.setToolTip("Trace the corners of a comfortable area with your hand, then click Finish.")
+        self.calibrate_button.clicked.connect(self._on_calibrate)
+        self.reset_calibration_button = QPushButton("Reset")
+        self.reset_calibration_button.clicked.connect(self._on_reset_calibration)
+        screen_row.addWidget(screen_label)
+        screen_row.addWidget(self.monitor_combo)
+        screen_row.addWidget(self.calibrate_button)
+        screen_row.addWidget(self.reset_calibration_button)
+        screen_row.addStretch()
+
         settings_layout.addLayout(camera_row)
+        settings_layout.addLayout(camera_mode_row)
+        settings_layout.addLayout(screen_row)
         settings_layout.addLayout(sensitivity_row)
         settings_layout.addLayout(smoothing_row)
+        settings_layout.addLayout(filter_row)
         settings_layout.addLayout(pinch_row)
+        settings_layout.addLayout(power_row)
         settings_group.setLayout(settings_layout)
         main_layout.addWidget(settings_group)
 
+        gesture_group = QGroupBox("Gestures")
+        gesture_layout = QGridLayout()
+        self.gesture_combos: dict[str, QComboBox] = {}
+        for i, gesture in enumerate(GESTURES):
+            combo = QComboBox()
+            for action in ACTIONS:
+                combo.addItem(ACTION_LABELS[action], action)
+            combo.currentIndexChanged.connect(lambda _, gesture=gesture: self._on_gesture_action_selected(gesture))
+            self.gesture_combos[gesture] = combo
+            gesture_layout.addWidget(QLabel(GESTURE_LABELS[gesture]), i // 2, (i % 2) * 2)
+            gesture_layout.addWidget(combo, i // 2, (i % 2) * 2 + 1)
+        gesture_group.setLayout(gesture_layout)
+        main_layout.addWidget(gesture_group)
+
         controls_group = QGroupBox("Tracking Controls")
         controls_layout = QHBoxLayout()
 
@@ -136,27 +260,46 @@ class UIController:
         self.stop_button.setEnabled(False)
         self.stop_button.clicked.connect(self._on_stop_clicked)
 
+        self.preview_check = QCheckBox("Show preview")
+        self.preview_check.setToolTip("Show what the tracker sees, with the detected hand drawn over it.")
+        self.preview_check.toggled.connect(self._on_preview_toggled)
+        self.preview_widget = PreviewWidget()
+        self.preview_widget.closed.connect(lambda: self.preview_check.setChecked(False))
+
         controls_layout.addWidget(self.start_button)
         controls_layout.addWidget(self.stop_button)
         controls_layout.addStretch()
+        controls_layout.addWidget(self.preview_check)
         controls_group.setLayout(controls_layout)
         main_layout.addWidget(controls_group)
 
         status_group = QGroupBox("Status")
         status_layout = QVBoxLayout()
 
-        self.status_text = QTextEdit()
-        self.status_text.setReadOnly(True)
+        self.status_text = StatusLog()
         self.status_text.setMinimumHeight(150)
         self.status_text.setFont(QFont("Courier", 10))
 
+        self.metrics_label = QLabel("Metrics: idle")
+        self.metrics_label.setFont(QFont("Courier", 9))
+        self.metrics_label.setWordWrap(True)
+
+        status_layout.addWidget(self.metrics_label)
         status_layout.addWidget(self.status_text)
         status_group.setLayout(status_layout)
         main_layout.addWidget(status_group)
 
         main_layout.addStretch()
 
-        self.update_status("Ready. Select camera and click 'Start Tracking'.")
+        self.update_status("Starting up...")
+
+    def _on_camera_rescan_timer(self):
+        if not self.is_tracking:
+            self.app_controller.rescan_cameras()
+
+    def _on_metrics_timer(self):
+        if self.is_tracking:
+            self.update_metrics(self.app_controller.get_metrics())
 
     def _on_profile_selected(self):
         profile_name = self.profile_combo.currentText()
@@ -168,15 +311,55 @@ class UIController:
         if not self.is_tracking:
             self.app_controller.update_camera(camera_index)
 
+    def _on_screen_added(self, screen):
+        screen.geometryChanged.connect(lambda _: self._on_screens_changed())
+        self._on_screens_changed()
+
+    def _on_screens_changed(self):
+        self.app_controller.on_screens_changed(self.screen_rects())
+
+    def _on_monitor_selected(self):
+        monitor = self.monitor_combo.currentData()
+        if monitor is not None:
+            self.app_controller.update_monitor(monitor)
+
+    def _on_calibrate(self):
+        self.app_controller.toggle_calibration()
+
+    def _on_reset_calibration(self):
+        self.app_controller.reset_calibration()
+
+    def _on_redetect_mode(self):
+        self.app_controller.redetect_camera_mode()
+
     def _on_sensitivity_changed(self, value: float):
         self.app_controller.update_sensitivity(value)
 
     def _on_smoothing_changed(self, value: float):
         self.app_controller.update_smoothing(value)
 
+    def _on_filter_selected(self):
+        filter_type = self.filter_combo.currentData()
+        # Smoothing is the exponential filter's alpha; the other filters are tuned per profile.
+        self.smoothing_spin.setEnabled(filter_type == "ema")
+        self.app_controller.update_filter_type(filter_type)
+
+    def _on_latency_compensation_toggled(self, checked: bool):
+        self.app_controller.update_latency_compensation(checked)
+
     def _on_pinch_changed(self, value: float):
         self.app_controller.update_pinch_threshold(value)
 
+    def _on_gesture_action_selected(self, gesture: str):
+        self.app_controller.update_gesture_action(gesture, self.gesture_combos[gesture].currentData())
+
+    def _on_power_saving_toggled(self, checked: bool):
+        self.idle_fps_spin.setEnabled(checked)
+        self.app_controller.update_power_saving(checked)
+
+    def _on_idle_fps_changed(self, value: float):
+        self.app_controller.update_idle_fps(value)
+
     def _on_new_profile(self):
         name, ok = QInputDialog.getText(self.window, "New Profile", "Profile name:")
         if ok and name:
@@ -209,6 +392,18 @@ class UIController:
             if not success:
                 QMessageBox.warning(self.window, "Error", "Cannot delete the last profile.")
 
+    def _on_preview_toggled(self, checked: bool):
+        if checked:
+            self.preview_widget.show()
+        else:
+            self.preview_widget.hide()
+            self.preview_widget.clear()
+        self.app_controller.set_preview_enabled(checked)
+
+    def show_preview_frame(self, frame):
+        if self.preview_check.isChecked():
+            self.preview_widget.show_frame(frame)
+
     def _on_start_clicked(self):
         self.app_controller.start_tracking()
 
@@ -223,18 +418,73 @@ class UIController:
         if index >= 0:
             self.profile_combo.setCurrentIndex(index)
 
-    def update_settings_ui(self, camera_index: int, sensitivity: float, smoothing: float, pinch_threshold: float):
+    def set_available_cameras(self, cameras: list[int], selected: int):
+        """Repopulate the camera list without triggering a camera switch."""
+        cameras = sorted(set(cameras) | {selected})
+        if cameras == self.available_cameras:
+            return
+        self.available_cameras = cameras
+
+        self.camera_combo.blockSignals(True)
+        self.camera_combo.clear()
+        for cam in cameras:
+            self.camera_combo.addItem(str(cam), cam)
+        self.camera_combo.setCurrentIndex(cameras.index(selected))
+        self.camera_combo.blockSignals(False)
+
+    def update_settings_ui(self, profile: Profile):
         for i in range(self.camera_combo.count()):
-            if self.camera_combo.itemData(i) == camera_index:
+            if self.camera_combo.itemData(i) == profile.camera_index:
                 self.camera_combo.setCurrentIndex(i)
                 break
-        self.sensitivity_spin.setValue(sensitivity)
-        self.smoothing_spin.setValue(smoothing)
-        self.pinch_spin.setValue(pinch_threshold)
+        self.sensitivity_spin.setValue(profile.sensitivity)
+        self.smoothing_spin.setValue(profile.smoothing)
+        self.filter_combo.setCurrentIndex(max(self.filter_combo.findData(profile.filter_type), 0))
+        self.latency_compensation_check.setChecked(profile.latency_compensation)
+        self.pinch_spin.setValue(profile.pinch_threshold)
+        self.power_saving_check.setChecked(profile.power_saving)
+        self.idle_fps_spin.setValue(profile.idle_fps)
+        self.monitor_combo.setCurrentIndex(max(self.monitor_combo.findData(profile.monitor), 0))
+        for gesture, combo in self.gesture_combos.items():
+            combo.setCurrentIndex(max(combo.findData(profile.gesture_map.get(gesture, "none")), 0))
+
+    def screen_rects(self) -> list[tuple[int, int, int, int]]:
+        """Every monitor as (left, top, width, height) in device pixels, the units the pointer backends use."""
+        rects = []
+        for screen in self.qt_app.screens():
+            geometry = screen.geometry()
+            ratio = screen.devicePixelRatio()
+            rects.append((round(geometry.x() * ratio), round(geometry.y() * ratio),
+                          round(geometry.width() * ratio), round(geometry.height() * ratio)))
+        return rects
+
+    def set_monitors(self, monitors: list[tuple[int, int, int, int]], selected: int):
+        """Repopulate the monitor list without triggering a change."""
+        self.monitors = monitors
+        self.monitor_combo.blockSignals(True)
+        self.monitor_combo.clear()
+        self.monitor_combo.addItem("All monitors", -1)
+        for i, (_, _, width, height) in enumerate(monitors):
+            self.monitor_combo.addItem(f"Monitor {i + 1} ({width}x{height})", i)
+        self.monitor_combo.setCurrentIndex(max(self.monitor_combo.findData(selected), 0))
+        self.monitor_combo.blockSignals(False)
+
+    def set_calibrating(self, calibrating: bool):
+        self.calibrate_button.setText("Finish" if calibrating else "Calibrate")
+
+    def set_camera_settings(self, description: str):
+        """Show the capture settings the camera driver actually applied."""
+        self.camera_settings_label.setText(f"Mode: {description}")
 
     def get_selected_camera(self) -> int:
         return self.camera_combo.currentData()
 
+    def set_ready(self, ready: bool):
+        """Enable tracking controls once the pipeline has been built in the background."""
+        self.start_button.setEnabled(ready and not self.is_tracking)
+        if ready:
+            self.update_status("Ready. Select camera and click 'Start Tracking'.")
+
     def set_tracking_state(self, is_tracking: bool):
         self.is_tracking = is_tracking
         self.start_button.setEnabled(not is_tracking)
@@ -248,18 +498,53 @@ class UIController:
 
     def update_status(self, message: str):
         self.status_text.append(message)
-        self.status_text.verticalScrollBar().setValue(
-            self.status_text.verticalScrollBar().maximum()
+
+    def update_metrics(self, metrics: dict):
+        def fmt(stage: str) -> str:
+            values = metrics["stages"].get(stage)
+            if not values or not values["count"]:
+                return f"{stage} -"
+            return f"{stage} {values['p50']:.1f}/{values['p95']:.1f}/{values['p99']:.1f}"
+
+        self.metrics_label.setText(
+            f"FPS {metrics['effective_fps']:.1f} (capture {metrics['capture_fps']:.1f})  "
+            f"mode {metrics['governor']}  skipped {metrics['frames_skipped']}  "
+            f"dropped {metrics['frames_dropped']}  stale {metrics['results_stale']}\n"
+            f"p50/p95/p99 ms: " + "  ".join(fmt(stage) for stage in metrics["stages"])
         )
 
+    def refresh_rate(self) -> float:
+        screen = self.qt_app.primaryScreen()
+        return screen.refreshRate() if screen is not None else 60.0
+
     def show(self):
         self.window.show()
 
-    def update(self):
-        self.qt_app.processEvents()
-
-    def is_closed(self) -> bool:
-        return not self.window.isVisible()
+    def exec(self) -> int:
+        """Run the Qt event loop until the main window is closed or the process gets SIGINT."""
+        # Qt holds the main thread while it waits for events, so Python signal handlers only run
+        # when the interpreter gets control back. The wakeup socket gives it control on a signal.
+        wakeup_read, wakeup_write = socket.socketpair()
+        wakeup_read.setblocking(False)
+        wakeup_write.setblocking(False)
+        notifier = QSocketNotifier(wakeup_read.fileno(), QSocketNotifier.Type.Read)
+        notifier.activated.connect(lambda: wakeup_read.recv(64))
+        previous_fd = signal.set_wakeup_fd(wakeup_write.fileno())
+        previous_handler = signal.signal(signal.SIGINT, lambda *_: self._interrupt())
+        try:
+            return self.qt_app.exec()
+        finally:
+            signal.signal(signal.SIGINT, previous_handler)
+            signal.set_wakeup_fd(previous_fd)
+            notifier.setEnabled(False)
+            wakeup_read.close()
+            wakeup_write.close()
+
+    def _interrupt(self):
+        print("\nShutting down...")
+        self.qt_app.quit()
 
     def close(self):
+        self.status_text.flush()
+        self.preview_widget.close()
         self.window.close()
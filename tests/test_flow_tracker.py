@@ -0,0 +1,90 @@
+import importlib.util
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from app.tracking.HandLandmarks import HandLandmarks
+
+SIZE = 160
+STEP_PX = 2
+
+
+def frame_at(index: int, texture: np.ndarray) -> np.ndarray:
+    """A textured frame, shifted right by STEP_PX per frame, for the flow to follow."""
+    return np.ascontiguousarray(np.roll(texture, index * STEP_PX, axis=1))
+
+
+def hands_at(index: int) -> HandLandmarks:
+    """21 landmarks on a grid in the middle of frame index, where the fake detector finds them."""
+    grid = np.stack(np.meshgrid(np.linspace(60, 100, 7), np.linspace(70, 90, 3)), axis=-1).reshape(21, 2)
+    grid[:, 0] += index * STEP_PX
+    points = np.concatenate([grid / SIZE, np.zeros((21, 1))], axis=-1).astype(np.float32)
+    return HandLandmarks(1).fill(points[None], confidence=np.ones(1, dtype=np.float32))
+
+
+class DelayedDetector:
+    """Stands in for a LandmarkerPool, answering each frame delay_s after it was submitted."""
+
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+        self.submitted: list[int] = []
+        self._timers: list[threading.Timer] = []
+
+    def add_seat(self, seat, on_result, on_skipped=None):
+        self._on_result = on_result
+
+    def submit(self, seat, frame: np.ndarray, timestamp_ms: int):
+        self.submitted.append(timestamp_ms)
+        timer = threading.Timer(self.delay_s, self._on_result, (timestamp_ms, hands_at(timestamp_ms)))
+        timer.start()
+        self._timers.append(timer)
+
+    def join(self):
+        for timer in self._timers:
+            timer.join()
+
+
+@unittest.skipUnless(importlib.util.find_spec("mediapipe"), "needs mediapipe")
+class FlowTrackerDeliveryTest(unittest.TestCase):
+    def run_frames(self, delay_s: float, frames: int = 30, frame_s: float = 1 / 30):
+        from app.tracking.TrackingController import TrackingController
+        from app.tracking.TrackingParams import TrackingParams
+
+        detector = DelayedDetector(delay_s)
+        tracking = TrackingController(TrackingParams(area_size_x=SIZE, area_size_y=SIZE, model_path="unused.task",
+                                                     flow_interval=3),
+                                      screen_size=(1920, 1080), pool=detector)
+        delivered = []
+        tracking.add_result_listener(lambda timestamp_ms, result: delivered.append(timestamp_ms))
+        texture = np.random.default_rng(0).integers(0, 256, (SIZE, SIZE, 3), dtype=np.uint8)
+        # The frame index doubles as its timestamp, so the fake detector knows where the hand is.
+        for index in range(1, frames + 1):
+            tracking.track(frame_at(index, texture), index)
+            time.sleep(frame_s)
+        detector.join()
+        return tracking, detector, delivered
+
+    def test_detections_slower_than_a_frame_are_delivered_in_order(self):
+        tracking, detector, delivered = self.run_frames(delay_s=0.05)
+        self.assertEqual(delivered, list(range(1, 31)))
+        # The first two frames before there is anything to propagate, then every third.
+        self.assertEqual(detector.submitted, [1, 2] + list(range(5, 31, 3)))
+        self.assertGreater(tracking.flow.deferred, 0)
+
+    def test_frames_held_back_for_a_detection_follow_the_hand(self):
+        tracking, _, _ = self.run_frames(delay_s=0.05)
+        # Frame 30 waited for the detection of frame 29 and was propagated from it.
+        self.assertTrue(np.allclose(tracking.last_result.hands.points[0, :, :2], hands_at(30).points[0, :, :2],
+                                    atol=2 / SIZE))
+
+    def test_frames_are_not_held_back_for_a_fast_detector(self):
+        tracking, _, delivered = self.run_frames(delay_s=0.0)
+        self.assertEqual(delivered, list(range(1, 31)))
+        self.assertEqual(tracking.flow.deferred, 0)
+        self.assertEqual(tracking.flow.propagated, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
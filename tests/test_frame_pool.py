@@ -0,0 +1,44 @@
+import unittest
+
+from app.camera.FramePool import FramePool
+from app.system.LatestQueue import LatestQueue
+
+
+class FramePoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = FramePool((4, 4, 3), count=2)
+
+    def test_buffer_returns_to_the_pool_after_its_last_release(self):
+        buffer = self.pool.acquire()
+        buffer.retain()
+        self.assertEqual(len(self.pool.free), 1)
+        buffer.release()
+        self.assertEqual(len(self.pool.free), 1)
+        buffer.release()
+        self.assertEqual(len(self.pool.free), 2)
+        self.assertIn(buffer, self.pool.free)
+
+    def test_exhausted_pool_allocates_a_temporary_buffer(self):
+        first, second = self.pool.acquire(), self.pool.acquire()
+        extra = self.pool.acquire()
+        self.assertEqual(self.pool.misses, 1)
+        self.assertEqual(extra.bgr.shape, (4, 4, 3))
+        extra.release()
+        self.assertEqual(self.pool.free, [])
+        first.release()
+        second.release()
+        self.assertEqual(len(self.pool.free), 2)
+
+    def test_buffers_left_in_a_closed_queue_are_released(self):
+        queue = LatestQueue(maxsize=1, on_discard=lambda buffer: buffer.release())
+        queue.put(self.pool.acquire())
+        queue.put(self.pool.acquire())
+        self.assertEqual(len(self.pool.free), 1)
+        queue.close()
+        # As the capture thread can during stop.
+        queue.put(self.pool.acquire())
+        self.assertEqual(len(self.pool.free), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
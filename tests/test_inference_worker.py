@@ -0,0 +1,35 @@
+import importlib.util
+import threading
+import unittest
+
+import numpy as np
+
+from app.tracking.InferenceWorker import InferenceWorker
+
+
+@unittest.skipUnless(importlib.util.find_spec("mediapipe"), "needs mediapipe")
+class InferenceWorkerTest(unittest.TestCase):
+    def test_a_worker_that_keeps_crashing_is_given_up_on(self):
+        from app.tracking.InferenceConfig import InferenceConfig
+
+        failures = []
+        failed = threading.Event()
+
+        def on_failed(error: Exception):
+            failures.append(error)
+            failed.set()
+
+        # The model is missing, so every worker process exits while loading it.
+        worker = InferenceWorker(InferenceConfig("missing.task", "cpu"), lambda *_: None, max_restarts=1,
+                                 on_failed=on_failed)
+        self.addCleanup(worker.close)
+        self.assertTrue(failed.wait(timeout=60.0))
+        self.assertTrue(worker.failed)
+        self.assertEqual(worker.restarts, 1)
+        self.assertEqual(len(failures), 1)
+        self.assertIn("crashed 2 times", str(failures[0]))
+        self.assertFalse(worker.submit(np.zeros((8, 8, 3), dtype=np.uint8), 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
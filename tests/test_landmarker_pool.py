@@ -0,0 +1,72 @@
+import importlib.util
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+FRAME = np.zeros((8, 8, 3), dtype=np.uint8)
+
+
+class FailingLandmarker:
+    """Fails on every frame after the warm-up with an error MediaPipe itself would not raise."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, image):
+        self.calls += 1
+        if self.calls > 1:
+            raise ValueError("bad frame")
+
+    def close(self):
+        pass
+
+
+@unittest.skipUnless(importlib.util.find_spec("mediapipe"), "needs mediapipe")
+class LandmarkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.errors = []
+        self.results = []
+        self.skipped = []
+        self.served = threading.Semaphore(0)
+
+    def create_pool(self, model_path: str):
+        from app.tracking.InferenceConfig import InferenceConfig
+        from app.tracking.LandmarkerPool import LandmarkerPool
+
+        pool = LandmarkerPool(InferenceConfig(model_path, "cpu"), workers=1,
+                              on_error=lambda seat, error: self.errors.append((seat, type(error))))
+        pool.add_seat("seat", self.on_result, self.skipped.append)
+        self.addCleanup(pool.close)
+        return pool
+
+    def on_result(self, timestamp_ms, hands):
+        self.results.append((timestamp_ms, hands))
+        self.served.release()
+
+    def test_a_model_that_cannot_load_stops_the_pool(self):
+        pool = self.create_pool("missing.task")
+        self.assertFalse(pool.wait_ready(timeout=10.0))
+        self.assertIsNotNone(pool.error)
+        self.assertEqual([seat for seat, _ in self.errors], [None])
+        # Nothing will serve the frame, so it is skipped straight away.
+        pool.submit("seat", FRAME, 1)
+        self.assertEqual(self.skipped, [1])
+
+    def test_a_failed_frame_counts_as_no_hand_and_the_seat_keeps_going(self):
+        import mediapipe as mp
+
+        with mock.patch.object(mp.tasks.vision.HandLandmarker, "create_from_options",
+                               return_value=FailingLandmarker()):
+            pool = self.create_pool("unused.task")
+            self.assertTrue(pool.wait_ready(timeout=10.0))
+        for timestamp_ms in (1, 2):
+            pool.submit("seat", FRAME, timestamp_ms)
+            self.assertTrue(self.served.acquire(timeout=5.0))
+        self.assertEqual(self.results, [(1, None), (2, None)])
+        self.assertEqual(self.errors, [("seat", ValueError), ("seat", ValueError)])
+
+
+if __name__ == "__main__":
+    unittest.main()
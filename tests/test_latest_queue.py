@@ -0,0 +1,61 @@
+import threading
+import unittest
+
+from app.system.LatestQueue import LatestQueue
+
+
+class LatestQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.discarded = []
+        self.queue = LatestQueue(maxsize=2, on_discard=self.discarded.append)
+
+    def test_hands_out_items_oldest_first(self):
+        self.queue.put(1)
+        self.queue.put(2)
+        self.assertEqual(self.queue.get(timeout=0), 1)
+        self.assertEqual(self.queue.get(timeout=0), 2)
+        self.assertIsNone(self.queue.get(timeout=0))
+
+    def test_full_queue_evicts_the_oldest_item(self):
+        self.assertFalse(self.queue.put(1))
+        self.assertFalse(self.queue.put(2))
+        self.assertTrue(self.queue.put(3))
+        self.assertEqual(self.discarded, [1])
+        self.assertEqual(self.queue.dropped, 1)
+        self.assertEqual(self.queue.get(timeout=0), 2)
+
+    def test_close_wakes_a_waiting_consumer(self):
+        results = []
+        consumer = threading.Thread(target=lambda: results.append(self.queue.get(timeout=5)))
+        consumer.start()
+        self.queue.close()
+        consumer.join(timeout=5)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(results, [None])
+
+    def test_close_discards_queued_items(self):
+        self.queue.put(1)
+        self.queue.put(2)
+        self.queue.close()
+        self.assertEqual(self.discarded, [1, 2])
+        self.assertIsNone(self.queue.get(timeout=0))
+
+    def test_put_after_close_discards_the_item(self):
+        self.queue.close()
+        self.assertFalse(self.queue.put(1))
+        self.assertEqual(self.discarded, [1])
+        self.queue.reset()
+        self.assertIsNone(self.queue.get(timeout=0))
+
+    def test_reset_discards_queued_items_and_reopens(self):
+        self.queue.put(1)
+        self.queue.close()
+        self.queue.reset()
+        self.assertFalse(self.queue.closed)
+        self.assertEqual(self.queue.dropped, 0)
+        self.queue.put(2)
+        self.assertEqual(self.queue.get(timeout=0), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
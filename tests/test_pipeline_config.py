@@ -0,0 +1,76 @@
+import importlib.util
+import unittest
+from dataclasses import replace
+
+from app.preferences.PreferencesController import Profile
+from app.system.PipelineConfig import STAGE_FIELDS, PipelineConfig
+
+CHANGES = {
+    "filter_type": "one_euro",
+    "filter_params": (("alpha", 0.6),),
+    "latency_compensation": True,
+    "sensitivity": 1.5,
+    "monitor": 1,
+    "region": ((0.1, 0.1), (0.9, 0.1), (0.9, 0.9), (0.1, 0.9)),
+    "pinch_threshold": 0.08,
+    "gesture_map": (("fist", "click"),),
+    "power_saving": False,
+    "idle_fps": 10.0,
+    "idle_timeout_s": 5.0,
+}
+
+
+def profile(**changes) -> Profile:
+    return replace(Profile(id=1, name="Test", camera_index=0, sensitivity=1.0, smoothing=0.3,
+                           pinch_threshold=0.05), **changes)
+
+
+class PipelineConfigTest(unittest.TestCase):
+    def test_every_stage_changes_without_a_previous_snapshot(self):
+        self.assertEqual(PipelineConfig().changed_stages(None), set(STAGE_FIELDS))
+
+    def test_equal_snapshots_change_nothing_whatever_their_version(self):
+        first, second = PipelineConfig(), PipelineConfig()
+        self.assertLess(first.version, second.version)
+        self.assertEqual(first, second)
+        self.assertEqual(second.changed_stages(first), set())
+
+    def test_each_setting_changes_only_its_own_stage(self):
+        base = PipelineConfig()
+        stage_of = {name: stage for stage, names in STAGE_FIELDS.items() for name in names}
+        self.assertEqual(set(CHANGES), set(stage_of))
+        for name, value in CHANGES.items():
+            with self.subTest(name=name):
+                self.assertEqual(replace(base, **{name: value}).changed_stages(base), {stage_of[name]})
+
+    def test_from_profile_snapshots_are_immutable_and_independent_of_the_profile(self):
+        source = profile(calibration=[[0.1, 0.2], [0.8, 0.2], [0.8, 0.9], [0.1, 0.9]])
+        config = PipelineConfig.from_profile(source)
+        source.gesture_map["fist"] = "click"
+        source.calibration[0][0] = 0.5
+        self.assertEqual(dict(config.gesture_map)["fist"], "pause")
+        self.assertEqual(config.region[0], (0.1, 0.2))
+        with self.assertRaises(AttributeError):
+            config.sensitivity = 2.0
+
+    def test_from_profile_leaves_the_landmarker_alone_without_inference(self):
+        config = PipelineConfig.from_profile(profile(min_detection_confidence=0.7))
+        self.assertIsNone(config.inference)
+        self.assertIsNone(config.confidence)
+
+    @unittest.skipUnless(importlib.util.find_spec("mediapipe"), "needs mediapipe")
+    def test_tracking_params_take_the_snapshot_model_and_confidences(self):
+        from app.tracking.InferenceConfig import InferenceConfig
+        from app.tracking.TrackingParams import TrackingParams
+
+        params = TrackingParams(area_size_x=640, area_size_y=480, model_path="a.task", delegate="cpu")
+        self.assertIs(PipelineConfig().tracking_params(params), params)
+        config = PipelineConfig.from_profile(profile(min_detection_confidence=0.7), InferenceConfig("b.task", "gpu"))
+        updated = config.tracking_params(params)
+        self.assertEqual((updated.model_path, updated.delegate, updated.min_detection_confidence),
+                         ("b.task", "gpu", 0.7))
+        self.assertEqual(updated.area_size_x, 640)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from app.preferences.PreferencesController import MIGRATIONS, PreferencesController
+from app.tracking.Gestures import DEFAULT_GESTURE_MAP
+
+
+class PreferencesMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "preferences.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def user_version(self) -> int:
+        with sqlite3.connect(self.path) as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def test_new_database_runs_every_migration_and_creates_a_default_profile(self):
+        preferences = PreferencesController(self.path)
+        profiles = preferences.get_all_profiles()
+        preferences.close()
+        self.assertEqual(self.user_version(), len(MIGRATIONS))
+        self.assertEqual([profile.name for profile in profiles], ["Default"])
+        self.assertEqual(profiles[0].gesture_map, DEFAULT_GESTURE_MAP)
+
+    def test_database_from_before_versioning_keeps_its_profiles(self):
+        # Unversioned, with only some of the columns that _add_tracking_columns adds.
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE profiles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE,
+                    camera_index INTEGER NOT NULL,
+                    sensitivity REAL NOT NULL,
+                    smoothing REAL NOT NULL,
+                    pinch_threshold REAL NOT NULL,
+                    power_saving INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            conn.execute("CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("INSERT INTO profiles (name, camera_index, sensitivity, smoothing, pinch_threshold, power_saving)"
+                         " VALUES ('Old', 1, 1.5, 0.4, 0.06, 0)")
+        conn.close()
+
+        preferences = PreferencesController(self.path)
+        profile = preferences.get_profile_by_name("Old")
+        preferences.close()
+        self.assertEqual(self.user_version(), len(MIGRATIONS))
+        self.assertEqual((profile.camera_index, profile.sensitivity, profile.power_saving), (1, 1.5, False))
+        self.assertEqual(profile.filter_type, "ema")
+        self.assertEqual((profile.monitor, profile.calibration, profile.model_path), (-1, [], ""))
+        self.assertEqual(profile.gesture_map, DEFAULT_GESTURE_MAP)
+
+    def test_reopening_runs_no_migration_again(self):
+        PreferencesController(self.path).close()
+        preferences = PreferencesController(self.path)
+        self.assertEqual(len(preferences.get_all_profiles()), 1)
+        preferences.close()
+        self.assertEqual(self.user_version(), len(MIGRATIONS))
+
+
+class PreferencesWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "preferences.db")
+        # Long enough that nothing is written behind the test's back.
+        self.preferences = PreferencesController(self.path, flush_delay_s=60.0)
+
+    def tearDown(self):
+        self.preferences.close()
+        self.directory.cleanup()
+
+    def test_creating_a_profile_under_a_name_just_renamed_away(self):
+        profile = self.preferences.get_profile_by_name("Default")
+        profile.name = "Renamed"
+        self.preferences.update_profile(profile)
+        new_profile = self.preferences.get_profile_by_name("Renamed")
+        new_profile.id, new_profile.name = None, "Default"
+        self.preferences.create_profile(new_profile)
+        self.assertEqual(sorted(p.name for p in self.preferences.get_all_profiles()), ["Default", "Renamed"])
+
+    def test_failed_write_keeps_edits_queued(self):
+        profile = self.preferences.get_profile_by_name("Default")
+        profile.sensitivity = 2.0
+        self.preferences.update_profile(profile)
+        self.preferences.set_setting("key", "old")
+
+        self.preferences.conn.execute("PRAGMA busy_timeout = 0")
+        blocker = sqlite3.connect(self.path, timeout=0)
+        blocker.execute("BEGIN EXCLUSIVE")
+        with self.assertRaises(sqlite3.OperationalError):
+            self.preferences.flush()
+        # Edited again while the write was failing: the newer value wins.
+        self.preferences.set_setting("key", "new")
+        blocker.rollback()
+        blocker.close()
+
+        self.preferences.flush()
+        with sqlite3.connect(self.path) as conn:
+            sensitivity = conn.execute("SELECT sensitivity FROM profiles WHERE name = 'Default'").fetchone()[0]
+            setting = conn.execute("SELECT value FROM settings WHERE key = 'key'").fetchone()[0]
+        conn.close()
+        self.assertEqual(sensitivity, 2.0)
+        self.assertEqual(setting, '"new"')
+
+
+if __name__ == "__main__":
+    unittest.main()